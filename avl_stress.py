@@ -0,0 +1,87 @@
+"""AVLTree stres testi.
+
+Çok büyük ağaçlarda ekleme/arama/sıra/seçim/silme işlemlerinin özyineleme (recursion)
+kullanmadan çalıştığını ve işlem başına ne kadar bellek ayırdığını ölçer.
+
+Kullanım:
+    python avl_stress.py [eleman_sayısı]   (varsayılan: 1000000)
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from main import AVLTree, Item
+
+
+def _check_tree(tree: AVLTree) -> int:
+    """Ağacın AVL ve sıralama kurallarını yığın kullanarak doğrular, düğüm sayısını döndürür"""
+    count = 0
+    previous_key = None
+    stack = []
+    node = tree.root
+    while stack or node:
+        while node:
+            left_height = node.left.height if node.left else 0
+            right_height = node.right.height if node.right else 0
+            assert abs(left_height - right_height) <= 1, "AVL dengesi bozuk"
+            assert node.height == max(left_height, right_height) + 1, "Yükseklik hatalı"
+            assert node.size == node.count + (node.left.size if node.left else 0) + \
+                (node.right.size if node.right else 0), "Alt ağaç boyutu hatalı"
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        assert previous_key is None or previous_key <= node.key, "Sıralama bozuk"
+        previous_key = node.key
+        count += node.count
+        node = node.right
+    return count
+
+
+def _measure(label: str, operation, names):
+    """İşlemi tüm girdiler için çalıştırır; süreyi ve ayrılan belleği raporlar"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for name in names:
+        operation(name)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_op = elapsed / len(names) * 1e6
+    print(f"{label:<8} {len(names):>9} işlem  {elapsed:8.2f} sn  {per_op:6.2f} µs/işlem  "
+          f"tepe bellek: {peak / 1024:.1f} KiB")
+
+
+def run(size: int):
+    random.seed(42)
+    names = [f"öğe{i:07d}" for i in range(size)]
+    random.shuffle(names)
+    items = [Item(name, i % 20) for i, name in enumerate(names)]
+    tree = AVLTree()
+
+    # Özyineleme olsaydı derin ağaçlarda bu sınır aşılırdı
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(64)
+    try:
+        start = time.perf_counter()
+        for item in items:
+            tree.insert(item)
+        elapsed = time.perf_counter() - start
+        print(f"ekleme   {size:>9} işlem  {elapsed:8.2f} sn  {elapsed / size * 1e6:6.2f} µs/işlem  "
+              f"ağaç yüksekliği: {tree.root.height}")
+        assert _check_tree(tree) == size
+
+        sample = names[:min(size, 100000)]
+        _measure("arama", tree.search, sample)
+        _measure("sıra", tree.rank, sample)
+        _measure("seçim", tree.select, range(len(sample)))
+        _measure("silme", tree.delete, sample)
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+    assert _check_tree(tree) == size - len(sample)
+    print("Ağaç doğrulandı: özyineleme sınırı 64 iken tüm işlemler tamamlandı.")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
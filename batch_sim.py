@@ -0,0 +1,300 @@
+"""Çok sayıda oyunu aynı anda adımlayan vektörel (NumPy) simülasyon.
+
+Denge çalışmaları için her oyun ayrı bir Game nesnesi yerine dizilerle temsil
+edilir: N oyunun çantaları N x öğe türü adet matrisidir ve kurtarma kuralları
+bütün oyunlara aynı anda uygulanır:
+
+- normal köy: köyün öğeleri çantaya aktarılır; çanta doluysa oyuncu bir öğe çıkarır
+- güç bedeli (Kristalköy): gereken güce ulaşana kadar öğe verilir
+- bulmaca (Zümrütvadi): çantayı değiştirmez
+- çanta sınırı (Elmasşehir): çantada en fazla 7 öğe kalmalıdır
+
+Kristalköy'de gereken güce ulaşamadan çantası boşalan oyun takılır ve orada
+biter; sonraki köyler o oyuna uygulanmaz.
+
+Oyuncu kararları rastgele bir politikayla verilir: her seçimde çantadaki
+öğelerden biri eşit olasılıkla seçilir. Rastgelelik sayaç tabanlıdır; bir
+oyunun k. kararı yalnızca (tohum, oyun no, k) üçlüsünün karmasına bağlıdır.
+Böylece aynı kararlar AutoPlayerIO ile gerçek bir Game üzerinde de
+verilebilir ve validate() iki sonucu karşılaştırır.
+
+NumPy gerektirir. Kullanım:
+    python batch_sim.py [oyun_sayısı]   (varsayılan: 1000000)
+"""
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from main import (PROMPT_CONTINUE, PROMPT_ITEM_NUMBERS, PROMPT_MENU, PROMPT_PUZZLE,
+                  PROMPT_REMOVE_ITEM, PROMPT_USE_ITEM, RULE_BAG_LIMIT, RULE_SACRIFICE, Game)
+from puzzle import default_engine
+
+# Game.liberate_village ile aynı kurallar
+REQUIRED_POWER = 7
+BAG_LIMIT = 7
+
+_MASK = (1 << 64) - 1
+_SEED_MULTIPLIER = 0xD1B54A32D192ED03
+_GAME_MULTIPLIER = 0xABC98388FB8FAC03
+
+
+def _mix(seed: int, game: int, counter: int) -> float:
+    """(tohum, oyun, sayaç) üçlüsünden [0, 1) aralığında sayı üretir (splitmix64)"""
+    z = (seed * _SEED_MULTIPLIER + game * _GAME_MULTIPLIER + counter + 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    z ^= z >> 31
+    return (z >> 11) / float(1 << 53)
+
+
+def _mix_array(seed: int, games, counters):
+    """_mix'in NumPy karşılığı; uint64 çarpımları 2^64'e göre taşar"""
+    with np.errstate(over="ignore"):
+        z = (np.uint64((seed * _SEED_MULTIPLIER + 0x9E3779B97F4A7C15) & _MASK)
+             + games.astype(np.uint64) * np.uint64(_GAME_MULTIPLIER)
+             + counters.astype(np.uint64))
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def _pick(counts, sizes, u):
+    """Her satır için çantadaki öğelerden u'ya karşılık geleni seçer (öğe türü no).
+
+    Öğeler tür numarası sırasıyla dizilmiş kabul edilir; seçilen sıra floor(u * boyut).
+    """
+    position = (u * sizes).astype(np.int16)
+    cumulative = counts.cumsum(axis=1, dtype=np.int16)
+    return (cumulative <= position[:, None]).sum(axis=1)
+
+
+def _pick_one(counts: List[int], u: float) -> int:
+    """_pick'in tek oyunluk karşılığı"""
+    position = int(u * sum(counts))
+    cumulative = 0
+    for item_id, count in enumerate(counts):
+        cumulative += count
+        if cumulative > position:
+            return item_id
+    raise ValueError("Çanta boş")
+
+
+class SimulationResult:
+    """Simülasyon sonu dizileri (her satır bir oyun)"""
+
+    def __init__(self, counts, total_power, sacrificed_power, draws, stuck):
+        self.counts = counts  # Çantadaki öğe türü adetleri
+        self.total_power = total_power  # Çantanın toplam gücü
+        self.sacrificed_power = sacrificed_power  # Kristalköy'de verilen güç
+        self.draws = draws  # Oyuncunun verdiği karar sayısı
+        self.stuck = stuck  # Gereken güce ulaşamadan çanta boşalan (biten) oyunlar
+
+    def summary(self) -> dict:
+        return {
+            "games": int(len(self.total_power)),
+            "mean_power": float(self.total_power.mean()),
+            "min_power": int(self.total_power.min()),
+            "max_power": int(self.total_power.max()),
+            "mean_sacrificed_power": float(self.sacrificed_power.mean()),
+            "mean_decisions": float(self.draws.mean()),
+            "stuck": int(self.stuck.sum()),
+        }
+
+
+class BatchSimulator:
+    """Bir oyunun dünyasını alıp aynı başlangıçtan N oyunu birlikte oynatır"""
+
+    def __init__(self, game: Game):
+        catalog = game.catalog
+        villages = list(game.liberation_queue)
+        # Köy öğeleri Game'in aktardığı sırayla (alfabetik) tutulur
+        self.village_items = [[catalog.intern(item) for item in village.inventory] for village in villages]
+        self.village_rules = [village.rule for village in villages]
+        self.initial_bag = [catalog.intern(item) for item in game.inventory]
+        self.capacity = game.inventory.max_capacity
+        self.item_types = len(catalog)
+        self.powers = np.frombuffer(catalog.powers, dtype=np.int32).astype(np.int64)
+
+    def run(self, games: int, seed: int = 0, first_game: int = 0) -> SimulationResult:
+        counts = np.zeros((games, self.item_types), dtype=np.int16)
+        for item_id in self.initial_bag:
+            counts[:, item_id] += 1
+        sizes = np.full(games, len(self.initial_bag), dtype=np.int16)
+        ids = np.arange(first_game, first_game + games, dtype=np.uint64)
+        draws = np.zeros(games, dtype=np.int64)
+        sacrificed = np.zeros(games, dtype=np.int64)
+        stuck = np.zeros(games, dtype=bool)
+
+        def remove_random(active):
+            """active satırlarının her birinden rastgele bir öğe çıkarır, türlerini döndürür"""
+            u = _mix_array(seed, ids[active], draws[active])
+            draws[active] += 1
+            chosen = _pick(counts[active], sizes[active], u)
+            counts[active, chosen] -= 1
+            sizes[active] -= 1
+            return chosen
+
+        for rule, items in zip(self.village_rules, self.village_items):
+            if rule == RULE_SACRIFICE:
+                given = np.zeros(games, dtype=np.int64)
+                while True:
+                    active = np.flatnonzero((given < REQUIRED_POWER) & (sizes > 0) & ~stuck)
+                    if not len(active):
+                        break
+                    given[active] += self.powers[remove_random(active)]
+                # Takılan oyunlar burada biter; sonraki köyler yalnızca devam edenlere uygulanır
+                stuck |= given < REQUIRED_POWER
+                sacrificed += given
+            elif rule == RULE_BAG_LIMIT:
+                # Fazla öğeler sırayla, her seferinde kalanlar arasından seçilir
+                while True:
+                    active = np.flatnonzero((sizes > BAG_LIMIT) & ~stuck)
+                    if not len(active):
+                        break
+                    remove_random(active)
+
+            playing = ~stuck
+            for item_id in items:
+                full = np.flatnonzero((sizes >= self.capacity) & playing)
+                if len(full):
+                    remove_random(full)
+                counts[playing, item_id] += 1
+                sizes[playing] += 1
+
+        total_power = counts.astype(np.int64) @ self.powers
+        return SimulationResult(counts, total_power, sacrificed, draws, stuck)
+
+
+class _Stuck(Exception):
+    """Kristalköy'de çanta gereken güce ulaşamadan boşaldı; oyun ilerleyemez"""
+
+
+class AutoPlayerIO:
+    """Game'i BatchSimulator ile aynı rastgele politikayla oynatan giriş/çıkış sağlayıcısı"""
+
+    def __init__(self, seed: int = 0, game_number: int = 0):
+        self.seed = seed
+        self.game_number = game_number
+        self.draws = 0
+        self.game: Optional[Game] = None
+        self.stuck = False
+
+    def _draw(self) -> float:
+        u = _mix(self.seed, self.game_number, self.draws)
+        self.draws += 1
+        return u
+
+    def _bag_counts(self) -> List[int]:
+        catalog = self.game.catalog
+        counts = [0] * len(catalog)
+        for item in self.game.inventory:
+            counts[catalog.intern(item)] += 1
+        return counts
+
+    def _choose_name(self) -> str:
+        item_id = _pick_one(self._bag_counts(), self._draw())
+        return self.game.catalog.item(item_id).name
+
+    def _choose_numbers(self) -> str:
+        """Çanta sınırına inmek için çıkarılacak öğelerin listedeki numaraları"""
+        counts = self._bag_counts()
+        chosen = []
+        for _ in range(self.game.inventory.size - BAG_LIMIT):
+            item_id = _pick_one(counts, self._draw())
+            counts[item_id] -= 1
+            chosen.append(self.game.catalog.item(item_id).name.lower())
+        # Aynı isim birden fazla seçildiyse listedeki farklı sıralarını kullan
+        numbers = []
+        for number, item in enumerate(self.game.inventory.bst, 1):
+            key = item.name.lower()
+            if key in chosen:
+                chosen.remove(key)
+                numbers.append(str(number))
+        return " ".join(numbers)
+
+    def _puzzle_answer(self) -> str:
+        village = self.game.get_current_village()
+        previous = self.game._previous_village(village)
+        villages = [previous, village] if previous else [village]
+        return default_engine().make_puzzle(*villages).answers[0]
+
+    def read(self, prompt: str = "") -> str:
+        if prompt == PROMPT_MENU:
+            return "3" if self.game.get_current_village() else "7"
+        if prompt == PROMPT_CONTINUE:
+            return ""
+        if prompt == PROMPT_USE_ITEM and not self.game.inventory.size:
+            raise _Stuck()
+        if prompt in (PROMPT_REMOVE_ITEM, PROMPT_USE_ITEM):
+            return self._choose_name()
+        if prompt == PROMPT_ITEM_NUMBERS:
+            return self._choose_numbers()
+        if prompt == PROMPT_PUZZLE:
+            return self._puzzle_answer()
+        raise EOFError(f"Otomatik oyuncu bu istemi tanımıyor: {prompt!r}")
+
+    def write(self, text: str = ""):
+        pass
+
+    def write_lines(self, lines):
+        pass
+
+    def clear(self):
+        pass
+
+    def flush(self):
+        pass
+
+
+def play(game_factory, seed: int = 0, game_number: int = 0) -> Game:
+    """game_factory'nin oluşturduğu oyunu otomatik oyuncuyla sonuna kadar oynatır.
+
+    Kristalköy'de takılan oyun orada biter ve game.io.stuck True olur.
+    """
+    io = AutoPlayerIO(seed, game_number)
+    game = game_factory(io)
+    io.game = game
+    try:
+        game.show_menu()
+    except _Stuck:
+        io.stuck = True
+    return game
+
+
+def validate(game_factory=lambda io: Game(io=io), samples: int = 100, seed: int = 0) -> List[int]:
+    """Örnek oyunları hem Game ile hem simülasyonla oynatır; çantası ya da takılma
+    durumu farklı çıkan oyun numaralarını döndürür"""
+    reference = game_factory(None)
+    simulator = BatchSimulator(reference)
+    result = simulator.run(samples, seed)
+    mismatches = []
+    for game_number in range(samples):
+        game = play(game_factory, seed, game_number)
+        counts = [0] * simulator.item_types
+        for item in game.inventory:
+            counts[reference.catalog.intern(item)] += 1
+        if counts != result.counts[game_number].tolist() \
+                or game.io.stuck != bool(result.stuck[game_number]):
+            mismatches.append(game_number)
+    return mismatches
+
+
+def _main(argv):
+    games = int(argv[1]) if len(argv) > 1 else 1000000
+    simulator = BatchSimulator(Game())
+    start = time.perf_counter()
+    result = simulator.run(games, seed=1)
+    elapsed = time.perf_counter() - start
+    print(f"{games} oyun {elapsed:.2f} sn ({games / elapsed:,.0f} oyun/sn)")
+    for key, value in result.summary().items():
+        print(f"  {key}: {value}")
+    mismatches = validate(samples=200, seed=1)
+    print(f"Game ile doğrulama (200 oyun): {'uyumsuz ' + str(mismatches) if mismatches else 'hepsi aynı'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv))
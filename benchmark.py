@@ -0,0 +1,519 @@
+"""Veri yapıları ve oyun akışı için performans ölçümleri.
+
+Her ölçüm farklı boyutlarda (varsayılan 10 - 1.000.000 eleman) tekrarlanır ve
+işlem başına süre raporlanır. Boyut ile süre arasındaki ilişkiden (log-log
+eğimi) ölçeklenme üssü hesaplanır: O(1) ve O(log n) işlemler için bu değer
+0'a, O(n) işlemler için 1'e yakındır. Sonuçlar JSON olarak yazılır.
+
+Kayıtlı bir temel (baseline) dosyası verilirse sonuçlar onunla karşılaştırılır;
+üs belirgin şekilde artmışsa (ör. sıcak bir yola O(n) bir işlem girmişse) ya da
+işlem süresi kat kat uzamışsa program hata koduyla çıkar. Makineler arası hız
+farkını dengelemek için süreler basit bir Python döngüsünün süresine
+(kalibrasyon) oranlanarak karşılaştırılır.
+
+İşlem başına süre tekrarların en iyisidir; en kötü tekrar da raporlanır. En iyi
+tekrar tek seferlik duraklamaları (ör. ilk kullanımda kurulan bir indeks) gizler,
+bu yüzden her boyutta kurulumun hemen ardından tek bir işlem ayrıca ölçülür
+(ilk çağrı). Ölçüm sırasında çöp toplayıcı kapalıdır. İlk çağrı hem temel ölçümün belirgin katıysa hem de
+FIRST_CALL_MIN_SECONDS'tan uzunsa bu da gerileme sayılır.
+
+Bellek ölçümü, tracemalloc ile 1.000.000 öğelik (--quick ile 100.000) bir çantanın
+öğe başına kaç bayt tuttuğunu raporlar: aynı isimlerin tekrarlandığı bir çanta ve
+her öğenin farklı isimde olduğu bir çanta (en fazla 100.000 öğe). Öğe nesneleri
+ölçüme dahil değildir; yalnızca çantanın kendi yapıları sayılır.
+
+Kullanım:
+    python benchmark.py                       # tüm ölçümler, sonuçlar ekrana (JSON)
+    python benchmark.py --quick               # 100.000 elemana kadar
+    python benchmark.py --only avl_insert,queue
+    python benchmark.py --output sonuc.json --baseline benchmarks/baseline.json
+    python benchmark.py --quick --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from main import (AVLTree, Game, Inventory, InventoryLinkedList, Item, ScriptedIO,
+                  Village, VillageScheduler)
+from playthrough import PLAYTHROUGH_SCRIPT
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+QUICK_SIZES = [10, 100, 1000, 10000, 100000]
+
+# Ölçeklenme üssü küçük boyutlardaki sabit maliyetlerden etkilenmesin diye
+# yalnızca bu boyut ve üstü kullanılır
+FIT_MIN_SIZE = 1000
+
+# Gerileme eşikleri
+EXPONENT_TOLERANCE = 0.3
+TIME_RATIO_LIMIT = 3.0
+MEMORY_RATIO_LIMIT = 1.2
+# Tek işlemlik ölçüm gürültülüdür; yalnızca fark edilir duraklamalar yakalanır
+FIRST_CALL_RATIO_LIMIT = 20.0
+FIRST_CALL_MIN_SECONDS = 0.002
+
+DEFAULT_MEMORY_SIZE = 1000000
+QUICK_MEMORY_SIZE = 100000
+UNIQUE_MEMORY_SIZE = 100000  # Farklı isimli öğelerde isim indeksleri de büyür
+
+# Çantada aynı isimli öğeler tekrar eder; farklı ad sayısı sınırlıdır
+BAG_VOCABULARY = 1000
+
+# Aranan adlar her çalıştırmada aynı olsun diye sabit tohum
+SEARCH_SEED = 2024
+SEARCH_QUERIES = 100
+
+def _names(count: int) -> List[str]:
+    return [f"öğe{i:07d}" for i in range(count)]
+
+
+class Case:
+    """Tek bir ölçüm: setup(n) durumu kurar, run(durum, k) k işlemin süresini döndürür.
+
+    max_size'dan büyük boyutlar atlanır; sizes verilirse istenen boyutlar yerine
+    her zaman bu boyutlar kullanılır.
+    """
+
+    def __init__(self, name: str, description: str, setup: Callable, run: Callable,
+                 max_size: Optional[int] = None, sizes: Optional[List[int]] = None):
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.run = run
+        self.max_size = max_size
+        self.sizes = sizes
+
+
+def _avl_setup(n: int):
+    names = _names(n)
+    tree = AVLTree.from_sorted(Item(name, i % 20) for i, name in enumerate(names))
+    rng = random.Random(n)
+    return tree, names, rng
+
+
+def _avl_insert(state, k: int) -> float:
+    tree, names, rng = state
+    items = [Item(rng.choice(names) + "x", 1) for _ in range(k)]  # Ağaçta olmayan adlar
+    start = time.perf_counter()
+    for item in items:
+        tree.insert(item)
+    elapsed = time.perf_counter() - start
+    for item in items:
+        tree.delete(item.name)
+    return elapsed
+
+
+def _avl_search(state, k: int) -> float:
+    tree, names, rng = state
+    keys = [rng.choice(names) for _ in range(k)]
+    start = time.perf_counter()
+    for key in keys:
+        tree.search(key)
+    return time.perf_counter() - start
+
+
+def _avl_delete(state, k: int) -> float:
+    tree, names, rng = state
+    elapsed = 0.0
+    for _ in range(k):
+        item = tree.search(rng.choice(names))
+        start = time.perf_counter()
+        tree.delete(item.name)
+        elapsed += time.perf_counter() - start
+        tree.insert(item)
+    return elapsed
+
+
+def _inventory_setup(n: int):
+    vocabulary = [Item(name, i % 20 + 1) for i, name in enumerate(_names(min(n, BAG_VOCABULARY)))]
+    inventory = Inventory(max_capacity=n + 1)
+    rng = random.Random(n)
+    inventory.push_many(rng.choice(vocabulary) for _ in range(n))
+    return inventory, vocabulary, rng
+
+
+def _inventory_push(state, k: int) -> float:
+    inventory, vocabulary, rng = state
+    items = [rng.choice(vocabulary) for _ in range(k)]
+    elapsed = 0.0
+    for item in items:
+        start = time.perf_counter()
+        inventory.push(item)
+        elapsed += time.perf_counter() - start
+        inventory.pop()
+    return elapsed
+
+
+def _inventory_pop(state, k: int) -> float:
+    inventory, vocabulary, rng = state
+    elapsed = 0.0
+    for _ in range(k):
+        start = time.perf_counter()
+        item = inventory.pop()
+        elapsed += time.perf_counter() - start
+        inventory.push(item)
+    return elapsed
+
+
+def _inventory_use_item(state, k: int) -> float:
+    inventory, vocabulary, rng = state
+    items = [rng.choice(list(inventory.index.values())).item for _ in range(min(k, 100))]
+    items = [items[i % len(items)] for i in range(k)]
+    elapsed = 0.0
+    for item in items:
+        start = time.perf_counter()
+        inventory.use_item(item.name)
+        elapsed += time.perf_counter() - start
+        inventory.push(item)
+    return elapsed
+
+
+def _inventory_total_power(state, k: int) -> float:
+    inventory = state[0]
+    start = time.perf_counter()
+    for _ in range(k):
+        inventory.get_total_power()
+    return time.perf_counter() - start
+
+
+def _linked_list_setup(n: int):
+    linked_list = InventoryLinkedList()
+    names = _names(n)
+    # Azalan sırada eklenen öğeler hep başa eklenir, böylece kurulum O(n) olur
+    for i in range(n - 1, -1, -1):
+        linked_list.add_item(Item(names[i], i % 20))
+    return linked_list, names, random.Random(n)
+
+
+def _linked_list_add_item(state, k: int) -> float:
+    linked_list, names, rng = state
+    items = [Item(rng.choice(names) + "x", 1) for _ in range(k)]
+    start = time.perf_counter()
+    for item in items:
+        linked_list.add_item(item)
+    elapsed = time.perf_counter() - start
+    for item in items:
+        linked_list.remove_item(item.name)
+    return elapsed
+
+
+def _linked_list_remove_item(state, k: int) -> float:
+    linked_list, names, rng = state
+    elapsed = 0.0
+    for _ in range(k):
+        item = linked_list.find_item(rng.choice(names))
+        start = time.perf_counter()
+        linked_list.remove_item(item.name)
+        elapsed += time.perf_counter() - start
+        linked_list.add_item(item)
+    return elapsed
+
+
+def _queue_setup(n: int):
+    villages = [Village(f"Köy{i}") for i in range(n)]
+    return VillageScheduler(villages=villages), villages
+
+
+def _queue_cycle(state, k: int) -> float:
+    village_queue, _ = state
+    start = time.perf_counter()
+    for _ in range(k):
+        village_queue.enqueue(village_queue.dequeue())
+    return time.perf_counter() - start
+
+
+def _queue_update_setup(n: int):
+    rng = random.Random(n)
+    village_queue = VillageScheduler()
+    villages = [Village(f"Köy{i}") for i in range(n)]
+    for village in villages:
+        village_queue.enqueue(village, rng.random())
+    return village_queue, villages, rng
+
+
+def _queue_update(state, k: int) -> float:
+    village_queue, villages, rng = state
+    targets = [villages[rng.randrange(len(villages))] for _ in range(k)]
+    priorities = [rng.random() for _ in range(k)]
+    start = time.perf_counter()
+    for village, priority in zip(targets, priorities):
+        village_queue.update(village, priority)
+    return time.perf_counter() - start
+
+
+def _game_search_setup(n: int):
+    rng = random.Random(SEARCH_SEED)
+    items = [Item(name, i % 20 + 1) for i, name in enumerate(_names(max(3, n // 2)))]
+    villages = [Village(f"Köy{i}", rng.sample(items, 3)) for i in range(n)]
+    game = Game(io=ScriptedIO(()), villages=villages)
+    game.item_index  # Ters indeksin ilk kurulumu ölçüme dahil edilmez
+    # Yalnızca köylerde gerçekten bulunan adlar aranır
+    present = sorted({item.name for village in villages for item in village.inventory})
+    return game, rng.sample(present, min(SEARCH_QUERIES, len(present)))
+
+
+def _game_search_miss_setup(n: int):
+    game, names = _game_search_setup(n)
+    # Sona eklenen harf önek tamamlamasına uymaz; yakın yazım önerisi aranır
+    return game, [name + "x" for name in names]
+
+
+def _game_search(state, k: int) -> float:
+    game, names = state
+    inputs = []
+    for i in range(k):
+        inputs.extend(("2", names[i % len(names)]))
+    game.io = ScriptedIO(inputs)
+    start = time.perf_counter()
+    for _ in range(k):
+        game.search_item()
+    return time.perf_counter() - start
+
+
+def _playthrough_setup(n: int):
+    return None
+
+
+def _playthrough(state, k: int) -> float:
+    start = time.perf_counter()
+    for _ in range(k):
+        Game(ScriptedIO(PLAYTHROUGH_SCRIPT)).show_menu()
+    return time.perf_counter() - start
+
+
+CASES = [
+    Case("avl_insert", "AVLTree.insert", _avl_setup, _avl_insert),
+    Case("avl_search", "AVLTree.search", _avl_setup, _avl_search),
+    Case("avl_delete", "AVLTree.delete", _avl_setup, _avl_delete),
+    Case("inventory_push", "Inventory.push", _inventory_setup, _inventory_push),
+    Case("inventory_pop", "Inventory.pop (son öğe)", _inventory_setup, _inventory_pop),
+    Case("inventory_use_item", "Inventory.use_item", _inventory_setup, _inventory_use_item),
+    Case("inventory_total_power", "Inventory.get_total_power", _inventory_setup, _inventory_total_power),
+    # Sıralı bağlı liste işlemleri O(n) olduğundan büyük boyutlar çok uzun sürer
+    Case("linked_list_add_item", "InventoryLinkedList.add_item", _linked_list_setup,
+         _linked_list_add_item, max_size=10000),
+    Case("linked_list_remove_item", "InventoryLinkedList.remove_item", _linked_list_setup,
+         _linked_list_remove_item, max_size=10000),
+    Case("queue", "VillageScheduler.enqueue + dequeue", _queue_setup, _queue_cycle),
+    Case("queue_update", "VillageScheduler.update", _queue_update_setup, _queue_update),
+    Case("game_search_hit", "Game.search_item (köylerde bulunan ad, n köy)",
+         _game_search_setup, _game_search),
+    Case("game_search_miss", "Game.search_item (yanlış yazılmış ad, öneriyle, n köy)",
+         _game_search_miss_setup, _game_search),
+    Case("playthrough", "Varsayılan dünyada baştan sona oyun", _playthrough_setup, _playthrough,
+         sizes=[7]),
+]
+
+
+def calibrate() -> float:
+    """Makine hızının ölçüsü: basit bir Python döngüsünün en iyi süresi (sn)"""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        total = 0
+        for i in range(200000):
+            total += i
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def fit_exponent(sizes: List[int], times: List[float]) -> Optional[float]:
+    """log(süre) = a + b log(n) doğrusunun eğimini (b) en küçük kareler ile bulur"""
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, times)
+              if n >= FIT_MIN_SIZE and t is not None and t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return covariance / variance
+
+
+def _complexity(exponent: Optional[float]) -> Optional[str]:
+    if exponent is None:
+        return None
+    # Önbellek etkileri nedeniyle O(log n) işlemlerin üssü de 0.3 civarına çıkabilir
+    if exponent < 0.5:
+        return "O(1) / O(log n)"
+    if exponent < 0.8:
+        return "alt doğrusal"
+    if exponent < 1.4:
+        return "O(n)"
+    return "O(n^2) veya daha kötü"
+
+
+def run_case(case: Case, sizes: List[int], operations: int, repeats: int) -> Dict:
+    measured_sizes = []
+    seconds = []
+    worst_seconds = []
+    first_seconds = []
+    for n in case.sizes or sizes:
+        if case.max_size is not None and n > case.max_size:
+            continue
+        state = case.setup(n)
+        # Oyunun tamamı uzun sürdüğünden daha az tekrarlanır
+        count = operations if case.sizes is None else max(1, operations // 20)
+        # timeit gibi ölçüm sırasında çöp toplayıcı kapatılır; büyük yığınlarda
+        # tek bir toplama tek tekrarlık (--repeats 1) ölçümü kat kat uzatabilir
+        gc.collect()
+        gc.disable()
+        try:
+            first = case.run(state, 1)  # Kurulumdan hemen sonraki tek işlem
+            times = [case.run(state, count) / count for _ in range(repeats)]
+        finally:
+            gc.enable()
+        best, worst = min(times), max(times)
+        measured_sizes.append(n)
+        seconds.append(best)
+        worst_seconds.append(worst)
+        first_seconds.append(first)
+        print(f"  {case.name:<24} n={n:<8} {best * 1e6:10.3f} µs/işlem"
+              f"  (en kötü {worst * 1e6:.3f}, ilk çağrı {first * 1e6:.3f} µs)", file=sys.stderr)
+    exponent = fit_exponent(measured_sizes, seconds)
+    return {
+        "description": case.description,
+        "sizes": measured_sizes,
+        "seconds_per_op": seconds,
+        "max_seconds_per_op": worst_seconds,
+        "first_call_seconds": first_seconds,
+        "exponent": exponent,
+        "complexity": _complexity(exponent),
+    }
+
+
+def measure_memory(n: int, distinct: int) -> Dict:
+    """n öğelik çantanın (distinct farklı isim) öğe başına bellek kullanımını ölçer"""
+    vocabulary = [Item(name, i % 20 + 1) for i, name in enumerate(_names(distinct))]
+    items = [vocabulary[i % distinct] for i in range(n)]
+    tracemalloc.start()
+    try:
+        inventory = Inventory(max_capacity=n)
+        inventory.push_many(items)
+        # Öneri indeksi de ölçüme girsin diye en az bir öneri istenir
+        inventory.names.suggest(items[0].name + "x")
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del inventory
+    bytes_per_item = size / n
+    print(f"  bellek: {n} öğe, {distinct} farklı isim  {bytes_per_item:8.1f} bayt/öğe", file=sys.stderr)
+    return {"items": n, "distinct": distinct, "bytes_per_item": bytes_per_item}
+
+
+def run(sizes: List[int], only: Optional[List[str]] = None, operations: int = 2000,
+        repeats: int = 3, memory_size: int = DEFAULT_MEMORY_SIZE) -> Dict:
+    results = {}
+    for case in CASES:
+        if only and case.name not in only:
+            continue
+        results[case.name] = run_case(case, sizes, operations, repeats)
+    memory = {}
+    if not only or "memory" in only:
+        memory["repeated"] = measure_memory(memory_size, BAG_VOCABULARY)
+        unique_size = min(memory_size, UNIQUE_MEMORY_SIZE)
+        memory["unique"] = measure_memory(unique_size, unique_size)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "calibration": calibrate(),
+        "operations": operations,
+        "results": results,
+        "memory": memory,
+    }
+
+
+def compare(report: Dict, baseline: Dict) -> List[str]:
+    """Sonuçları temel ölçümle karşılaştırır; gerileme mesajlarını döndürür"""
+    problems = []
+    scale = report["calibration"] / baseline["calibration"]
+    for name, base in baseline["results"].items():
+        current = report["results"].get(name)
+        if current is None:
+            continue
+        if base["exponent"] is not None and current["exponent"] is not None \
+                and current["exponent"] > base["exponent"] + EXPONENT_TOLERANCE:
+            problems.append(f"{name}: ölçeklenme üssü {base['exponent']:.2f} -> "
+                            f"{current['exponent']:.2f} ({current['complexity']})")
+        base_times = dict(zip(base["sizes"], base["seconds_per_op"]))
+        for n, seconds in zip(current["sizes"], current["seconds_per_op"]):
+            # Küçük boyutlardaki ölçümler gürültülüdür
+            if n < FIT_MIN_SIZE and base["exponent"] is not None:
+                continue
+            expected = base_times.get(n)
+            if expected and seconds / (expected * scale) > TIME_RATIO_LIMIT:
+                problems.append(f"{name}: n={n} için işlem süresi {expected * 1e6:.3f} -> "
+                                f"{seconds * 1e6:.3f} µs (kalibrasyona göre "
+                                f"{seconds / (expected * scale):.1f} kat)")
+        # Eski temel dosyalarda ilk çağrı ölçümü yoktur
+        base_first = dict(zip(base["sizes"], base.get("first_call_seconds", ())))
+        for n, first in zip(current["sizes"], current["first_call_seconds"]):
+            expected = base_first.get(n)
+            if expected and first > FIRST_CALL_MIN_SECONDS \
+                    and first / (expected * scale) > FIRST_CALL_RATIO_LIMIT:
+                problems.append(f"{name}: n={n} için ilk çağrı {expected * 1e6:.3f} -> "
+                                f"{first * 1e6:.3f} µs (kalibrasyona göre "
+                                f"{first / (expected * scale):.1f} kat)")
+    for name, base in baseline.get("memory", {}).items():
+        current = report.get("memory", {}).get(name)
+        if current is None or current["items"] != base["items"]:
+            continue
+        if current["bytes_per_item"] > base["bytes_per_item"] * MEMORY_RATIO_LIMIT:
+            problems.append(f"bellek ({name}): öğe başına {base['bytes_per_item']:.1f} -> "
+                            f"{current['bytes_per_item']:.1f} bayt")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Köy Kurtarma Oyunu performans ölçümleri")
+    parser.add_argument("--sizes", help="virgülle ayrılmış boyutlar (ör. 10,1000,100000)")
+    parser.add_argument("--quick", action="store_true", help="en fazla 100.000 eleman")
+    parser.add_argument("--only", help="yalnızca bu ölçümler (virgülle ayrılmış, bellek için memory)")
+    parser.add_argument("--memory-size", type=int, help="bellek ölçümündeki öğe sayısı")
+    parser.add_argument("--operations", type=int, default=2000, help="boyut başına işlem sayısı")
+    parser.add_argument("--repeats", type=int, default=3, help="tekrar sayısı (en iyisi alınır)")
+    parser.add_argument("--output", help="JSON sonuç dosyası (verilmezse ekrana yazılır)")
+    parser.add_argument("--baseline", help="karşılaştırılacak temel ölçüm dosyası")
+    parser.add_argument("--save-baseline", help="sonuçları temel ölçüm olarak bu dosyaya yaz")
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    else:
+        sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+    only = args.only.split(",") if args.only else None
+
+    memory_size = args.memory_size or (QUICK_MEMORY_SIZE if args.quick else DEFAULT_MEMORY_SIZE)
+    report = run(sizes, only, args.operations, args.repeats, memory_size)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline)
+        if problems:
+            print("\n!!! PERFORMANS GERİLEMESİ !!!", file=sys.stderr)
+            for problem in problems:
+                print(f"  - {problem}", file=sys.stderr)
+            return 1
+        print("Temel ölçüme göre gerileme yok.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
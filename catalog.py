@@ -0,0 +1,164 @@
+"""Öğe kataloğu: her öğe türüne küçük bir tamsayı numara (ID) verir.
+
+Öğeler (ad, güç) çiftine göre bir kez kaydedilir; güçler numaraya göre sıralı
+bir dizide tutulur. Böylece bir köyün veya çantanın içeriği iki biçimde
+gösterilebilir:
+
+- ID vektörü: array("H") (veya NumPy dizisi), her öğe için numarası
+- Adet vektörü: katalog uzunluğunda, her numaradan kaç tane olduğu
+
+Toplam güç, üyelik ve köyler arası karşılaştırmalar bu vektörler üzerinde
+yapılır. NumPy kuruluysa işlemler vektörel çalışır; kurulu değilse aynı
+sonuçlar düz Python döngüleriyle hesaplanır.
+"""
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy isteğe bağlıdır
+    np = None
+
+if TYPE_CHECKING:
+    from main import Inventory, Item, Village
+
+# array("H") en fazla 65536 farklı numara tutabilir
+MAX_ITEM_TYPES = 1 << 16
+
+
+class ItemCatalog:
+    """Öğe türlerini numaralandıran ve güçlerini paralel dizide tutan katalog"""
+
+    def __init__(self, items: Iterable["Item"] = ()):
+        self.items: List["Item"] = []
+        self.powers = array("i")
+        self._ids: Dict[Tuple[str, int], int] = {}
+        self._name_ids: Dict[str, int] = {}  # Küçük harfli ad -> ilk numara
+        self._numpy_powers = None
+        for item in items:
+            self.intern(item)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def intern(self, item: "Item") -> int:
+        """Öğenin numarasını döndürür; öğe türü yoksa kataloğa ekler"""
+        key = (item.name, item.power)
+        item_id = self._ids.get(key)
+        if item_id is None:
+            item_id = len(self.items)
+            if item_id >= MAX_ITEM_TYPES:
+                raise ValueError("Katalog dolu: en fazla 65536 öğe türü desteklenir")
+            self._ids[key] = item_id
+            self._name_ids.setdefault(item.name.lower(), item_id)
+            self.items.append(item)
+            self.powers.append(item.power)
+            self._numpy_powers = None
+        return item_id
+
+    def id_of(self, item_name: str) -> Optional[int]:
+        """Ada göre (büyük/küçük harf duyarsız) öğe numarasını döndürür"""
+        return self._name_ids.get(item_name.lower())
+
+    def item(self, item_id: int) -> "Item":
+        return self.items[item_id]
+
+    def numpy_powers(self):
+        """Güç dizisinin NumPy kopyası (katalog değişene kadar önbellekte tutulur)"""
+        if np is None:
+            raise RuntimeError("Bu işlem için NumPy gerekli")
+        if self._numpy_powers is None or len(self._numpy_powers) != len(self.powers):
+            self._numpy_powers = np.frombuffer(self.powers, dtype=np.int32).copy()
+        return self._numpy_powers
+
+    # Vektör oluşturma
+
+    def id_vector(self, items: Iterable["Item"]) -> array:
+        """Öğelerin numaralarından oluşan array("H") döndürür"""
+        return array("H", (self.intern(item) for item in items))
+
+    def count_vector(self, items: Iterable["Item"]) -> array:
+        """Katalog uzunluğunda, her öğe türünden kaç tane olduğunu tutan array("I")"""
+        ids = [self.intern(item) for item in items]
+        counts = array("I", bytes(4 * len(self.items)))
+        for item_id in ids:
+            counts[item_id] += 1
+        return counts
+
+    def village_counts(self, village: "Village") -> array:
+        """Köyün adet vektörü; köyün AVL ağacını kurmadan hesaplanır"""
+        pairs = [(self.intern(item), count) for item, count in village.item_counts()]
+        counts = array("I", bytes(4 * len(self.items)))
+        for item_id, count in pairs:
+            counts[item_id] += count
+        return counts
+
+    def bag_ids(self, inventory: "Inventory") -> array:
+        """Çantanın eklenme sırasındaki ID vektörü"""
+        return self.id_vector(inventory)
+
+    def village_matrix(self, villages: Iterable["Village"]):
+        """Köyler x öğe türleri adet matrisi.
+
+        NumPy kuruluysa int32 matris, değilse katalog uzunluğunda array("I")
+        satırlarından oluşan liste döndürülür; ikisi de matrix[köy][öğe] ile okunur.
+        """
+        rows = [self.village_counts(village) for village in villages]
+        if np is None:
+            width = len(self.items)
+            for row in rows:
+                row.extend(array("I", bytes(4 * (width - len(row)))))
+            return rows
+        matrix = np.zeros((len(rows), len(self.items)), dtype=np.int32)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = np.frombuffer(row, dtype=np.uint32)
+        return matrix
+
+    # Vektör işlemleri
+
+    def _padded(self, counts):
+        """Katalog büyüdüyse kısa kalmış adet vektörünü NumPy dizisine çevirip uzatır"""
+        if np is None:
+            raise RuntimeError("Bu işlem için NumPy gerekli")
+        vector = np.asarray(counts, dtype=np.int64)
+        if len(vector) < len(self.items):
+            vector = np.concatenate([vector, np.zeros(len(self.items) - len(vector), dtype=np.int64)])
+        return vector
+
+    def total_power(self, ids) -> int:
+        """ID vektöründeki öğelerin toplam gücü"""
+        if np is not None:
+            return int(self.numpy_powers()[np.asarray(ids, dtype=np.intp)].sum())
+        powers = self.powers
+        return sum(powers[item_id] for item_id in ids)
+
+    def counts_power(self, counts) -> int:
+        """Adet vektörünün toplam gücü (adet ve güç vektörlerinin iç çarpımı)"""
+        if np is not None:
+            powers = self.numpy_powers()[:len(counts)].astype(np.int64)
+            return int(np.dot(np.asarray(counts, dtype=np.int64), powers))
+        powers = self.powers
+        return sum(count * powers[item_id] for item_id, count in enumerate(counts) if count)
+
+    def contains(self, counts, item_name: str) -> bool:
+        """Adet vektöründe verilen addan en az bir öğe var mı"""
+        item_id = self.id_of(item_name)
+        return item_id is not None and item_id < len(counts) and counts[item_id] > 0
+
+    def common(self, counts_a, counts_b) -> List["Item"]:
+        """İki adet vektöründe ortak bulunan öğe türleri"""
+        if np is not None:
+            a = self._padded(counts_a)
+            b = self._padded(counts_b)
+            return [self.items[i] for i in np.flatnonzero((a > 0) & (b > 0))]
+        return [self.items[i] for i in range(min(len(counts_a), len(counts_b)))
+                if counts_a[i] and counts_b[i]]
+
+    def difference(self, counts_a, counts_b) -> List["Item"]:
+        """Birinci vektörde olup ikincide olmayan öğe türleri"""
+        if np is not None:
+            a = self._padded(counts_a)
+            b = self._padded(counts_b)
+            return [self.items[i] for i in np.flatnonzero((a > 0) & (b == 0))]
+        return [self.items[i] for i, count in enumerate(counts_a)
+                if count and (i >= len(counts_b) or not counts_b[i])]
@@ -0,0 +1,163 @@
+"""Veri yapıları için isteğe bağlı işlem sayaçları.
+
+Sayaçlar main.enable_counters() ile açılır. Kapalıyken veri yapılarının sıcak
+yollarında yalnızca tek bir "sayaç var mı" kontrolü kalır. Açıkken sayılan
+değerler o sırada çalışan oyun eylemine (list_villages, liberate_village, ...)
+yazılır; eylem dışındaki işlemler "genel" başlığında toplanır.
+
+Sayılan değerler:
+    avl.rotations     AVL döndürme sayısı
+    avl.comparisons   anahtar karşılaştırma sayısı
+    avl.visits        ziyaret edilen düğüm sayısı
+    avl.height        görülen en büyük ağaç yüksekliği
+    inventory.steps   çanta bağlı listesinde ilerleme adımı
+    linked_list.steps InventoryLinkedList'te ilerleme adımı
+    queue.enqueue / queue.dequeue / queue.peek / queue.update / queue.remove
+
+track_memory=True verilirse her eylemin tracemalloc ile ayırdığı bellek ve en
+çok bellek ayıran satırlar da kaydedilir (yavaştır, yalnızca tanı içindir).
+
+Kullanım:
+    import main
+    counters = main.enable_counters(track_memory=True)
+    main.Game(io=main.ScriptedIO([...])).show_menu()
+    main.disable_counters()
+    print(counters.to_json())
+    print(counters.allocation_report())
+"""
+import json
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+GENERAL = "genel"
+
+# En büyük değeri tutulan sayaçlar (toplanmaz)
+_MAXIMUM_COUNTERS = {"avl.height"}
+
+
+class _ActionStats:
+    def __init__(self):
+        self.calls = 0
+        self.counters: Dict[str, int] = {}
+        self.allocated_bytes = 0
+        self.peak_bytes = 0
+        self.allocation_sites: Dict[str, int] = {}  # "dosya:satır" -> bayt
+
+    def as_dict(self) -> dict:
+        data = {"calls": self.calls, "counters": dict(sorted(self.counters.items()))}
+        if self.allocation_sites or self.allocated_bytes or self.peak_bytes:
+            data["allocated_bytes"] = self.allocated_bytes
+            data["peak_bytes"] = self.peak_bytes
+        return data
+
+
+class Counters:
+    """Eylemlere göre gruplanmış işlem sayaçları"""
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.actions: Dict[str, _ActionStats] = {GENERAL: _ActionStats()}
+        self._stack = []
+        self._current = self.actions[GENERAL].counters
+        self._started_tracemalloc = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def add(self, name: str, amount: int = 1):
+        counters = self._current
+        counters[name] = counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: int):
+        """En büyük değeri tutulan sayacı günceller (ör. ağaç yüksekliği)"""
+        counters = self._current
+        if value > counters.get(name, 0):
+            counters[name] = value
+
+    @contextmanager
+    def action(self, name: str, step: bool = False):
+        """Blok içindeki işlemleri verilen eyleme yazar; iç içe eylemler desteklenir.
+
+        step=True ise blok, parçalar halinde çalışan bir eylemin (ör. girdi
+        bekleyen bir akışın) sonraki adımıdır ve çağrı sayısı artırılmaz.
+        """
+        stats = self.actions.get(name)
+        if stats is None:
+            stats = self.actions[name] = _ActionStats()
+        if not step:
+            stats.calls += 1
+        self._stack.append(self._current)
+        self._current = stats.counters
+        before = None
+        if self.track_memory:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            start_size = tracemalloc.get_traced_memory()[0]
+        try:
+            yield stats
+        finally:
+            if before is not None:
+                size, peak = tracemalloc.get_traced_memory()
+                stats.peak_bytes = max(stats.peak_bytes, peak - start_size)
+                self._record_allocations(stats, before)
+            self._current = self._stack.pop()
+
+    def _record_allocations(self, stats: _ActionStats, before):
+        after = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),
+             tracemalloc.Filter(False, __file__)))
+        for stat in after.compare_to(before, "lineno"):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            site = f"{frame.filename}:{frame.lineno}"
+            stats.allocation_sites[site] = stats.allocation_sites.get(site, 0) + stat.size_diff
+            stats.allocated_bytes += stat.size_diff
+
+    def totals(self) -> Dict[str, int]:
+        """Tüm eylemlerdeki sayaçların toplamı"""
+        result: Dict[str, int] = {}
+        for stats in self.actions.values():
+            for name, value in stats.counters.items():
+                if name in _MAXIMUM_COUNTERS:
+                    result[name] = max(result.get(name, 0), value)
+                else:
+                    result[name] = result.get(name, 0) + value
+        return dict(sorted(result.items()))
+
+    def as_dict(self) -> dict:
+        return {
+            "actions": {name: stats.as_dict() for name, stats in self.actions.items()
+                        if stats.calls or stats.counters},
+            "totals": self.totals(),
+        }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Sayaçları JSON olarak döndürür; path verilirse dosyaya da yazar"""
+        text = json.dumps(self.as_dict(), indent=2, ensure_ascii=False)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        return text
+
+    def allocation_report(self, limit: int = 5) -> str:
+        """Her eylem için en çok bellek ayıran satırları metin olarak döndürür"""
+        if not self.track_memory:
+            return "Bellek izleme kapalı (track_memory=True ile açın)."
+        lines = []
+        for name, stats in self.actions.items():
+            if not stats.calls:
+                continue
+            lines.append(f"{name}: {stats.calls} çağrı, {stats.allocated_bytes / 1024:.1f} KiB ayrıldı, "
+                         f"tepe {stats.peak_bytes / 1024:.1f} KiB")
+            top = sorted(stats.allocation_sites.items(), key=lambda site: site[1], reverse=True)
+            for site, size in top[:limit]:
+                lines.append(f"    {size / 1024:8.1f} KiB  {site}")
+        return "\n".join(lines)
+
+    def close(self):
+        """Bu nesnenin başlattığı bellek izlemeyi durdurur"""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
@@ -1,9 +1,97 @@
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 import sys
-import os
-from collections import deque
+import queue
+import heapq
+import functools
+
+from catalog import ItemCatalog
+from instrumentation import Counters
+from name_index import NameIndex
+from puzzle import default_engine
+from render import Screen
+from sacrifice_solver import solve_sacrifice
+
+# Oyunun sorduğu istemler; otomatik oyuncular bu sabitlerle istemleri tanır
+PROMPT_MENU = "\nSeçiminiz (1-7): "
+PROMPT_CONTINUE = "\nDevam etmek için Enter'a basın..."
+PROMPT_ITEM_ACTION = "\nSeçiminiz (1-2): "
+PROMPT_ITEM_ACTION_HISTORY = "\nSeçiminiz (1-4): "
+PROMPT_SEARCH_TARGET = "Seçiminiz (1-2): "
+PROMPT_SEARCH_NAME = "Aranacak öğenin adını girin: "
+PROMPT_REMOVE_ITEM = "\nÇıkarmak istediğiniz öğenin adını girin: "
+PROMPT_USE_ITEM = "\nKullanmak istediğiniz öğenin adını girin: "
+PROMPT_PUZZLE = "\nBulmacanın cevabını girin (büyük harflerle): "
+PROMPT_ITEM_NUMBERS = "\nÇıkarmak istediğiniz ürünlerin numaralarını boşlukla ayırarak girin (1-10): "
+
+# Köy kuralları; kural köye bağlıdır, kurtarılma sırasına değil
+RULE_NORMAL = "normal"
+RULE_SACRIFICE = "sacrifice"  # Casusa en az 7 güç puanı verilmeli (Kristalköy)
+RULE_PUZZLE = "puzzle"  # Kapıdaki bulmaca çözülmeli (Zümrütvadi)
+RULE_BAG_LIMIT = "bag_limit"  # Çantada en fazla 7 öğe kalmalı (Elmasşehir)
+RULES = (RULE_NORMAL, RULE_SACRIFICE, RULE_PUZZLE, RULE_BAG_LIMIT)
+RULE_DIFFICULTY = {RULE_NORMAL: 0, RULE_PUZZLE: 1, RULE_BAG_LIMIT: 2, RULE_SACRIFICE: 3}
+# Kuralı belirtilmemiş köyler dünyadaki yerlerine göre eski kuralları alır
+DEFAULT_RULES = {4: RULE_SACRIFICE, 5: RULE_PUZZLE, 6: RULE_BAG_LIMIT}
+
+# İşlem sayaçları; kapalıyken None olur ve sıcak yollarda yalnızca bu kontrol yapılır
+_counters: Optional[Counters] = None
+
+def enable_counters(track_memory: bool = False) -> Counters:
+    """İşlem sayaçlarını açar ve sayaç nesnesini döndürür"""
+    global _counters
+    _counters = Counters(track_memory)
+    return _counters
+
+def disable_counters() -> Optional[Counters]:
+    """Sayaçları kapatır; toplanan sayaçları döndürür"""
+    global _counters
+    counters, _counters = _counters, None
+    if counters is not None:
+        counters.close()
+    return counters
+
+def _counted_action(method):
+    """Sayaçlar açıkken metod içindeki işlemleri metodun adıyla gruplar"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _counters is None:
+            return method(self, *args, **kwargs)
+        with _counters.action(name):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _counted_flow(name: str, flow):
+    """Etkileşimli akışı (üreteç) sayaçlar açıkken verilen eylem adıyla gruplar.
+
+    Eylem bağlamı yalnızca akışın bir sonraki isteme kadar çalıştığı adım
+    boyunca açıktır; istem beklenirken kapalıdır. Böylece aynı süreçte sırayla
+    ilerleyen oturumların (ör. sunucuda) işlemleri birbirinin eylemine yazılmaz.
+    """
+    if _counters is None:
+        return (yield from flow)
+    answer = None
+    step = False
+    try:
+        while True:
+            counters = _counters
+            try:
+                if counters is None:
+                    prompt = flow.send(answer)
+                else:
+                    with counters.action(name, step=step):
+                        prompt = flow.send(answer)
+            except StopIteration as stop:
+                return stop.value
+            step = True
+            answer = yield prompt
+    finally:
+        flow.close()
 
 class Item:
+    __slots__ = ("name", "power")
+
     def __init__(self, name: str, power: int = 0):
         self.name = name
         self.power = power
@@ -12,16 +100,49 @@ class Item:
         return f"{self.name} (Güç: {self.power})"
 
 class Node:
+    # Düğümler yığının büyük kısmını oluşturduğundan örnek başına __dict__ tutulmaz
+    __slots__ = ("item", "key", "left", "right", "height", "count", "size",
+                 "power_sum", "min_power", "max_power")
+
     def __init__(self, item: Item):
         self.item = item
+        self.key = item.name.lower()  # Karşılaştırma anahtarı bir kez hesaplanır
         self.left = None
         self.right = None
         self.height = 1  # AVL için yükseklik bilgisi eklendi
+        self.count = 1  # Aynı isimli öğeden kaç tane var
+        self.size = 1  # Alt ağaçtaki toplam öğe sayısı (tekrarlar dahil)
+        # Alt ağaçtaki güç toplamı, en küçük ve en büyük güç
+        self.power_sum = item.power
+        self.min_power = item.power
+        self.max_power = item.power
 
 class AVLTree:
+    """Öğe adına göre sıralı, aynı isimli öğeleri tek düğümde sayan AVL ağacı"""
+
     def __init__(self):
         self.root = None
-        self.items = []  # Öğeleri takip etmek için liste eklendi
+
+    def __len__(self) -> int:
+        return self.root.size if self.root else 0
+
+    def __iter__(self):
+        """Öğeleri alfabetik sırada, tekrarlarıyla birlikte döndürür"""
+        for item, count in self.counts():
+            for _ in range(count):
+                yield item
+
+    def counts(self):
+        """(öğe, adet) çiftlerini alfabetik sırada döndürür"""
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.item, node.count
+            node = node.right
 
     def get_height(self, node: Node) -> int:
         if not node:
@@ -33,138 +154,450 @@ class AVLTree:
             return 0
         return self.get_height(node.left) - self.get_height(node.right)
 
+    def _update(self, node: Node):
+        """Düğümün yüksekliğini, alt ağaç boyutunu ve güç özetlerini çocuklarından hesaplar"""
+        left = node.left
+        right = node.right
+        power = node.item.power
+        size = node.count
+        power_sum = power * size
+        min_power = max_power = power
+        left_height = right_height = 0
+        if left:
+            left_height = left.height
+            size += left.size
+            power_sum += left.power_sum
+            if left.min_power < min_power:
+                min_power = left.min_power
+            if left.max_power > max_power:
+                max_power = left.max_power
+        if right:
+            right_height = right.height
+            size += right.size
+            power_sum += right.power_sum
+            if right.min_power < min_power:
+                min_power = right.min_power
+            if right.max_power > max_power:
+                max_power = right.max_power
+        node.height = (left_height if left_height > right_height else right_height) + 1
+        node.size = size
+        node.power_sum = power_sum
+        node.min_power = min_power
+        node.max_power = max_power
+
     def right_rotate(self, y: Node) -> Node:
+        if _counters is not None:
+            _counters.add("avl.rotations")
         x = y.left
         T2 = x.right
 
         x.right = y
         y.left = T2
 
-        y.height = max(self.get_height(y.left), self.get_height(y.right)) + 1
-        x.height = max(self.get_height(x.left), self.get_height(x.right)) + 1
+        self._update(y)
+        self._update(x)
 
         return x
 
     def left_rotate(self, x: Node) -> Node:
+        if _counters is not None:
+            _counters.add("avl.rotations")
         y = x.right
         T2 = y.left
 
         y.left = x
         x.right = T2
 
-        x.height = max(self.get_height(x.left), self.get_height(x.right)) + 1
-        y.height = max(self.get_height(y.left), self.get_height(y.right)) + 1
+        self._update(x)
+        self._update(y)
 
         return y
 
-    def insert(self, item: Item):
-        self.root = self._insert(self.root, item)
-        self.items.append(item)  # Öğeyi listeye ekle
-
-    def _insert(self, node: Node, item: Item) -> Node:
-        if not node:
-            return Node(item)
-
-        if item.name.lower() < node.item.name.lower():
-            node.left = self._insert(node.left, item)
-        else:
-            node.right = self._insert(node.right, item)
-
-        node.height = max(self.get_height(node.left), self.get_height(node.right)) + 1
-
-        balance = self.get_balance(node)
-
-        # Sol Sol Durumu
-        if balance > 1 and item.name.lower() < node.left.item.name.lower():
-            return self.right_rotate(node)
-
-        # Sağ Sağ Durumu
-        if balance < -1 and item.name.lower() > node.right.item.name.lower():
-            return self.left_rotate(node)
-
-        # Sol Sağ Durumu
-        if balance > 1 and item.name.lower() > node.left.item.name.lower():
-            node.left = self.left_rotate(node.left)
+    def _rebalance(self, node: Node) -> Node:
+        """Düğümün özet bilgilerini günceller, gerekiyorsa döndürerek dengeler"""
+        left = node.left
+        right = node.right
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        balance = left_height - right_height
+
+        if balance > 1:
+            # Sol Sağ Durumu
+            if self.get_balance(left) < 0:
+                node.left = self.left_rotate(left)
+            # Sol Sol Durumu
             return self.right_rotate(node)
 
-        # Sağ Sol Durumu
-        if balance < -1 and item.name.lower() < node.right.item.name.lower():
-            node.right = self.right_rotate(node.right)
+        if balance < -1:
+            # Sağ Sol Durumu
+            if self.get_balance(right) > 0:
+                node.right = self.right_rotate(right)
+            # Sağ Sağ Durumu
             return self.left_rotate(node)
 
+        self._update(node)
         return node
 
-    def search(self, item_name: str) -> Optional[Item]:
-        return self._search(self.root, item_name)
+    def _fix_path(self, path: list, child: Optional[Node]) -> Optional[Node]:
+        """Yol yığınını alttan yukarı çözerek bağlantıları ve dengeyi günceller.
 
-    def _search(self, node: Node, item_name: str) -> Optional[Item]:
-        if not node:
-            return None
+        path (düğüm, sola_gidildi) çiftlerinden oluşur; child yolun en altına
+        bağlanacak alt ağaçtır. Yeni kök döndürülür.
+        """
+        while path:
+            node, went_left = path.pop()
+            if went_left:
+                node.left = child
+            else:
+                node.right = child
+            child = self._rebalance(node)
+        return child
+
+    def _count_descent(self, key: str):
+        """Sayaçlar açıkken anahtara inen yoldaki ziyaret ve karşılaştırmaları sayar.
+
+        Yol ayrıca yürünür; böylece sayaçlar kapalıyken arama döngülerine ek
+        iş eklenmez.
+        """
+        visits = comparisons = 0
+        node = self.root
+        while node:
+            visits += 1
+            comparisons += 1
+            if key == node.key:
+                break
+            comparisons += 1
+            node = node.left if key < node.key else node.right
+        _counters.add("avl.visits", visits)
+        _counters.add("avl.comparisons", comparisons)
+        _counters.observe("avl.height", self.root.height if self.root else 0)
+
+    def insert(self, item: Item, new_node: Optional[Node] = None):
+        """Öğeyi ekler; ad ağaçta yoksa new_node (varsayılan: yeni Node) bağlanır"""
+        key = item.name.lower()
+        if _counters is not None:
+            self._count_descent(key)
+        path = []
+        node = self.root
+        while node:
+            if key == node.key:
+                # Aynı isimli öğe varsa sadece sayısını artır
+                node.count += 1
+                self._update(node)
+                self.root = self._fix_path(path, node)
+                return
+            went_left = key < node.key
+            path.append((node, went_left))
+            node = node.left if went_left else node.right
+        self.root = self._fix_path(path, new_node if new_node is not None else Node(item))
 
-        if item_name.lower() == node.item.name.lower():
-            return node.item
-        elif item_name.lower() < node.item.name.lower():
-            return self._search(node.left, item_name)
-        else:
-            return self._search(node.right, item_name)
+    def search(self, item_name: str) -> Optional[Item]:
+        key = item_name.lower()
+        if _counters is not None:
+            self._count_descent(key)
+        node = self.root
+        while node:
+            if key == node.key:
+                return node.item
+            node = node.left if key < node.key else node.right
+        return None
 
-    def delete(self, item_name: str) -> bool:
-        self.root = self._delete(self.root, item_name)
-        # Listeden öğeyi kaldır
-        self.items = [item for item in self.items if item.name.lower() != item_name.lower()]
-        return True
+    def count(self, item_name: str) -> int:
+        """Verilen isimdeki öğeden ağaçta kaç tane olduğunu döndürür"""
+        key = item_name.lower()
+        if _counters is not None:
+            self._count_descent(key)
+        node = self.root
+        while node:
+            if key == node.key:
+                return node.count
+            node = node.left if key < node.key else node.right
+        return 0
+
+    def rank(self, item_name: str) -> int:
+        """Adı verilen isimden alfabetik olarak önce gelen öğe sayısını döndürür"""
+        key = item_name.lower()
+        if _counters is not None:
+            self._count_descent(key)
+        rank = 0
+        node = self.root
+        while node:
+            if key <= node.key:
+                node = node.left
+            else:
+                rank += node.count + (node.left.size if node.left else 0)
+                node = node.right
+        return rank
 
-    def _delete(self, node: Node, item_name: str) -> Optional[Node]:
-        if not node:
+    def select(self, index: int) -> Optional[Item]:
+        """Alfabetik sırada index numaralı (0'dan başlayarak) öğeyi döndürür"""
+        if index < 0:
             return None
+        node = self.root
+        while node:
+            left_size = node.left.size if node.left else 0
+            if index < left_size:
+                node = node.left
+            elif index < left_size + node.count:
+                return node.item
+            else:
+                index -= left_size + node.count
+                node = node.right
+        return None
 
-        if item_name.lower() < node.item.name.lower():
-            node.left = self._delete(node.left, item_name)
-        elif item_name.lower() > node.item.name.lower():
-            node.right = self._delete(node.right, item_name)
-        else:
-            if not node.left:
-                return node.right
-            elif not node.right:
-                return node.left
+    def total_power(self) -> int:
+        """Ağaçtaki tüm öğelerin toplam gücünü döndürür"""
+        return self.root.power_sum if self.root else 0
 
-            temp = self._get_min_value_node(node.right)
-            node.item = temp.item
-            node.right = self._delete(node.right, temp.item.name)
+    def _range_stats(self, low: str, high: str):
+        """Adı [low, high] aralığındaki öğelerin (toplam, en küçük, en büyük) gücünü döndürür"""
+        low_key = low.lower()
+        high_key = high.lower()
+        total = 0
+        min_power = max_power = None
 
+        # Aralığın ayrıldığı ilk düğümü bul
+        node = self.root
+        while node and not (low_key <= node.key <= high_key):
+            node = node.left if high_key < node.key else node.right
         if not node:
-            return None
+            return total, min_power, max_power
 
-        node.height = max(self.get_height(node.left), self.get_height(node.right)) + 1
-        balance = self.get_balance(node)
+        # Ayrılma düğümü ile sol/sağ sınır yollarındaki tam alt ağaçlar
+        parts = [(node.item.power * node.count, node.item.power, node.item.power)]
+        current = node.left
+        while current:
+            if current.key >= low_key:
+                parts.append((current.item.power * current.count, current.item.power, current.item.power))
+                if current.right:
+                    parts.append((current.right.power_sum, current.right.min_power, current.right.max_power))
+                current = current.left
+            else:
+                current = current.right
+        current = node.right
+        while current:
+            if current.key <= high_key:
+                parts.append((current.item.power * current.count, current.item.power, current.item.power))
+                if current.left:
+                    parts.append((current.left.power_sum, current.left.min_power, current.left.max_power))
+                current = current.right
+            else:
+                current = current.left
+
+        for part_sum, part_min, part_max in parts:
+            total += part_sum
+            if min_power is None or part_min < min_power:
+                min_power = part_min
+            if max_power is None or part_max > max_power:
+                max_power = part_max
+        return total, min_power, max_power
+
+    def range_power(self, low: str, high: str) -> int:
+        """Adı alfabetik olarak [low, high] aralığındaki öğelerin toplam gücü"""
+        return self._range_stats(low, high)[0]
+
+    def range_max_power(self, low: str, high: str) -> Optional[int]:
+        """Adı alfabetik olarak [low, high] aralığındaki öğelerin en büyük gücü"""
+        return self._range_stats(low, high)[2]
+
+    def top_k(self, k: int, largest: bool = True) -> List[Item]:
+        """Gücü en yüksek (largest=False ise en düşük) k öğeyi tekrarlarıyla döndürür.
+
+        Alt ağaç en büyük/en küçük güç özetleri sayesinde yalnızca sonuca
+        girebilecek düğümler ziyaret edilir.
+        """
+        result = []
+        if not self.root or k <= 0:
+            return result
+        sign = -1 if largest else 1
+        bound = self.root.max_power if largest else self.root.min_power
+        # Yığın elemanları: (sıralama anahtarı, sıra no, düğüm, sadece_düğümün_kendisi)
+        heap = [(sign * bound, 0, self.root, False)]
+        counter = 1
+        while heap and len(result) < k:
+            _, _, node, own_only = heapq.heappop(heap)
+            if own_only:
+                result.extend([node.item] * min(node.count, k - len(result)))
+                continue
+            heapq.heappush(heap, (sign * node.item.power, counter, node, True))
+            counter += 1
+            for child in (node.left, node.right):
+                if child:
+                    bound = child.max_power if largest else child.min_power
+                    heapq.heappush(heap, (sign * bound, counter, child, False))
+                    counter += 1
+        return result
 
-        # Sol Sol Durumu
-        if balance > 1 and self.get_balance(node.left) >= 0:
-            return self.right_rotate(node)
+    def delete(self, item_name: str) -> bool:
+        """Verilen isimdeki öğeden bir tanesini siler, bulunamazsa False döndürür"""
+        key = item_name.lower()
+        if _counters is not None:
+            self._count_descent(key)
+        path = []
+        node = self.root
+        while node and key != node.key:
+            went_left = key < node.key
+            path.append((node, went_left))
+            node = node.left if went_left else node.right
 
-        # Sol Sağ Durumu
-        if balance > 1 and self.get_balance(node.left) < 0:
-            node.left = self.left_rotate(node.left)
-            return self.right_rotate(node)
+        if not node:
+            return False
 
-        # Sağ Sağ Durumu
-        if balance < -1 and self.get_balance(node.right) <= 0:
-            return self.left_rotate(node)
+        if node.count > 1:
+            node.count -= 1
+            self._update(node)
+            self.root = self._fix_path(path, node)
+            return True
 
-        # Sağ Sol Durumu
-        if balance < -1 and self.get_balance(node.right) > 0:
-            node.right = self.right_rotate(node.right)
-            return self.left_rotate(node)
+        if node.left and node.right:
+            # Sağ alt ağacın en küçük düğümü silinen düğümün yerine geçer
+            index = len(path)
+            path.append((node, False))
+            successor = node.right
+            while successor.left:
+                path.append((successor, True))
+                successor = successor.left
+            child = successor.right
+            successor.left = node.left
+            successor.right = node.right
+            path[index] = (successor, False)
+        else:
+            child = node.left if node.left else node.right
+        self.root = self._fix_path(path, child)
+        return True
 
+    @classmethod
+    def from_sorted(cls, items) -> "AVLTree":
+        """Ada göre sıralı öğelerden dengeli ağacı O(n) sürede kurar.
+
+        Aynı isimli ardışık öğeler tek düğümde sayılır.
+        """
+        nodes = []
+        for item in items:
+            key = item.name.lower()
+            if nodes and nodes[-1].key == key:
+                nodes[-1].count += 1
+            else:
+                nodes.append(Node(item))
+        tree = cls()
+        tree.root = tree._build(nodes, 0, len(nodes))
+        return tree
+
+    def _build(self, nodes: list, start: int, end: int) -> Optional[Node]:
+        # Özyineleme derinliği ağaç yüksekliği kadardır (log n)
+        if start >= end:
+            return None
+        middle = (start + end) // 2
+        node = nodes[middle]
+        node.left = self._build(nodes, start, middle)
+        node.right = self._build(nodes, middle + 1, end)
+        self._update(node)
         return node
 
-    def _get_min_value_node(self, node: Node) -> Node:
-        current = node
-        while current.left:
-            current = current.left
-        return current
+    def copy(self) -> "AVLTree":
+        """Ağacın aynı öğeleri paylaşan yapısal kopyasını döndürür"""
+        nodes = []
+        for item, count in self.counts():
+            node = Node(item)
+            node.count = count
+            nodes.append(node)
+        tree = AVLTree()
+        tree.root = tree._build(nodes, 0, len(nodes))
+        return tree
+
+    def _join(self, left: Optional[Node], node: Node, right: Optional[Node]) -> Node:
+        """left < node < right olan iki ağacı ortadaki düğümle birleştirir"""
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        path = []
+        if left_height > right_height + 1:
+            # Sol ağacın sağ kenarında yüksekliği uygun alt ağacı bul
+            current = left
+            while self.get_height(current) > right_height + 1:
+                path.append((current, False))
+                current = current.right
+            node.left, node.right = current, right
+        elif right_height > left_height + 1:
+            current = right
+            while self.get_height(current) > left_height + 1:
+                path.append((current, True))
+                current = current.left
+            node.left, node.right = left, current
+        else:
+            node.left, node.right = left, right
+            self._update(node)
+            return node
+        self._update(node)
+        return self._fix_path(path, node)
+
+    def _join2(self, left: Optional[Node], right: Optional[Node]) -> Optional[Node]:
+        """Ortada düğüm olmadan iki ağacı birleştirir"""
+        if not left:
+            return right
+        if not right:
+            return left
+        # Sol ağacın en büyük düğümünü ayırıp ortaya koy
+        path = []
+        current = left
+        while current.right:
+            path.append((current, False))
+            current = current.right
+        left = self._fix_path(path, current.left)
+        return self._join(left, current, right)
+
+    def _split(self, node: Optional[Node], key: str):
+        """Ağacı (key'den küçükler, key düğümü veya None, key'den büyükler) olarak böler"""
+        if not node:
+            return None, None, None
+        if key == node.key:
+            left, right = node.left, node.right
+            node.left = node.right = None
+            return left, node, right
+        if key < node.key:
+            left, middle, right = self._split(node.left, key)
+            return left, middle, self._join(right, node, node.right)
+        left, middle, right = self._split(node.right, key)
+        return self._join(node.left, node, left), middle, right
+
+    def _union(self, a: Optional[Node], b: Optional[Node]) -> Optional[Node]:
+        if not a:
+            return b
+        if not b:
+            return a
+        left, middle, right = self._split(a, b.key)
+        b_left, b_right = b.left, b.right
+        # Ad iki ağaçta da varsa insert'teki gibi mevcut düğüm (ve öğesi) kalır
+        if middle:
+            middle.count += b.count
+        else:
+            middle = b
+        return self._join(self._union(left, b_left), middle, self._union(right, b_right))
+
+    def _difference(self, a: Optional[Node], b: Optional[Node]) -> Optional[Node]:
+        if not a or not b:
+            return a
+        left, middle, right = self._split(a, b.key)
+        left = self._difference(left, b.left)
+        right = self._difference(right, b.right)
+        if middle and middle.count > b.count:
+            middle.count -= b.count
+            return self._join(left, middle, right)
+        return self._join2(left, right)
+
+    def union(self, other: "AVLTree"):
+        """Diğer ağacın öğelerini (adetleriyle) bu ağaca ekler; diğer ağaç değişmez.
+
+        Böl/birleştir tabanlı birleşim O(m log(n/m + 1)) sürer.
+        """
+        self.root = self._union(self.root, other.copy().root)
+
+    def difference(self, other: "AVLTree"):
+        """Diğer ağaçtaki öğeleri (adetleriyle) bu ağaçtan çıkarır; diğer ağaç değişmez"""
+        self.root = self._difference(self.root, other.root)
 
 class ItemNode:
+    __slots__ = ("item", "next", "count")
+
     def __init__(self, item):
         self.item = item
         self.next = None
@@ -174,8 +607,23 @@ class InventoryLinkedList:
     def __init__(self):
         self.head = None
         self.size = 0
+        self.total_power = 0  # Toplam güç ekleme/çıkarma sırasında güncellenir
+
+    def _steps_to(self, item_name, stop_at_greater: bool) -> int:
+        """Sayaçlar için: ada ulaşana kadar gezilen düğüm sayısını döndürür"""
+        steps = 0
+        current = self.head
+        while current:
+            steps += 1
+            if current.item.name == item_name or (stop_at_greater and current.item.name > item_name):
+                break
+            current = current.next
+        return steps
 
     def add_item(self, item):
+        if _counters is not None:
+            _counters.add("linked_list.steps", self._steps_to(item.name, True))
+        self.total_power += item.power
         # Eğer çanta boşsa
         if not self.head:
             self.head = ItemNode(item)
@@ -207,6 +655,8 @@ class InventoryLinkedList:
         self.size += 1
 
     def remove_item(self, item_name):
+        if _counters is not None:
+            _counters.add("linked_list.steps", self._steps_to(item_name, False))
         if not self.head:
             return False
 
@@ -215,6 +665,7 @@ class InventoryLinkedList:
 
         while current:
             if current.item.name == item_name:
+                self.total_power -= current.item.power
                 if current.count > 1:
                     current.count -= 1
                 else:
@@ -229,6 +680,8 @@ class InventoryLinkedList:
         return False
 
     def find_item(self, item_name):
+        if _counters is not None:
+            _counters.add("linked_list.steps", self._steps_to(item_name, False))
         current = self.head
         while current:
             if current.item.name == item_name:
@@ -249,54 +702,319 @@ class InventoryLinkedList:
         return self.size
 
     def get_total_power(self):
-        total = 0
-        current = self.head
-        while current:
-            total += current.item.power * current.count
-            current = current.next
-        return total
+        return self.total_power
+
+class ItemIndex:
+    """Küçük harfli öğe adından o öğeyi içeren köylere giden ters indeks"""
+
+    def __init__(self):
+        self.postings = {}  # Öğe adı -> {köy: adet}, köyler eklenme sırasıyla
+        self.names = NameIndex()  # Köylerdeki öğe adları için tamamlama/öneri
+
+    def add(self, village: "Village", item: Item):
+        key = item.name.lower()
+        villages = self.postings.get(key)
+        if villages is None:
+            villages = self.postings[key] = {}
+            self.names.add(item.name, key)
+        villages[village] = villages.get(village, 0) + 1
+
+    def remove(self, village: "Village", item_name: str):
+        key = item_name.lower()
+        villages = self.postings.get(key)
+        if not villages or village not in villages:
+            return
+        if villages[village] > 1:
+            villages[village] -= 1
+        else:
+            del villages[village]
+            if not villages:
+                del self.postings[key]
+                self.names.remove(item_name)
+
+    def add_village(self, village: "Village"):
+        """Köyün tüm öğelerini indekse ekler ve köyün değişikliklerini bildirmesini sağlar"""
+        village.item_index = self
+        for item, count in village.item_counts():
+            for _ in range(count):
+                self.add(village, item)
+
+    def remove_village(self, village: "Village"):
+        for item, count in village.item_counts():
+            for _ in range(count):
+                self.remove(village, item.name)
+        if village.item_index is self:
+            village.item_index = None
+
+    def lookup(self, item_name: str) -> List["Village"]:
+        """Öğeyi içeren köyleri döndürür"""
+        return list(self.postings.get(item_name.lower(), ()))
+
+    def lookup_many(self, item_names) -> dict:
+        """Birden fazla öğe adı için {ad: köy listesi} sözlüğü döndürür"""
+        postings = self.postings
+        return {name: list(postings.get(name.lower(), ())) for name in item_names}
 
 class Village:
-    def __init__(self, name: str):
+    def __init__(self, name: str, items=None, rule: Optional[str] = None):
+        if rule is not None and rule not in RULES:
+            raise ValueError(f"Bilinmeyen köy kuralı: {rule}")
         self.name = name
-        self.inventory = AVLTree()
+        self.rule = rule  # None ise Game dünyadaki yerine göre DEFAULT_RULES'tan atar
         self.is_liberated = False
+        self.item_index = None  # Köyün kayıtlı olduğu ters indeks (varsa)
+        self.set_items(items if items is not None else [])
+
+    def set_items(self, items):
+        """Köyün öğelerini değiştirir; AVL ağacı ilk kullanımda kurulur"""
+        self._inventory = None
+        self._pending_items = list(items)
+        self._item_loader = None
+
+    def set_item_loader(self, loader: Callable[[], List[Item]]):
+        """Köyün öğeleri ilk gerektiğinde loader() ile okunur (ör. kayıt dosyasından)"""
+        self._inventory = None
+        self._pending_items = None
+        self._item_loader = loader
+
+    def _pending(self) -> List[Item]:
+        if self._item_loader is not None:
+            self._pending_items = self._item_loader()
+            self._item_loader = None
+        return self._pending_items
+
+    @property
+    def inventory(self) -> AVLTree:
+        # Ağaç ilk erişimde (listeleme, arama, kurtarma) bekleyen öğelerden kurulur
+        if self._inventory is None:
+            self._inventory = AVLTree.from_sorted(
+                sorted(self._pending(), key=lambda item: item.name.lower()))
+            self._pending_items = None
+        return self._inventory
+
+    @inventory.setter
+    def inventory(self, tree: AVLTree):
+        self._inventory = tree
+        self._pending_items = None
+        self._item_loader = None
+
+    def is_materialized(self) -> bool:
+        return self._inventory is not None
+
+    def item_counts(self):
+        """(öğe, adet) çiftlerini ağacı kurmadan döndürür"""
+        if self._inventory is not None:
+            return self._inventory.counts()
+        return ((item, 1) for item in self._pending())
 
     def add_item(self, item: Item):
-        self.inventory.insert(item)
+        if self._inventory is None:
+            self._pending().append(item)
+        else:
+            self._inventory.insert(item)
+        if self.item_index is not None:
+            self.item_index.add(self, item)
+
+    def remove_item(self, item_name: str) -> bool:
+        if not self.inventory.delete(item_name):
+            return False
+        if self.item_index is not None:
+            self.item_index.remove(self, item_name)
+        return True
 
     def has_item(self, item_name: str) -> bool:
         return self.inventory.search(item_name) is not None
 
+    def get_total_power(self) -> int:
+        return self.inventory.total_power()
+
 class InventoryNode:
+    """Çantadaki tek bir öğe.
+
+    Düğüm hem eklenme sırasındaki listede (prev/next) hem de aynı isimli
+    öğelerin dairesel listesinde (same_prev/same_next) yer alır; böylece isim
+    indeksi için ayrı bir yapı tutulmaz.
+    """
+    __slots__ = ("item", "prev", "next", "same_prev", "same_next")
+
     def __init__(self, item):
         self.item = item
+        self.prev = None
+        self.next = None
+        self.same_prev = self
+        self.same_next = self
+
+class InventoryTreeNode(Node):
+    """Çantada adının ilk öğesi olan düğüm.
+
+    Bu düğüm aynı zamanda çantanın sıralı görünümündeki (bst) o ada ait AVL
+    düğümüdür; böylece her farklı ad için ayrı bir Node tutulmaz. Öğe
+    çantadan çıksa da aynı isimli öğeler kaldıkça ağaçta kalır.
+    """
+    __slots__ = ("prev", "next", "same_prev", "same_next")
+
+    def __init__(self, item):
+        super().__init__(item)
+        self.prev = None
         self.next = None
+        self.same_prev = self
+        self.same_next = self
 
 class Inventory:
     def __init__(self, max_capacity: int = 10):
         self.max_capacity = max_capacity
         self.head = None
+        self.tail = None
         self.size = 0
+        self.total_power = 0  # Çantadaki öğelerin toplam gücü
+        self.index = {}  # Küçük harfli öğe adı -> bu isimdeki en eski düğüm
+        self.names = NameIndex()  # Çantadaki farklı öğe adları için tamamlama/öneri
         self.bst = AVLTree()
+        self.in_batch = False  # push_many öğeleri bağlarken True
+        # Çanta değişikliklerini dinleyen fonksiyonlar: listener(olay, veri)
+        self.listeners = []
+
+    def _notify(self, event: str, data=None):
+        for listener in self.listeners:
+            listener(event, data)
+
+    def __iter__(self):
+        """Öğeleri çantaya eklenme sırasıyla döndürür"""
+        if _counters is not None:
+            _counters.add("inventory.steps", self.size)  # Tam gezinti varsayılır
+        current = self.head
+        while current:
+            yield current.item
+            current = current.next
 
     def push(self, item: Item) -> bool:
         if self.size >= self.max_capacity:
             return False
             
-        new_node = InventoryNode(item)
-        if not self.head:
-            self.head = new_node
+        key = item.name.lower()
+        if key in self.index:
+            new_node = InventoryNode(item)
+            self.bst.insert(item)
         else:
-            current = self.head
-            while current.next:
-                current = current.next
-            current.next = new_node
+            new_node = InventoryTreeNode(item)
+            key = new_node.key  # İndeks ve ağaç aynı anahtar dizgesini paylaşır
+            self.bst.insert(item, new_node)
+        if self.tail is None:
+            self.head = self.tail = new_node
+        else:
+            new_node.prev = self.tail
+            self.tail.next = new_node
+            self.tail = new_node
+
+        self._link_name(new_node, key)
             
         self.size += 1
-        self.bst.insert(item)
+        self.total_power += item.power
+        if self.listeners:
+            self._notify("push", item)
+        return True
+
+    def push_many(self, items) -> bool:
+        """Öğelerin hepsini birden ekler; hepsine yer yoksa hiçbirini eklemez.
+
+        Bağlı liste ve indeks her öğe için O(1) güncellenir, sıralı görünüm
+        ise tek bir ağaç birleşimiyle güncellenir. Çantaya yeni gelen adların
+        ilk öğeleri ağaca doğrudan kendi düğümleriyle girer.
+        """
+        items = list(items)
+        if self.size + len(items) > self.max_capacity:
+            return False
+        # "push" her öğe bağlandığı anda bildirilir; sıralı görünüm sona kadar
+        # geride kaldığından dinleyiciler in_batch iken anlık görüntü almamalı
+        # ve "batch_end" olayını beklemelidir
+        self.in_batch = True
+        tree_nodes = {}  # Küçük harfli ad -> birleşimde ağaca eklenecek düğüm
+        for item in items:
+            key = item.name.lower()
+            tree_node = tree_nodes.get(key)
+            if tree_node is not None:
+                tree_node.count += 1
+                new_node = InventoryNode(item)
+            elif key in self.index:
+                # Ağaçta zaten olan ad; geçici düğüm birleşimde mevcut düğüme eklenir
+                tree_node = tree_nodes[key] = Node(item)
+                new_node = InventoryNode(item)
+            else:
+                new_node = tree_nodes[key] = InventoryTreeNode(item)
+                key = new_node.key
+            if self.tail is None:
+                self.head = self.tail = new_node
+            else:
+                new_node.prev = self.tail
+                self.tail.next = new_node
+                self.tail = new_node
+            self._link_name(new_node, key)
+            self.size += 1
+            self.total_power += item.power
+            if self.listeners:
+                self._notify("push", item)
+        nodes = [tree_nodes[key] for key in sorted(tree_nodes)]
+        self.bst.root = self.bst._union(self.bst.root, self.bst._build(nodes, 0, len(nodes)))
+        self.in_batch = False
+        if self.listeners:
+            self._notify("batch_end")
         return True
 
+    def pause_names(self):
+        """Ad indeksinin güncellenmesini durdurur (ör. tekrar oynatmada); resume_names ile kurulur"""
+        self.names = None
+
+    def resume_names(self):
+        """Ad indeksini çantadaki farklı adlardan yeniden kurar"""
+        self.names = NameIndex()
+        for key, node in self.index.items():
+            self.names.add(node.item.name, key)
+
+    def _link_name(self, node: InventoryNode, key: str):
+        """Düğümü aynı isimli öğelerin dairesel listesinin sonuna (en yeni) ekler"""
+        oldest = self.index.get(key)
+        if oldest is None:
+            self.index[key] = node
+            if self.names is not None:
+                self.names.add(node.item.name, key)
+            return
+        newest = oldest.same_prev
+        newest.same_next = node
+        node.same_prev = newest
+        node.same_next = oldest
+        oldest.same_prev = node
+
+    def _unlink_name(self, node: InventoryNode, key: str):
+        """Düğümü aynı isimli öğelerin listesinden çıkarır"""
+        if node.same_next is node:
+            del self.index[key]
+            if self.names is not None:
+                self.names.remove(key)
+            return
+        node.same_prev.same_next = node.same_next
+        node.same_next.same_prev = node.same_prev
+        if self.index[key] is node:
+            self.index[key] = node.same_next
+        node.same_prev = node.same_next = node
+
+    def _unlink(self, node: InventoryNode) -> Item:
+        """Düğümü listeden çıkarır ve sayaçları günceller (isim indeksi çağırana aittir)"""
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+
+        item = node.item
+        self.size -= 1
+        self.total_power -= item.power
+        self.bst.delete(item.name)
+        return item
+
     def pop(self, item_name: str = None) -> Optional[Item]:
         if not self.head:
             return None
@@ -306,163 +1024,416 @@ class Inventory:
             return self.use_item(item_name)
             
         # item_name belirtilmemişse, son öğeyi çıkar
-        if not self.head.next:
-            item = self.head.item
-            self.head = None
-        else:
-            current = self.head
-            while current.next.next:
-                current = current.next
-            item = current.next.item
-            current.next = None
-            
-        self.size -= 1
-        self.bst.delete(item.name)
+        node = self.tail  # Son eklenen düğüm bu isimdeki en yeni düğümdür
+        self._unlink_name(node, node.item.name.lower())
+        item = self._unlink(node)
+        if self.listeners:
+            self._notify("pop")
         return item
 
     def use_item(self, item_name: str) -> bool:
-        if not self.head:
+        # Bu isimdeki ilk (en eski) öğeyi çıkar
+        key = item_name.lower()
+        node = self.index.get(key)
+        if node is None:
             return False
-            
-        # İlk öğeyi kontrol et
-        if self.head.item.name.lower() == item_name.lower():
-            item = self.head.item
-            self.head = self.head.next
-            self.size -= 1
-            self.bst.delete(item.name)
-            return True
-            
-        # Diğer öğeleri kontrol et
-        current = self.head
-        while current.next:
-            if current.next.item.name.lower() == item_name.lower():
-                item = current.next.item
-                current.next = current.next.next
-                self.size -= 1
-                self.bst.delete(item.name)
-                return True
-            current = current.next
-            
-        return False
+        self._unlink_name(node, key)
+        self._unlink(node)
+        if self.listeners:
+            self._notify("remove", item_name)
+        return True
 
-    def show_inventory(self):
-        print("\n=== Çanta ===")
+    def show_inventory(self, output=print):
+        output("\n=== Çanta ===")
         if not self.head:
-            print("Çanta boş!")
+            output("Çanta boş!")
         else:
-            # Öğeleri grupla ve sayılarını hesapla
-            item_counts = {}
-            current = self.head
-            while current:
-                if current.item.name.lower() in item_counts:
-                    item_counts[current.item.name.lower()]["count"] += 1
-                else:
-                    item_counts[current.item.name.lower()] = {
-                        "count": 1,
-                        "power": current.item.power,
-                        "name": current.item.name
-                    }
-                current = current.next
+            # Öğeleri isim indeksinden grupla
+            groups = sorted((node.item for node in self.index.values()), key=lambda item: item.name)
             
             # Her öğeyi ve sayısını göster
-            for item_info in sorted(item_counts.values(), key=lambda x: x["name"]):
-                if item_info["count"] > 1:
-                    print(f"{item_info['name']} (Güç: {item_info['power']}) x{item_info['count']}")
+            for item in groups:
+                count = self.bst.count(item.name)
+                if count > 1:
+                    output(f"{item.name} (Güç: {item.power}) x{count}")
                 else:
-                    print(f"{item_info['name']} (Güç: {item_info['power']})")
+                    output(f"{item.name} (Güç: {item.power})")
 
     def get_size(self):
         return self.size
 
     def get_total_power(self):
-        total = 0
-        current = self.head
-        while current:
-            total += current.item.power
-            current = current.next
-        return total
+        return self.total_power
 
     def search_item(self, item_name: str) -> Optional[Item]:
-        return self.bst.search(item_name)
+        node = self.index.get(item_name.lower())
+        return node.item if node else None
 
 class VillageNode:
+    __slots__ = ("village", "next")
+
     def __init__(self, village):
         self.village = village
         self.next = None
 
-class VillageQueue:
-    def __init__(self):
-        self.head = None
-        self.tail = None
-        self.size = 0
+class _ScheduledVillage:
+    __slots__ = ("order", "village", "index")
 
-    def enqueue(self, village: Village):
-        """Kuyruğa köy ekler"""
-        new_node = VillageNode(village)
-        if self.tail is None:
-            self.head = self.tail = new_node
-        else:
-            self.tail.next = new_node
-            self.tail = new_node
-        self.size += 1
+    def __init__(self, order, village):
+        self.order = order  # (öncelik, eklenme sırası); küçük olan önce kurtarılır
+        self.village = village
+        self.index = 0  # Yığın dizisindeki yeri
+
+
+class VillageScheduler:
+    """Köy kurtarma sırası: indeksli ikili yığın (min-heap).
+
+    Köyler (öncelik, eklenme sırası) anahtarına göre sıralanır. Öncelik
+    fonksiyonu verilmezse bütün köylerin önceliği eşittir ve sıra eklenme
+    sırasıdır (FIFO). Her köyün yığındaki yeri tutulduğu için öncelik
+    değiştirme (update) ve herhangi bir köyü çıkarma (remove) O(log n)'dir.
+    """
+
+    def __init__(self, priority: Optional[Callable[[Village], float]] = None, villages=()):
+        self.priority = priority  # köy -> sayı (ör. reward_priority, difficulty_priority)
+        self._heap: List[_ScheduledVillage] = []
+        self._entries: Dict[Village, _ScheduledVillage] = {}
+        self._sequence = 0
+        self.extend(villages)
+
+    @property
+    def size(self) -> int:
+        return len(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, village) -> bool:
+        return village in self._entries
+
+    def __iter__(self):
+        """Köyleri kurtarılma sırasıyla döndürür (O(n log n) sıralama)"""
+        for entry in sorted(self._heap, key=lambda entry: entry.order):
+            yield entry.village
+
+    def _key(self, village: Village, priority):
+        if priority is not None:
+            return priority
+        return self.priority(village) if self.priority is not None else 0
+
+    def _new_entry(self, village: Village, priority) -> _ScheduledVillage:
+        if village in self._entries:
+            raise ValueError(f"{village.name} zaten kurtarma sırasında")
+        entry = _ScheduledVillage((self._key(village, priority), self._sequence), village)
+        self._sequence += 1
+        self._entries[village] = entry
+        return entry
+
+    def _sift_up(self, index: int, top: int = 0):
+        heap = self._heap
+        entry = heap[index]
+        while index > top:
+            parent = (index - 1) >> 1
+            other = heap[parent]
+            if not entry.order < other.order:
+                break
+            heap[index] = other
+            other.index = index
+            index = parent
+        heap[index] = entry
+        entry.index = index
+
+    def _sift_down(self, index: int):
+        # heapq gibi: küçük çocuklar boyunca yaprağa inilir, sonra öğe yukarı taşınır.
+        # Çıkarılan kökün yerine gelen son öğe genellikle aşağıya ait olduğundan
+        # seviye başına tek karşılaştırma yapılır.
+        heap = self._heap
+        size = len(heap)
+        entry = heap[index]
+        start = index
+        child = 2 * index + 1
+        while child < size:
+            right = child + 1
+            if right < size and heap[right].order < heap[child].order:
+                child = right
+            other = heap[child]
+            heap[index] = other
+            other.index = index
+            index = child
+            child = 2 * index + 1
+        heap[index] = entry
+        entry.index = index
+        if index != start:
+            self._sift_up(index, start)
+
+    def enqueue(self, village: Village, priority=None):
+        """Köyü sıraya ekler; priority verilmezse öncelik fonksiyonu kullanılır"""
+        if _counters is not None:
+            _counters.add("queue.enqueue")
+        entry = self._new_entry(village, priority)
+        self._heap.append(entry)
+        self._sift_up(len(self._heap) - 1)
+
+    def extend(self, villages):
+        """Köyleri toplu ekler; yığın baştan kurulur (O(n))"""
+        heap = self._heap
+        for village in villages:
+            entry = self._new_entry(village, None)
+            entry.index = len(heap)
+            heap.append(entry)
+        # Öncelikler eşitken (liste sırası) dizi zaten yığın düzenindedir
+        if all(not heap[index].order < heap[(index - 1) >> 1].order
+               for index in range(1, len(heap))):
+            return
+        for index in range(len(heap) // 2 - 1, -1, -1):
+            self._sift_down(index)
 
     def dequeue(self) -> Optional[Village]:
-        """Kuyruktan köy çıkarır"""
-        if self.head is None:
+        """Sıradaki köyü çıkarır"""
+        if _counters is not None:
+            _counters.add("queue.dequeue")
+        heap = self._heap
+        if not heap:
             return None
-        
-        village = self.head.village
-        self.head = self.head.next
-        if self.head is None:
-            self.tail = None
-        self.size -= 1
-        return village
+        top = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        del self._entries[top.village]
+        return top.village
 
     def peek(self) -> Optional[Village]:
-        """Kuyruğun başındaki köyü gösterir"""
-        if self.head is None:
-            return None
-        return self.head.village
+        """Sıradaki köyü gösterir"""
+        if _counters is not None:
+            _counters.add("queue.peek")
+        return self._heap[0].village if self._heap else None
+
+    def update(self, village: Village, priority=None) -> bool:
+        """Köyün önceliğini yeniden hesaplar (veya verilen değere çeker)"""
+        if _counters is not None:
+            _counters.add("queue.update")
+        entry = self._entries.get(village)
+        if entry is None:
+            return False
+        old_order = entry.order
+        entry.order = (self._key(village, priority), old_order[1])
+        if entry.order < old_order:
+            self._sift_up(entry.index)
+        else:
+            self._sift_down(entry.index)
+        return True
+
+    def remove(self, village: Village) -> bool:
+        """Köyü sıranın herhangi bir yerinden çıkarır"""
+        if _counters is not None:
+            _counters.add("queue.remove")
+        entry = self._entries.pop(village, None)
+        if entry is None:
+            return False
+        heap = self._heap
+        last = heap.pop()
+        if last is not entry:
+            heap[entry.index] = last
+            last.index = entry.index
+            if last.order < entry.order:
+                self._sift_up(last.index)
+            else:
+                self._sift_down(last.index)
+        return True
+
+    def order_of(self, village: Village):
+        """Köyün sıralama anahtarı (öncelik, eklenme sırası); sırada değilse None"""
+        entry = self._entries.get(village)
+        return entry.order if entry is not None else None
+
+    def place(self, village: Village, order=None):
+        """Köyü önceden alınmış anahtarıyla (order_of) geri koyar; anahtar yoksa enqueue"""
+        if order is None:
+            self.enqueue(village)
+            return
+        if village in self._entries:
+            raise ValueError(f"{village.name} zaten kurtarma sırasında")
+        entry = _ScheduledVillage(order, village)
+        self._entries[village] = entry
+        self._heap.append(entry)
+        self._sift_up(len(self._heap) - 1)
 
     def is_empty(self) -> bool:
-        """Kuyruğun boş olup olmadığını kontrol eder"""
-        return self.head is None
+        """Sıranın boş olup olmadığını kontrol eder"""
+        return not self._heap
+
+
+def reward_priority(village: Village) -> int:
+    """Önce en çok toplam güç veren köy"""
+    return -sum(item.power * count for item, count in village.item_counts())
+
+
+def difficulty_priority(village: Village) -> int:
+    """Önce kuralı en kolay köy (normal, bulmaca, çanta sınırı, güç bedeli)"""
+    return RULE_DIFFICULTY[village.rule]
+
+
+def distance_priority(distances: Dict[str, float]) -> Callable[[Village], float]:
+    """Köy adı -> uzaklık tablosundan öncelik fonksiyonu; önce en yakın köy"""
+    return lambda village: distances.get(village.name, float("inf"))
+
+
+class ConsoleIO:
+    """Terminal üzerinden giriş/çıkış yapar (varsayılan oyun modu).
+
+    Çıktı ekran tamponunda toplanır ve girdi beklenirken tek seferde yazılır.
+    """
+
+    def __init__(self, screen: Optional[Screen] = None):
+        self.screen = screen if screen is not None else Screen()
+
+    def read(self, prompt: str = "") -> str:
+        return self.screen.read(prompt)
+
+    def write(self, text: str = ""):
+        self.screen.write(text)
+
+    def write_lines(self, lines):
+        """Uzun listeleri sayfalayarak yazar"""
+        self.screen.write_lines(lines)
+
+    def clear(self):
+        self.screen.clear()  # Terminali ANSI kaçış dizileriyle temizle
+
+    def flush(self):
+        self.screen.flush()
+
+class ScriptedIO:
+    """Girdileri bir iterator'dan okuyan başsız (headless) giriş/çıkış sağlayıcısı.
+
+    output bir liste verilirse tüm çıktılar (istemler dahil) oraya eklenir,
+    verilmezse çıktılar atılır (null sink).
+    """
+
+    def __init__(self, inputs, output: Optional[list] = None):
+        self._inputs = iter(inputs)
+        self.output = output
+
+    def read(self, prompt: str = "") -> str:
+        if self.output is not None:
+            self.output.append(prompt)
+        try:
+            return next(self._inputs)
+        except StopIteration:
+            raise EOFError("Senaryo girdileri tükendi") from None
+
+    def write(self, text: str = ""):
+        if self.output is not None:
+            self.output.append(text)
+
+    def write_lines(self, lines):
+        if self.output is not None:
+            self.output.extend(lines)
+
+    def clear(self):
+        pass
+
+    def flush(self):
+        pass
+
+class QueueIO(ScriptedIO):
+    """Girdileri bir queue.Queue'dan okur; None girdisi oturumu sonlandırır"""
+
+    def __init__(self, input_queue, output: Optional[list] = None, timeout: Optional[float] = None):
+        super().__init__((), output)
+        self.input_queue = input_queue
+        self.timeout = timeout
+
+    def read(self, prompt: str = "") -> str:
+        if self.output is not None:
+            self.output.append(prompt)
+        try:
+            line = self.input_queue.get(timeout=self.timeout)
+        except queue.Empty:
+            raise EOFError("Girdi kuyruğu zaman aşımına uğradı") from None
+        if line is None:
+            raise EOFError("Girdi kuyruğu kapatıldı")
+        return line
 
 class Game:
-    def __init__(self):
-        # Köyleri oluştur
-        villages = [
-            Village("Yeşilvadi"),
-            Village("Gümüşköy"),
-            Village("Altınşehir"),
-            Village("Demirtepe"),
-            Village("Kristalköy"),
-            Village("Zümrütvadi"),
-            Village("Elmasşehir")
-        ]
+    def __init__(self, io=None, villages: Optional[List[Village]] = None,
+                 inventory: Optional[Inventory] = None,
+                 priority: Optional[Callable[[Village], float]] = None):
+        # Giriş/çıkış sağlayıcısı (varsayılan: terminal)
+        self.io = io if io is not None else ConsoleIO()
+        # Durum değişikliklerini dinleyen fonksiyonlar: listener(olay, veri)
+        # Olaylar: "liberate" (köy), "puzzle" (bulmaca cevabı), "restore" (geçmişten dönüş)
+        self.listeners = []
+        # Geri alma/yineleme geçmişi (persistent.GameHistory); None ise kapalı
+        self.history = None
+
+        # Köy listesi verilmezse varsayılan dünya oluşturulur
+        default_world = villages is None
+        if default_world:
+            villages = [
+                Village("Yeşilvadi"),
+                Village("Gümüşköy"),
+                Village("Altınşehir"),
+                Village("Demirtepe"),
+                Village("Kristalköy"),
+                Village("Zümrütvadi"),
+                Village("Elmasşehir")
+            ]
         
         # Köyleri bağlı listede tut
         self.villages = None
+        tail = None
         for village in villages:
             new_node = VillageNode(village)
-            if self.villages is None:
+            if tail is None:
                 self.villages = new_node
             else:
-                current = self.villages
-                while current.next:
-                    current = current.next
-                current.next = new_node
-        
-        # Kurtarma kuyruğunu oluştur
-        self.liberation_queue = VillageQueue()
-        # Köyleri kuyruğa ekle
-        current = self.villages
-        while current:
-            self.liberation_queue.enqueue(current.village)
-            current = current.next
+                tail.next = new_node
+            tail = new_node
         
-        self.inventory = Inventory()
-        self.initialize_villages()
+        self.village_count = len(villages)
+        self.inventory = inventory if inventory is not None else Inventory()
+        self._item_index = None  # İlk köy aramasında kurulur
+        self._catalog = None  # İlk kullanımda kurulur
+        if default_world:
+            self.initialize_villages()
+        for position, village in enumerate(villages):
+            if village.rule is None:
+                village.rule = DEFAULT_RULES.get(position, RULE_NORMAL)
+
+        # Kurtarılmamış köylerle kurtarma sırasını oluştur (öncelik verilmezse liste sırası)
+        self.liberation_queue = VillageScheduler(
+            priority, (village for village in villages if not village.is_liberated))
+
+    @property
+    def item_index(self) -> ItemIndex:
+        """Öğe -> köy ters indeksi; köy ağaçlarını kurmadan ilk kullanımda oluşturulur"""
+        if self._item_index is None:
+            index = ItemIndex()
+            current = self.villages
+            while current:
+                index.add_village(current.village)
+                current = current.next
+            self._item_index = index
+        return self._item_index
+
+    @property
+    def catalog(self) -> ItemCatalog:
+        """Dünyadaki öğe türlerinin numaralı kataloğu; köy ağaçlarını kurmadan oluşturulur"""
+        if self._catalog is None:
+            catalog = ItemCatalog()
+            current = self.villages
+            while current:
+                for item, _ in current.village.item_counts():
+                    catalog.intern(item)
+                current = current.next
+            self._catalog = catalog
+        return self._catalog
+
+    def _notify(self, event: str, data=None):
+        for listener in self.listeners:
+            listener(event, data)
 
     def get_current_village(self) -> Optional[Village]:
         """Kuyruğun başındaki köyü döndürür"""
@@ -472,412 +1443,408 @@ class Game:
         """Kuyruğun başındaki köyü çıkarır"""
         self.liberation_queue.dequeue()
 
+    def _finish_liberation(self, village: Village):
+        """Köyü kurtarılmış olarak işaretler ve kuyruktan çıkarır"""
+        village.is_liberated = True
+        self.remove_current_village()  # Kuyruktan çıkar
+        self._notify("liberate", village)
+
+    def _show_bag(self, sorted_by_name: bool = False):
+        """Çantadaki öğeleri numaralı olarak listeler"""
+        self.io.write("\nÇantanızdaki öğeler:")
+        items = self.inventory.bst if sorted_by_name else self.inventory
+        self.io.write_lines([f"{i}. {item.name} (Güç: {item.power})" for i, item in enumerate(items, 1)])
+
+    def _previous_village(self, village: Village) -> Optional[Village]:
+        """Köy listesinde verilen köyden hemen önce gelen köyü döndürür"""
+        current = self.villages
+        while current and current.next:
+            if current.next.village is village:
+                return current.village
+            current = current.next
+        return None
+
+    def _complete_name(self, item_name: str, names: NameIndex) -> str:
+        """Tam eşleşme yoksa ve önek tek bir ada uyuyorsa o adı döndürür"""
+        item_name = item_name.strip()
+        if not item_name or item_name in names:
+            return item_name
+        completions = names.complete(item_name, limit=2)
+        return completions[0] if len(completions) == 1 else item_name
+
+    def _suggest_names(self, item_name: str, names: NameIndex):
+        """Bulunamayan ad için önek tamamlamaları veya yakın yazımları önerir"""
+        suggestions = names.complete(item_name.strip(), limit=5) if item_name.strip() else []
+        if not suggestions:
+            suggestions = names.suggest(item_name.strip())
+        if suggestions:
+            self.io.write(f"Bunu mu demek istediniz: {', '.join(suggestions)}?")
+
+    def _show_puzzle_hints(self, villages):
+        self.io.write()
+        for village in villages:
+            names = ", ".join(item.name for item in village.inventory)
+            self.io.write(f"İpucu: {village.name} köyündeki envanterler: {names}")
+
+    def _show_sacrifice_hint(self, required_power: int):
+        """Gereken gücü en az güç kaybıyla karşılayan öğeleri ipucu olarak gösterir"""
+        plan = solve_sacrifice(self.inventory, required_power)
+        if plan is None:
+            self.io.write("İpucu: Çantanızdaki öğelerin gücü yetmiyor!")
+        else:
+            names = ", ".join(item.name for item in plan)
+            self.io.write(f"İpucu: En az güç kaybı için verilebilecek öğeler: {names} "
+                          f"(toplam {sum(item.power for item in plan)} güç)")
+
+    def _take_village_items_flow(self, village: Village):
+        """Köydeki öğeleri çantaya ekler, çanta doluysa oyuncuya öğe çıkartır"""
+        items = list(village.inventory)
+        # Hepsine yer varsa tek seferde aktar
+        if self.inventory.push_many(items):
+            for item in items:
+                self.io.write(f"- {item.name} (Güç: {item.power})")
+            return
+        for item in items:
+            while True:
+                if not self.inventory.push(item):
+                    self.io.write("\nÇanta dolu! Bir öğe çıkarmalısınız.")
+                    self._show_bag()
+                    item_to_remove = self._complete_name(
+                        (yield PROMPT_REMOVE_ITEM), self.inventory.names)
+                    if self.inventory.pop(item_to_remove):
+                        if self.inventory.push(item):
+                            self.io.write(f"{item_to_remove} çantadan çıkarıldı ve {item.name} eklendi.")
+                            break
+                        else:
+                            self.io.write("Çanta hala dolu! Başka bir öğe çıkarmalısınız.")
+                    else:
+                        self.io.write("Öğe bulunamadı! Lütfen listedeki öğelerden birini seçin.")
+                        self._suggest_names(item_to_remove, self.inventory.names)
+                    continue
+                else:
+                    self.io.write(f"- {item.name} (Güç: {item.power})")
+                    break
+
     def liberate_village(self):
+        self._run(_counted_flow("liberate_village", self._liberate_village_flow()))
+
+    def _liberate_village_flow(self):
         current_village = self.get_current_village()
         if not current_village:
-            print("Tüm köyler kurtarıldı!")
+            self.io.write("Tüm köyler kurtarıldı!")
             return
 
-        print(f"\n{current_village.name} köyünü kurtarmaya çalışıyorsunuz...")
-        
-        # Köy sayısını hesapla
-        total_villages = 7  # Toplam köy sayısı
-        remaining_villages = self._count_villages()  # Kalan köy sayısı
-        liberated_villages = total_villages - remaining_villages  # Kurtarılan köy sayısı
+        self.io.write(f"\n{current_village.name} köyünü kurtarmaya çalışıyorsunuz...")
         
-        # 5. köy için özel güç puanı sistemi (4 köy kurtarıldıktan sonra)
-        if liberated_villages == 4:  # 5. köy
+        rule = current_village.rule
+
+        # Güç puanı bedeli olan köy (Kristalköy)
+        if rule == RULE_SACRIFICE:
             required_power = 7
             total_power = 0
             
             while total_power < required_power:
-                print(f"\nKristalköy köyünü kurtarmak için içerdeki casusuna en az {required_power} güç puanı vermen gerekiyor.")
-                print(f"Şu ana kadar verilen güç puanı: {total_power}")
-                print(f"Kalan güç puanı: {required_power - total_power}")
+                self.io.write(f"\n{current_village.name} köyünü kurtarmak için içerdeki casusuna en az {required_power} güç puanı vermen gerekiyor.")
+                self.io.write(f"Şu ana kadar verilen güç puanı: {total_power}")
+                self.io.write(f"Kalan güç puanı: {required_power - total_power}")
                 
-                print("\nÇantanızdaki öğeler:")
-                current = self.inventory.head
-                i = 1
-                while current:
-                    print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                    current = current.next
-                    i += 1
+                self._show_bag()
+                self._show_sacrifice_hint(required_power - total_power)
                 
-                item_name = input("\nKullanmak istediğiniz öğenin adını girin: ")
+                item_name = self._complete_name(
+                    (yield PROMPT_USE_ITEM), self.inventory.names)
                 found_item = self.inventory.search_item(item_name)
                 if found_item:
                     if self.inventory.pop(item_name):
                         total_power += found_item.power
-                        print(f"{found_item.name} kullanıldı. Güç puanı: {found_item.power}")
-                        print(f"Toplam güç puanı: {total_power}")
+                        self.io.write(f"{found_item.name} kullanıldı. Güç puanı: {found_item.power}")
+                        self.io.write(f"Toplam güç puanı: {total_power}")
                     else:
-                        print("Öğe kullanılamadı!")
+                        self.io.write("Öğe kullanılamadı!")
                 else:
-                    print("Öğe bulunamadı! Lütfen listedeki öğelerden birini seçin.")
+                    self.io.write("Öğe bulunamadı! Lütfen listedeki öğelerden birini seçin.")
+                    self._suggest_names(item_name, self.inventory.names)
                     continue
             
-            print(f"\nToplam {total_power} güç puanı toplandı!")
-            print(f"{current_village.name} köyü başarıyla kurtarıldı!")
+            self.io.write(f"\nToplam {total_power} güç puanı toplandı!")
+            self.io.write(f"{current_village.name} köyü başarıyla kurtarıldı!")
             
             # Köydeki öğeleri çantaya ekle
-            print("\nKöyden alınan öğeler:")
-            for item in current_village.inventory.items:
-                while True:
-                    if not self.inventory.push(item):
-                        print("\nÇanta dolu! Bir öğe çıkarmalısınız.")
-                        print("\nÇantanızdaki öğeler:")
-                        current = self.inventory.head
-                        i = 1
-                        while current:
-                            print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                            current = current.next
-                            i += 1
-                        item_to_remove = input("\nÇıkarmak istediğiniz öğenin adını girin: ")
-                        if self.inventory.pop(item_to_remove):
-                            if self.inventory.push(item):
-                                print(f"{item_to_remove} çantadan çıkarıldı ve {item.name} eklendi.")
-                                break
-                            else:
-                                print("Çanta hala dolu! Başka bir öğe çıkarmalısınız.")
-                        else:
-                            print("Öğe bulunamadı! Lütfen listedeki öğelerden birini seçin.")
-                            continue
-                    else:
-                        print(f"- {item.name} (Güç: {item.power})")
-                        break
+            self.io.write("\nKöyden alınan öğeler:")
+            yield from self._take_village_items_flow(current_village)
             
-            current_village.is_liberated = True
-            self.remove_current_village()  # Kuyruktan çıkar
+            self._finish_liberation(current_village)
             return
 
-        # 6. köy için bulmaca sistemi (5 köy kurtarıldıktan sonra)
-        elif liberated_villages == 5:  # 6. köy
-            print("\nKöy girişindeki kapıyı açmak için bir bulmaca var!")
-            print("\nBULMACA:")
-            print("Kristalköy ve Zümrütvadi köylerindeki envanterlerin baş harflerinden oluşan 4 harfli bir kelime bulun.")
-            print("Bu kelimenin harfleri Kristalköy ve Zümrütvadi'de gizli.")
-            print("\nİpucu: Kristalköy'deki envanterler: Altın, Zırh, Ok-Yay")
-            print("İpucu: Zümrütvadi'deki envanterler: Yiyecek, Anahtar, Kılıç")
+        # Bulmacalı köy (Zümrütvadi)
+        elif rule == RULE_PUZZLE:
+            # Bulmaca bir önceki köy ile bu köyün envanterlerinden üretilir
+            previous_village = self._previous_village(current_village)
+            puzzle_villages = [previous_village, current_village] if previous_village else [current_village]
+            puzzle = default_engine().make_puzzle(*puzzle_villages)
+            village_names = " ve ".join(village.name for village in puzzle_villages)
+
+            self.io.write("\nKöy girişindeki kapıyı açmak için bir bulmaca var!")
+            if puzzle.answers:
+                self.io.write("\nBULMACA:")
+                self.io.write(f"{village_names} köylerindeki envanterlerin baş harflerinden oluşan {puzzle.length} harfli bir kelime bulun.")
+                self.io.write(f"Bu kelimenin harfleri {village_names} köylerinde gizli.")
+                self._show_puzzle_hints(puzzle_villages)
+
+                while True:
+                    answer = yield PROMPT_PUZZLE
+                    self._notify("puzzle", answer)
+                    if puzzle.check(answer):
+                        break
+                    self.io.write("Yanlış cevap! Tekrar deneyin.")
+                    self._show_puzzle_hints(puzzle_villages)
+                self.io.write("\nTebrikler! Bulmacayı doğru çözdünüz!")
+            else:
+                self.io.write("Baş harflerden anlamlı bir kelime çıkmıyor, kapı kendiliğinden açıldı.")
+
+            self.io.write(f"{current_village.name} köyü başarıyla kurtarıldı!")
             
-            while True:
-                answer = input("\nBulmacanın cevabını girin (büyük harflerle): ").upper()
-                if answer == "KAYA":
-                    print("\nTebrikler! Bulmacayı doğru çözdünüz!")
-                    print(f"{current_village.name} köyü başarıyla kurtarıldı!")
-                    
-                    # Köydeki öğeleri çantaya ekle
-                    print("\nKöyden alınan öğeler:")
-                    for item in current_village.inventory.items:
-                        while True:
-                            if not self.inventory.push(item):
-                                print("\nÇanta dolu! Bir öğe çıkarmalısınız.")
-                                print("\nÇantanızdaki öğeler:")
-                                current = self.inventory.head
-                                i = 1
-                                while current:
-                                    print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                                    current = current.next
-                                    i += 1
-                                item_to_remove = input("\nÇıkarmak istediğiniz öğenin adını girin: ")
-                                if self.inventory.pop(item_to_remove):
-                                    if self.inventory.push(item):
-                                        print(f"{item_to_remove} çantadan çıkarıldı ve {item.name} eklendi.")
-                                        break
-                                    else:
-                                        print("Çanta hala dolu! Başka bir öğe çıkarmalısınız.")
-                                else:
-                                    print("Öğe bulunamadı! Lütfen listedeki öğelerden birini seçin.")
-                                    continue
-                            else:
-                                print(f"- {item.name} (Güç: {item.power})")
-                                break
-                    
-                    current_village.is_liberated = True
-                    self.remove_current_village()  # Kuyruktan çıkar
-                    return
-                else:
-                    print("Yanlış cevap! Tekrar deneyin.")
-                    print("\nİpucu: Kristalköy'deki envanterler: Altın, Zırh, Ok-Yay")
-                    print("İpucu: Zümrütvadi'deki envanterler: Yiyecek, Anahtar, Kılıç")
+            # Köydeki öğeleri çantaya ekle
+            self.io.write("\nKöyden alınan öğeler:")
+            yield from self._take_village_items_flow(current_village)
+            
+            self._finish_liberation(current_village)
+            return
 
-        # 7. köy için çanta yönetimi sistemi (6 köy kurtarıldıktan sonra)
-        elif liberated_villages == 6:  # 7. köy
-            print("\nKöyde dar bir geçit var. Bu geçidi geçmek için çantanızda en fazla 7 ürün olmalı.")
+        # Çanta sınırı olan köy (Elmasşehir)
+        elif rule == RULE_BAG_LIMIT:
+            self.io.write("\nKöyde dar bir geçit var. Bu geçidi geçmek için çantanızda en fazla 7 ürün olmalı.")
             items_to_remove = self.inventory.size - 7
             if items_to_remove > 0:
-                print(f"{items_to_remove} ürün çıkarmanız gerekiyor.")
+                self.io.write(f"{items_to_remove} ürün çıkarmanız gerekiyor.")
             
             while self.inventory.size > 7:
-                print("\nÇantanızdaki öğeler:")
-                current = self.inventory.head
-                i = 1
-                while current:
-                    print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                    current = current.next
-                    i += 1
+                self._show_bag(sorted_by_name=True)
                 
                 try:
-                    item_numbers = input("\nÇıkarmak istediğiniz ürünlerin numaralarını boşlukla ayırarak girin (1-10): ")
+                    item_numbers = yield PROMPT_ITEM_NUMBERS
                     numbers = [int(num) for num in item_numbers.split()]
                     
                     # Geçerli numara kontrolü
                     if not all(1 <= num <= self.inventory.size for num in numbers):
-                        print("Geçersiz numara! Lütfen listedeki numaralardan seçin.")
+                        self.io.write("Geçersiz numara! Lütfen listedeki numaralardan seçin.")
                         continue
                     
                     # Tekrarlanan numara kontrolü
                     if len(numbers) != len(set(numbers)):
-                        print("Aynı numarayı birden fazla kez seçemezsiniz!")
+                        self.io.write("Aynı numarayı birden fazla kez seçemezsiniz!")
                         continue
                     
-                    # Seçilen ürünleri çıkar
-                    current = self.inventory.head
-                    i = 1
-                    items_to_remove = []
-                    while current:
-                        if i in numbers:
-                            items_to_remove.append(current.item.name)
-                        current = current.next
-                        i += 1
+                    # Seçilen ürünleri çıkar (numaralar alfabetik sıradaki yerleri gösterir)
+                    items_to_remove = [self.inventory.bst.select(num - 1).name for num in numbers]
                     
                     for item_name in items_to_remove:
                         if self.inventory.pop(item_name):
-                            print(f"{item_name} çantadan çıkarıldı.")
+                            self.io.write(f"{item_name} çantadan çıkarıldı.")
                     
                 except ValueError:
-                    print("Lütfen geçerli numaralar girin!")
+                    self.io.write("Lütfen geçerli numaralar girin!")
                     continue
             
-            print(f"\nÇantanızda {self.inventory.size} ürün kaldı.")
-            print(f"{current_village.name} köyü başarıyla kurtarıldı!")
+            self.io.write(f"\nÇantanızda {self.inventory.size} ürün kaldı.")
+            self.io.write(f"{current_village.name} köyü başarıyla kurtarıldı!")
             
             # Köydeki öğeleri çantaya ekle
-            print("\nKöyden alınan öğeler:")
-            for item in current_village.inventory.items:
-                while True:
-                    if not self.inventory.push(item):
-                        print("\nÇanta dolu! Bir öğe çıkarmalısınız.")
-                        print("\nÇantanızdaki öğeler:")
-                        current = self.inventory.head
-                        i = 1
-                        while current:
-                            print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                            current = current.next
-                            i += 1
-                        item_to_remove = input("\nÇıkarmak istediğiniz öğenin adını girin: ")
-                        if self.inventory.pop(item_to_remove):
-                            if self.inventory.push(item):
-                                print(f"{item_to_remove} çantadan çıkarıldı ve {item.name} eklendi.")
-                                break
-                            else:
-                                print("Çanta hala dolu! Başka bir öğe çıkarmalısınız.")
-                        else:
-                            print("Öğe bulunamadı! Lütfen listedeki öğelerden birini seçin.")
-                            continue
-                    else:
-                        print(f"- {item.name} (Güç: {item.power})")
-                        break
+            self.io.write("\nKöyden alınan öğeler:")
+            yield from self._take_village_items_flow(current_village)
             
-            current_village.is_liberated = True
-            self.remove_current_village()  # Kuyruktan çıkar
+            self._finish_liberation(current_village)
             return
 
         # Normal köyler için
         # Köydeki öğeleri çantaya ekle
-        for item in current_village.inventory.items:
-            while True:
-                if not self.inventory.push(item):
-                    print("\nÇanta dolu! Bir öğe çıkarmalısınız.")
-                    print("\nÇantanızdaki öğeler:")
-                    current = self.inventory.head
-                    i = 1
-                    while current:
-                        print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                        current = current.next
-                        i += 1
-                    item_to_remove = input("\nÇıkarmak istediğiniz öğenin adını girin: ")
-                    if self.inventory.pop(item_to_remove):
-                        if self.inventory.push(item):
-                            print(f"{item_to_remove} çantadan çıkarıldı ve {item.name} eklendi.")
-                            break
-                        else:
-                            print("Çanta hala dolu! Başka bir öğe çıkarmalısınız.")
-                    else:
-                        print("Öğe bulunamadı! Lütfen listedeki öğelerden birini seçin.")
-                    continue
-                else:
-                    print(f"- {item.name} (Güç: {item.power})")
-                    break
+        yield from self._take_village_items_flow(current_village)
 
-        current_village.is_liberated = True
-        self.remove_current_village()  # Kuyruktan çıkar
-        print(f"{current_village.name} köyü başarıyla kurtarıldı!")
-        print("\nKöyden alınan öğeler:")
-        for item in current_village.inventory.items:
-            print(f"- {item.name} (Güç: {item.power})")
+        self._finish_liberation(current_village)
+        self.io.write(f"{current_village.name} köyü başarıyla kurtarıldı!")
+        self.io.write("\nKöyden alınan öğeler:")
+        for item in current_village.inventory:
+            self.io.write(f"- {item.name} (Güç: {item.power})")
 
     def _count_villages(self):
         """Kuyruktaki köy sayısını döndürür"""
         return self.liberation_queue.size
 
+    @_counted_action
     def show_progress(self):
-        print("\n=== İlerleme Durumu ===")
-        
-        # Tüm köylerin listesi
-        all_villages = ["Yeşilvadi", "Gümüşköy", "Altınşehir", "Demirtepe", 
-                       "Kristalköy", "Zümrütvadi", "Elmasşehir"]
+        self.io.write("\n=== İlerleme Durumu ===")
         
         # Şu anki köyü göster
         current_village = self.get_current_village()
         if current_village:
-            print(f"Şu anki köy: {current_village.name}")
+            self.io.write(f"Şu anki köy: {current_village.name}")
         else:
-            print("Tüm köyler kurtarıldı!")
+            self.io.write("Tüm köyler kurtarıldı!")
             
-        print("\nKurtarılan köyler:")
-        liberated_count = 0
-        for village_name in all_villages:
-            # Köy bağlı listede kurtarılmış olarak işaretlenmişse
-            found = False
-            current = self.villages
-            while current:
-                if current.village.name == village_name and current.village.is_liberated:
-                    found = True
-                    break
-                current = current.next
-            if found:
-                print(f"- {village_name}")
-                liberated_count += 1
-                
-        print("\nKurtarılacak köyler:")
-        remaining_count = 0
+        # Ekran tek bir liste olarak oluşturulup sayfalanır
+        liberated = []
+        remaining = []
         current = self.villages
         while current:
-            if not current.village.is_liberated:
-                print(f"- {current.village.name}")
-                remaining_count += 1
+            # Köy bağlı listede kurtarılmış olarak işaretlenmişse
+            if current.village.is_liberated:
+                liberated.append(f"- {current.village.name}")
+            else:
+                remaining.append(f"- {current.village.name}")
             current = current.next
-                
-        print(f"\nToplam ilerleme: {liberated_count}/7 köy kurtarıldı.")
+
+        lines = ["", "Kurtarılan köyler:"] + liberated + ["", "Kurtarılacak köyler:"] + remaining
+        lines += ["", f"Toplam ilerleme: {len(liberated)}/{self.village_count} köy kurtarıldı."]
+        self.io.write_lines(lines)
+
+    def _run(self, flow):
+        """Etkileşimli akışı eşzamanlı çalıştırır; her istem io.read ile yanıtlanır.
+
+        Akışlar (..._flow metodları) girdi gerektiğinde istemi yield eder ve
+        cevabı send ile alır. Sunucu gibi eşzamansız sürücüler aynı akışları
+        kendi okuma döngüleriyle çalıştırır.
+        """
+        try:
+            prompt = next(flow)
+            while True:
+                prompt = flow.send(self.io.read(prompt))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            flow.close()
 
     def show_menu(self):
+        self._run(self.menu_flow())
+
+    def menu_flow(self):
+        """Ana menü akışı; "7" seçilince biter"""
         while True:
-            os.system('cls' if os.name == 'nt' else 'clear')  # Terminali temizle
-            print("\n=== Köy Kurtarma Oyunu ===")
-            print("1. Köyleri Listele")
-            print("2. Çantayı Görüntüle")
-            print("3. Köy Kurtar")
-            print("4. Öğe Kullan/Çıkar")
-            print("5. Arama Yap")
-            print("6. İlerleme Durumu")
-            print("7. Çıkış")
-            
-            choice = input("\nSeçiminiz (1-7): ")
+            self.io.clear()
+            self.io.write("\n=== Köy Kurtarma Oyunu ===")
+            self.io.write("1. Köyleri Listele")
+            self.io.write("2. Çantayı Görüntüle")
+            self.io.write("3. Köy Kurtar")
+            self.io.write("4. Öğe Kullan/Çıkar")
+            self.io.write("5. Arama Yap")
+            self.io.write("6. İlerleme Durumu")
+            self.io.write("7. Çıkış")
+
+            if self.history is not None:
+                self.history.commit()
+            choice = yield PROMPT_MENU
             
             if choice == "1":
                 self.list_villages()
-                input("\nDevam etmek için Enter'a basın...")
             elif choice == "2":
                 self.show_inventory()
-                input("\nDevam etmek için Enter'a basın...")
             elif choice == "3":
-                self.liberate_village()
-                input("\nDevam etmek için Enter'a basın...")
+                yield from _counted_flow("liberate_village", self._liberate_village_flow())
             elif choice == "4":
-                self.use_item()
-                input("\nDevam etmek için Enter'a basın...")
+                yield from _counted_flow("use_item", self._use_item_flow())
             elif choice == "5":
-                self.search_item()
-                input("\nDevam etmek için Enter'a basın...")
+                yield from _counted_flow("search_item", self._search_item_flow())
             elif choice == "6":
                 self.show_progress()
-                input("\nDevam etmek için Enter'a basın...")
             elif choice == "7":
-                print("Oyun sonlandırılıyor...")
-                sys.exit()
+                self.io.write("Oyun sonlandırılıyor...")
+                self.io.flush()
+                return
             else:
-                print("Geçersiz seçim!")
-                input("\nDevam etmek için Enter'a basın...")
+                self.io.write("Geçersiz seçim!")
+            yield PROMPT_CONTINUE
 
+    @_counted_action
     def show_inventory(self):
-        self.inventory.show_inventory()
+        lines = []
+        self.inventory.show_inventory(lines.append)
+        self.io.write_lines("\n".join(lines).split("\n"))
 
     def use_item(self):
-        print("\n1. Öğe Kullan")
-        print("2. Öğe Çıkar")
-        choice = input("\nSeçiminiz (1-2): ")
+        self._run(_counted_flow("use_item", self._use_item_flow()))
+
+    def _use_item_flow(self):
+        self.io.write("\n1. Öğe Kullan")
+        self.io.write("2. Öğe Çıkar")
+        if self.history is not None:
+            self.io.write("3. Geri Al")
+            self.io.write("4. Yinele")
+            choice = yield PROMPT_ITEM_ACTION_HISTORY
+        else:
+            choice = yield PROMPT_ITEM_ACTION
         
         if choice == "1":
             if not self.inventory.head:
-                print("\nÇanta boş!")
+                self.io.write("\nÇanta boş!")
                 return
                 
-            print("\nÇantanızdaki öğeler:")
-            current = self.inventory.head
-            i = 1
-            while current:
-                print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                current = current.next
-                i += 1
+            self._show_bag()
                 
-            item_name = input("\nKullanmak istediğiniz öğenin adını girin: ")
+            item_name = self._complete_name(
+                (yield PROMPT_USE_ITEM), self.inventory.names)
             if self.inventory.pop(item_name):
-                print(f"{item_name} başarıyla kullanıldı!")
+                self.io.write(f"{item_name} başarıyla kullanıldı!")
             else:
-                print("Öğe bulunamadı!")
+                self.io.write("Öğe bulunamadı!")
+                self._suggest_names(item_name, self.inventory.names)
                 
         elif choice == "2":
             if not self.inventory.head:
-                print("\nÇanta boş!")
+                self.io.write("\nÇanta boş!")
                 return
                 
-            print("\nÇantanızdaki öğeler:")
-            current = self.inventory.head
-            i = 1
-            while current:
-                print(f"{i}. {current.item.name} (Güç: {current.item.power})")
-                current = current.next
-                i += 1
+            self._show_bag()
                 
-            item_name = input("\nÇıkarmak istediğiniz öğenin adını girin: ")
+            item_name = self._complete_name(
+                (yield PROMPT_REMOVE_ITEM), self.inventory.names)
             if self.inventory.pop(item_name):
-                print(f"{item_name} başarıyla çantadan çıkarıldı!")
+                self.io.write(f"{item_name} başarıyla çantadan çıkarıldı!")
             else:
-                print("Öğe bulunamadı!")
+                self.io.write("Öğe bulunamadı!")
+                self._suggest_names(item_name, self.inventory.names)
+        elif choice == "3" and self.history is not None:
+            if self.history.undo():
+                self.io.write("\nSon işlem geri alındı.")
+            else:
+                self.io.write("\nGeri alınacak işlem yok.")
+        elif choice == "4" and self.history is not None:
+            if self.history.redo():
+                self.io.write("\nGeri alınan işlem yinelendi.")
+            else:
+                self.io.write("\nYinelenecek işlem yok.")
         else:
-            print("Geçersiz seçim!")
+            self.io.write("Geçersiz seçim!")
 
     def search_item(self):
-        print("\n1. Çantada ara")
-        print("2. Köylerde ara")
-        choice = input("Seçiminiz (1-2): ")
+        self._run(_counted_flow("search_item", self._search_item_flow()))
+
+    def _search_item_flow(self):
+        self.io.write("\n1. Çantada ara")
+        self.io.write("2. Köylerde ara")
+        choice = yield PROMPT_SEARCH_TARGET
         
-        item_name = input("Aranacak öğenin adını girin: ")
+        item_name = yield PROMPT_SEARCH_NAME
         
         if choice == "1":
             # BST'de ara
-            found_item = self.inventory.search_item(item_name)
+            found_item = self.inventory.search_item(self._complete_name(item_name, self.inventory.names))
             if found_item:
-                print(f"{found_item.name} çantada bulundu!")
+                self.io.write(f"{found_item.name} çantada bulundu!")
             else:
-                print("Öğe çantada bulunamadı!")
+                self.io.write("Öğe çantada bulunamadı!")
+                self._suggest_names(item_name, self.inventory.names)
         elif choice == "2":
-            found_in_villages = []
-            current = self.villages
-            while current:
-                # Her köyün BST'sinde ara
-                if current.village.inventory.search(item_name):
-                    found_in_villages.append(current.village.name)
-                current = current.next
+            # Ters indeksten öğeyi içeren köyleri al
+            item_name = self._complete_name(item_name, self.item_index.names)
+            found_in_villages = self.item_index.lookup(item_name)
             
             if found_in_villages:
-                print(f"\n{item_name} şu köylerde bulundu:")
-                for village_name in found_in_villages:
-                    print(f"- {village_name}")
+                self.io.write(f"\n{item_name} şu köylerde bulundu:")
+                self.io.write_lines([f"- {village.name}" for village in found_in_villages])
             else:
-                print("Öğe hiçbir köyde bulunamadı!")
+                self.io.write("Öğe hiçbir köyde bulunamadı!")
+                self._suggest_names(item_name, self.item_index.names)
         else:
-            print("Geçersiz seçim!")
+            self.io.write("Geçersiz seçim!")
 
     def initialize_villages(self):
         # Tüm öğeleri tanımla
@@ -908,30 +1875,61 @@ class Game:
             "Elmasşehir": [all_items["Bakır"], all_items["Meşale"], all_items["Büyü"]]
         }
         
-        # Köyleri yeniden oluştur
+        # Özel kurallı köyler
+        village_rules = {
+            "Kristalköy": RULE_SACRIFICE,
+            "Zümrütvadi": RULE_PUZZLE,
+            "Elmasşehir": RULE_BAG_LIMIT
+        }
+        
+        # Köyleri yeniden oluştur (ağaçlar ilk kullanımda kurulur)
         current = self.villages
         while current:
-            village_name = current.village.name
-            # Köyün envanterini temizle
-            current.village.inventory = AVLTree()
-            # Köye öğeleri ekle
-            for item in village_items[village_name]:
-                current.village.add_item(item)
+            current.village.set_items(village_items[current.village.name])
+            current.village.rule = village_rules.get(current.village.name, RULE_NORMAL)
+            current.village.item_index = None
             current = current.next
+        self._item_index = None  # Ters indeks sonraki aramada yeniden kurulur
+        self._catalog = ItemCatalog(all_items.values())
 
+    @_counted_action
     def list_villages(self):
-        print("\n=== Köyler ===")
+        self.io.write("\n=== Köyler ===")
+        lines = []
         current = self.villages
         i = 1
         while current:
             status = "Kurtarıldı" if current.village.is_liberated else "Kurtarılmadı"
-            items_str = ", ".join([item.name for item in current.village.inventory.items])
-            print(f"{i}. {current.village.name} - {status}")
-            print(f"   Öğeler: {items_str}")
-            print()
+            items_str = ", ".join([item.name for item in current.village.inventory])
+            lines.append(f"{i}. {current.village.name} - {status}")
+            lines.append(f"   Öğeler: {items_str}")
+            lines.append("")
             current = current.next
             i += 1
+        self.io.write_lines(lines)
 
 if __name__ == "__main__":
-    game = Game()
-    game.show_menu() 
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Köy Kurtarma Oyunu")
+    parser.add_argument("world", nargs="?", help="dünya dosyası (.jsonl, .csv, .json)")
+    parser.add_argument("--record", metavar="DOSYA",
+                        help="oturumu tekrar oynatılabilir olay kaydına yaz (bkz. replay.py)")
+    args = parser.parse_args()
+    if args.world:
+        # Dünya dosyası verilmişse köyler dosyadan okunur
+        from world import load_world
+        game = Game(villages=load_world(args.world))
+    else:
+        game = Game()
+    from persistent import GameHistory
+    game.history = GameHistory(game)
+    recorder = None
+    if args.record:
+        from replay import Recorder
+        recorder = Recorder(game, args.record)
+    try:
+        game.show_menu()
+    finally:
+        if recorder is not None:
+            recorder.close() 
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Öğe adları için önek tamamlama ve yazım hatası toleranslı arama.
+
+Önek araması sıralı anahtar dizisi üzerinde bisect ile yapılır. "Bunu mu
+demek istediniz?" önerileri için simetrik silme indeksi kullanılır: her
+ad, en fazla max_distance harfi silinmiş biçimleri üzerinden indekslenir.
+Sorgu da aynı şekilde silme biçimlerine ayrıldığından aday bulmak birkaç
+sözlük erişimi tutar; adaylar gerçek düzenleme mesafesiyle doğrulanır.
+Böylece BK-ağacındaki gibi binlerce mesafe hesabı yapılmaz.
+
+Silme biçimleri dizgi olarak saklanmaz. Her biçim, 32 bitlik özetinin
+(hash) alt 16 bitine göre sabit sayıdaki kovadan birine, özet ve adın
+numarası tek bir 64 bitlik tamsayıya paketlenerek array("Q") içinde yazılır.
+Böylece biçim başına nesne ve sözlük girdisi tutulmaz; indeks ad eklenip
+çıkarıldıkça artımlı güncellenir. Özet çakışmaları yalnızca fazladan aday
+üretir, adaylar zaten düzenleme mesafesiyle doğrulanır.
+"""
+from array import array
+from bisect import bisect_left, insort
+from itertools import combinations
+from typing import List, Optional
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Bitişik harf yer değiştirmesini de sayan (OSA) düzenleme mesafesi.
+
+    Mesafe limit'i aşınca hesaplama kesilir ve limit + 1 döndürülür.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def _deletes(key: str, max_distance: int):
+    """Anahtarın en fazla max_distance harf silinerek elde edilen tüm biçimleri"""
+    variants = {key}
+    if max_distance == 1:
+        # Varsayılan mesafe için dilimlerle (birleşimler üretmeden) hesaplanır
+        variants.update(key[:i] + key[i + 1:] for i in range(len(key)))
+        return variants
+    for removed in range(1, min(max_distance, len(key)) + 1):
+        for positions in combinations(range(len(key)), removed):
+            variants.add("".join(ch for i, ch in enumerate(key) if i not in positions))
+    return variants
+
+
+_HASH_MASK = 0xFFFFFFFF  # Biçim özetinin saklanan 32 biti
+_ID_MASK = 0xFFFFFFFF  # Paketlenmiş değerin alt yarısı: anahtar numarası
+_BUCKET_MASK = 0xFFFF  # En fazla 65536 kova; boş kovalar tutulmaz
+
+
+class NameIndex:
+    """Artımlı olarak güncellenen ad indeksi: önek tamamlama ve öneri"""
+
+    def __init__(self, max_distance: int = 1):
+        self.max_distance = max_distance
+        self._names = {}  # Küçük harfli anahtar -> [görünen ad, adet, numara]
+        self._keys = []  # Sıralı anahtarlar
+        self._key_table = []  # Numara -> anahtar (boşalan numaralar yeniden kullanılır)
+        self._free_ids = []
+        self._buckets = {}  # Kova -> array("Q") of (biçim özeti << 32 | anahtar numarası)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._names
+
+    def add(self, name: str, key: Optional[str] = None):
+        """Adı ekler; küçük harfli anahtar zaten hesaplandıysa key ile paylaşılır"""
+        if key is None:
+            key = name.lower()
+        entry = self._names.get(key)
+        if entry is not None:
+            entry[1] += 1
+            return
+        if self._free_ids:
+            key_id = self._free_ids.pop()
+            self._key_table[key_id] = key
+        else:
+            key_id = len(self._key_table)
+            self._key_table.append(key)
+        self._names[key] = [name, 1, key_id]
+        insort(self._keys, key)
+        buckets = self._buckets
+        for variant in _deletes(key, self.max_distance):
+            digest = hash(variant) & _HASH_MASK
+            bucket = buckets.get(digest & _BUCKET_MASK)
+            if bucket is None:
+                bucket = buckets[digest & _BUCKET_MASK] = array("Q")
+            bucket.append(digest << 32 | key_id)
+
+    def remove(self, name: str):
+        key = name.lower()
+        entry = self._names.get(key)
+        if entry is None:
+            return
+        if entry[1] > 1:
+            entry[1] -= 1
+            return
+        key_id = entry[2]
+        del self._names[key]
+        del self._keys[bisect_left(self._keys, key)]
+        self._key_table[key_id] = None
+        self._free_ids.append(key_id)
+        buckets = self._buckets
+        for variant in _deletes(key, self.max_distance):
+            digest = hash(variant) & _HASH_MASK
+            bucket = buckets[digest & _BUCKET_MASK]
+            bucket.remove(digest << 32 | key_id)
+            if not bucket:
+                del buckets[digest & _BUCKET_MASK]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Verilen önekle başlayan adları alfabetik sırada döndürür"""
+        prefix = prefix.lower()
+        keys = self._keys
+        result = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and len(result) < limit and keys[i].startswith(prefix):
+            result.append(self._names[keys[i]][0])
+            i += 1
+        return result
+
+    def suggest(self, name: str, limit: int = 5) -> List[str]:
+        """Yazılan ada düzenleme mesafesi max_distance'ı geçmeyen adları döndürür"""
+        key = name.lower()
+        candidates = set()
+        for variant in _deletes(key, self.max_distance):
+            digest = hash(variant) & _HASH_MASK
+            bucket = self._buckets.get(digest & _BUCKET_MASK)
+            if bucket:
+                for packed in bucket:
+                    if packed >> 32 == digest:
+                        candidates.add(self._key_table[packed & _ID_MASK])
+        scored = []
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, self.max_distance)
+            if distance <= self.max_distance:
+                scored.append((distance, candidate))
+        scored.sort()
+        return [self._names[candidate][0] for _, candidate in scored[:limit]]
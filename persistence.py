@@ -0,0 +1,445 @@
+"""Oyun durumunu ikili anlık görüntü ve ekleme yapılan işlem günlüğü ile saklar.
+
+Anlık görüntü (snapshot) biçimi, tüm sayılar little-endian ve 4 bayttır:
+    başlık: b"KKOS", sürüm, ayrılmış, metin/öğe/köy/köy öğesi/kuyruk/çanta
+            sayıları ve çanta kapasitesi
+    metin ofsetleri   I x (metin sayısı + 1)
+    öğe adları        I x öğe sayısı (metin tablosundaki sıra)
+    öğe güçleri       i x öğe sayısı
+    köy kayıtları     I x 4 x köy sayısı (ad, bayraklar, ilk köy öğesi, köy öğesi sayısı);
+                      bayrakların 0. biti kurtarılma, 1-3. bitleri köy kuralıdır
+    köy öğeleri       I x 2 x köy öğesi sayısı (öğe no, adet)
+    kurtarma sırası   I x sıra uzunluğu (köy no, kurtarılma sırasıyla)
+    çanta             I x çanta boyutu (öğe no, eklenme sırasıyla)
+    metin verisi      UTF-8 (her metin bir kez saklanır)
+
+Dosya yüklenirken mmap ile açılır ve bölümler memoryview üzerinden okunur.
+Yükleme yalnızca köy adlarını, kuyruğu ve çantayı çözer; köy öğeleri ve öğe
+adları ilk gerektiklerinde (köy ağacı, arama, kaydetme) okunur.
+
+Günlük (journal) dosyası anlık görüntüden sonraki değişiklikleri tutar;
+her değişiklik dosyanın sonuna birkaç baytlık bir kayıt olarak eklenir:
+    b"KKOJ" + sürüm, ardından kayıtlar:
+    PUSH     B H ad i güç
+    REMOVE   B H ad
+    POP      B
+    LIBERATE B I köy no
+    PUZZLE   B H cevap (yalnızca oturum kayıtlarında; bkz. replay.py)
+"""
+import gc
+import mmap
+import os
+import struct
+from array import array
+from functools import partial
+from typing import List, Optional
+
+from main import RULES, Game, Inventory, Item, Village, VillageScheduler
+
+_SNAPSHOT_HEADER = struct.Struct("<4sHHIIIIIII")
+_SNAPSHOT_MAGIC = b"KKOS"
+_JOURNAL_HEADER = struct.Struct("<4sH")
+_JOURNAL_MAGIC = b"KKOJ"
+_VERSION = 1
+
+_FLAG_LIBERATED = 1
+# Köy kuralı bayrakların 1. bitinden başlar; 0 kural kaydedilmemiş demektir
+_RULE_SHIFT = 1
+_RULE_MASK = 0b111
+_RULE_CODES = {rule: code for code, rule in enumerate(RULES, 1)}
+
+_OP_PUSH = 1
+_OP_REMOVE = 2
+_OP_POP = 3
+_OP_LIBERATE = 4
+_OP_PUZZLE = 5
+_JOURNAL_OPS = (_OP_PUSH, _OP_REMOVE, _OP_POP, _OP_LIBERATE, _OP_PUZZLE)
+
+_OP = struct.Struct("<B")
+_NAME_LENGTH = struct.Struct("<H")
+_POWER = struct.Struct("<i")
+_VILLAGE_ID = struct.Struct("<I")
+
+
+def journal_path(path: str) -> str:
+    return path + ".journal"
+
+
+def _game_villages(game: Game):
+    current = game.villages
+    while current:
+        yield current.village
+        current = current.next
+
+
+def _queue_villages(game: Game):
+    return iter(game.liberation_queue)
+
+
+class _StringTable:
+    """Metinleri bir kez saklayıp sıra numarası veren tablo"""
+
+    def __init__(self):
+        self.ids = {}
+        self.blob = bytearray()
+        self.offsets = array("I", [0])
+
+    def intern(self, text: str) -> int:
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.offsets) - 1
+            self.blob += text.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return string_id
+
+
+def dumps(game: Game) -> bytes:
+    """Oyun durumunu anlık görüntü baytlarına dönüştürür"""
+    strings = _StringTable()
+    item_ids = {}  # (ad, güç) -> öğe no
+    item_names = array("I")
+    item_powers = array("i")
+
+    def item_id(item: Item) -> int:
+        key = (item.name, item.power)
+        found = item_ids.get(key)
+        if found is None:
+            found = item_ids[key] = len(item_names)
+            item_names.append(strings.intern(item.name))
+            item_powers.append(item.power)
+        return found
+
+    village_ids = {}
+    village_records = array("I")
+    entries = array("I")
+    for village in _game_villages(game):
+        village_ids[village] = len(village_ids)
+        start = len(entries) // 2
+        for item, count in village.item_counts():
+            entries.append(item_id(item))
+            entries.append(count)
+        flags = _FLAG_LIBERATED if village.is_liberated else 0
+        flags |= _RULE_CODES.get(village.rule, 0) << _RULE_SHIFT
+        village_records.extend((strings.intern(village.name), flags, start, len(entries) // 2 - start))
+
+    queue = array("I", (village_ids[village] for village in _queue_villages(game)))
+    bag = array("I", (item_id(item) for item in game.inventory))
+
+    header = _SNAPSHOT_HEADER.pack(
+        _SNAPSHOT_MAGIC, _VERSION, 0, len(strings.offsets) - 1, len(item_names),
+        len(village_records) // 4, len(entries) // 2, len(queue), len(bag),
+        game.inventory.max_capacity)
+    parts = [header, strings.offsets, item_names, item_powers, village_records,
+             entries, queue, bag, strings.blob]
+    return b"".join(part if isinstance(part, (bytes, bytearray)) else part.tobytes() for part in parts)
+
+
+class _SnapshotItems:
+    """Anlık görüntünün öğe tablosu ve köy öğesi blokları.
+
+    Bölümler mmap kapandıktan sonra da okunabilsin diye kopyalanır, ancak
+    çözülmez: öğe nesneleri ilk istendiklerinde oluşturulur ve paylaşılır.
+    Günlük uygulanırken (ad, güç) ile aranabilir (get / []=).
+    """
+
+    def __init__(self, blob: bytes, offsets, names, powers, entries):
+        self._blob = blob
+        self._offsets = array("I", offsets)
+        self._names = array("I", names)
+        self._powers = array("i", powers)
+        self._entries = array("I", entries)
+        self._items: List[Optional[Item]] = [None] * len(self._names)
+        self._by_key = None  # (ad, güç) -> öğe; ilk aramada kurulur
+
+    def string(self, string_id: int) -> str:
+        offsets = self._offsets
+        return self._blob[offsets[string_id]:offsets[string_id + 1]].decode("utf-8")
+
+    def item(self, item_id: int) -> Item:
+        item = self._items[item_id]
+        if item is None:
+            item = self._items[item_id] = Item(self.string(self._names[item_id]), self._powers[item_id])
+        return item
+
+    def village_items(self, start: int, count: int) -> List[Item]:
+        """Köyün start'tan başlayan count (öğe no, adet) kaydını öğe listesine çevirir"""
+        entries = self._entries
+        village_items = []
+        for e in range(start, start + count):
+            village_items.extend([self.item(entries[2 * e])] * entries[2 * e + 1])
+        return village_items
+
+    def get(self, key):
+        if self._by_key is None:
+            self._by_key = {}
+            for item_id in range(len(self._items)):
+                item = self.item(item_id)
+                self._by_key.setdefault((item.name, item.power), item)
+        return self._by_key.get(key)
+
+    def __setitem__(self, key, item: Item):
+        self.get(key)
+        self._by_key[key] = item
+
+
+def _loads(data, io=None):
+    """Anlık görüntü baytlarından (bytes veya mmap) oyunu ve öğe tablosunu kurar"""
+    (magic, version, _, string_count, item_count, village_count, entry_count,
+     queue_length, bag_size, capacity) = _SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != _SNAPSHOT_MAGIC or version != _VERSION:
+        raise ValueError("Geçersiz kayıt dosyası")
+
+    view = memoryview(data)
+    offset = _SNAPSHOT_HEADER.size
+
+    def section(count: int, fmt: str = "I"):
+        nonlocal offset
+        part = view[offset:offset + count * 4].cast(fmt)
+        offset += count * 4
+        return part
+
+    offsets = section(string_count + 1)
+    names = section(item_count)
+    powers = section(item_count, "i")
+    village_records = section(village_count * 4)
+    entries = section(entry_count * 2)
+    queue = section(queue_length)
+    bag = section(bag_size)
+    blob = bytes(view[offset:offset + (offsets[-1] if string_count else 0)])
+    items = _SnapshotItems(blob, offsets, names, powers, entries)
+
+    villages = []
+    records = village_records.tolist()
+    for v in range(0, 4 * village_count, 4):
+        name_id, flags, start, count = records[v:v + 4]
+        rule_code = (flags >> _RULE_SHIFT) & _RULE_MASK
+        village = Village(items.string(name_id), rule=RULES[rule_code - 1] if rule_code else None)
+        # Köyün öğeleri (ve ağacı) ilk kullanımda okunur
+        village.set_item_loader(partial(items.village_items, start, count))
+        village.is_liberated = bool(flags & _FLAG_LIBERATED)
+        villages.append(village)
+
+    inventory = Inventory(max_capacity=capacity)
+    inventory.push_many(items.item(item_id) for item_id in bag)
+
+    game = Game(io=io, villages=villages, inventory=inventory)
+    # Game kurtarılmamış köyleri liste sırasıyla kuyruğa ekler; kayıttaki sıra
+    # farklıysa kuyruk yeniden kurulur
+    default_order = [i for i, village in enumerate(villages) if not village.is_liberated]
+    if queue.tolist() != default_order:
+        game.liberation_queue = VillageScheduler(villages=[villages[queue[i]] for i in range(queue_length)])
+
+    for part in (offsets, names, powers, village_records, entries, queue, bag):
+        part.release()
+    view.release()
+    return game, items
+
+
+def save(game: Game, path: str):
+    """Anlık görüntüyü güvenli şekilde (geçici dosya + yer değiştirme) yazar, günlüğü sıfırlar"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(dumps(game))
+    os.replace(temp_path, path)
+    with open(journal_path(path), "wb") as f:
+        f.write(_JOURNAL_HEADER.pack(_JOURNAL_MAGIC, _VERSION))
+
+
+def _apply_records(game: Game, villages, shared_items, data, offset: int, end: int,
+                   limit: int = -1):
+    """data[offset:end] içindeki kayıtları oyuna uygular; (ofset, uygulanan kayıt) döndürür.
+
+    limit kayıt uygulandığında, yarım kalmış bir kayıtta veya burada bilinmeyen
+    bir kayıt türünde durulur; dönen ofset durulan kaydın başıdır.
+    """
+    inventory = game.inventory
+    queue = game.liberation_queue
+    applied = 0
+    try:
+        while offset < end and applied != limit:
+            start = offset
+            op = data[offset]
+            offset += 1
+            if op == _OP_PUSH or op == _OP_REMOVE or op == _OP_PUZZLE:
+                (length,) = _NAME_LENGTH.unpack_from(data, offset)
+                offset += _NAME_LENGTH.size
+                if offset + length > end:
+                    return start, applied
+                if op == _OP_PUSH:
+                    name = bytes(data[offset:offset + length]).decode("utf-8")
+                    offset += length
+                    (power,) = _POWER.unpack_from(data, offset)
+                    offset += _POWER.size
+                    item = shared_items.get((name, power))
+                    if item is None:
+                        item = shared_items[(name, power)] = Item(name, power)
+                    inventory.push(item)
+                elif op == _OP_REMOVE:
+                    inventory.use_item(bytes(data[offset:offset + length]).decode("utf-8"))
+                    offset += length
+                else:
+                    offset += length  # Bulmaca cevabı durumu değiştirmez
+            elif op == _OP_POP:
+                inventory.pop()
+            elif op == _OP_LIBERATE:
+                (village_id,) = _VILLAGE_ID.unpack_from(data, offset)
+                offset += _VILLAGE_ID.size
+                village = villages[village_id]
+                village.is_liberated = True
+                queue.remove(village)
+            else:
+                return start, applied
+            applied += 1
+    except struct.error:
+        return start, applied  # Yazılırken kesilmiş son kayıt
+    return offset, applied
+
+
+def _records_end(data, offset: int) -> int:
+    """data[offset:] içindeki son tam kaydın bittiği ofset.
+
+    Yarım kalmış bir kayıtta durulur; bilinmeyen bir kayıt türü hatadır.
+    """
+    end = len(data)
+    while offset < end:
+        op = data[offset]
+        if op == _OP_PUSH or op == _OP_REMOVE or op == _OP_PUZZLE:
+            size = _OP.size + _NAME_LENGTH.size
+            if offset + size > end:
+                break
+            (length,) = _NAME_LENGTH.unpack_from(data, offset + _OP.size)
+            size += length + (_POWER.size if op == _OP_PUSH else 0)
+        elif op == _OP_POP:
+            size = _OP.size
+        elif op == _OP_LIBERATE:
+            size = _OP.size + _VILLAGE_ID.size
+        else:
+            raise ValueError(f"Bilinmeyen günlük kaydı: {op}")
+        if offset + size > end:
+            break
+        offset += size
+    return offset
+
+
+def _replay(game: Game, items, path: str):
+    """Günlükteki kayıtları oyuna uygular; yarım kalmış son kayıt yok sayılır"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+    if len(data) < _JOURNAL_HEADER.size:
+        return  # Boş ya da başlığı yarım kalmış günlükte uygulanacak kayıt yok
+    magic, version = _JOURNAL_HEADER.unpack_from(data, 0)
+    if magic != _JOURNAL_MAGIC or version != _VERSION:
+        raise ValueError("Geçersiz günlük dosyası")
+
+    offset, _ = _apply_records(game, list(_game_villages(game)), items,
+                               data, _JOURNAL_HEADER.size, len(data))
+    if offset < len(data) and data[offset] not in _JOURNAL_OPS:
+        raise ValueError(f"Bilinmeyen günlük kaydı: {data[offset]}")
+
+
+def load(path: str, io=None) -> Game:
+    """Anlık görüntüyü mmap ile açar, günlüğü uygulayarak oyunu döndürür"""
+    # Yüz binlerce nesne oluşturulurken çöp toplayıcı bütün yığını defalarca
+    # tarar; yükleme boyunca kapatılır, döngüler sonraki toplamada temizlenir
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                game, items = _loads(data, io)
+        _replay(game, items, journal_path(path))
+    finally:
+        if collecting:
+            gc.enable()
+    return game
+
+
+def _encode_inventory_event(event: str, data) -> bytes:
+    if event == "push":
+        name = data.name.encode("utf-8")
+        return _OP.pack(_OP_PUSH) + _NAME_LENGTH.pack(len(name)) + name + _POWER.pack(data.power)
+    if event == "remove":
+        name = data.encode("utf-8")
+        return _OP.pack(_OP_REMOVE) + _NAME_LENGTH.pack(len(name)) + name
+    if event == "pop":
+        return _OP.pack(_OP_POP)
+    return b""
+
+
+class Journal:
+    """Oyundaki değişiklikleri günlük dosyasına ekleyen otomatik kayıt.
+
+    compact_every kayıttan sonra anlık görüntü yeniden yazılır ve günlük
+    sıfırlanır; böylece günlük sınırsız büyümez.
+    """
+
+    def __init__(self, game: Game, path: str, compact_every: int = 10000):
+        self.game = game
+        self.path = path
+        self.compact_every = compact_every
+        self.records = 0
+        self._village_ids = {village: i for i, village in enumerate(_game_villages(game))}
+        self._file = open(journal_path(path), "ab")
+        if self._file.tell() < _JOURNAL_HEADER.size:
+            self._file.truncate(0)  # Başlığı yarım kalmış günlük boş sayılır
+            self._file.write(_JOURNAL_HEADER.pack(_JOURNAL_MAGIC, _VERSION))
+            self._file.flush()
+        else:
+            self._drop_torn_record()
+        game.listeners.append(self._on_game_event)
+        game.inventory.listeners.append(self._on_inventory_event)
+
+    def _drop_torn_record(self):
+        """Yazılırken kesilmiş son kaydı siler; yeni kayıtlar onun arkasına eklenmemeli"""
+        with open(journal_path(self.path), "rb") as f:
+            data = f.read()
+        end = _records_end(data, _JOURNAL_HEADER.size)
+        if end < len(data):
+            self._file.truncate(end)
+
+    def _append(self, record: bytes):
+        self._file.write(record)
+        self._file.flush()
+        self.records += 1
+        # push_many sürerken çantanın sıralı görünümü geride kalır; sıkıştırma
+        # toplu ekleme bitince ("batch_end") yapılır
+        if self.records >= self.compact_every and not self.game.inventory.in_batch:
+            self.compact()
+
+    def _on_inventory_event(self, event: str, data):
+        if event == "batch_end":
+            if self.records >= self.compact_every:
+                self.compact()
+            return
+        record = _encode_inventory_event(event, data)
+        if record:
+            self._append(record)
+
+    def _on_game_event(self, event: str, data):
+        if event == "liberate":
+            self._append(_OP.pack(_OP_LIBERATE) + _VILLAGE_ID.pack(self._village_ids[data]))
+        elif event == "restore":
+            # Geri almada köy bayrakları da geri döner; günlükte karşılığı
+            # olmadığından güncel durum anlık görüntüye yazılır
+            self.compact()
+
+    def compact(self):
+        """Güncel durumu anlık görüntüye yazar ve günlüğü boşaltır"""
+        self._file.close()
+        save(self.game, self.path)
+        self._file = open(journal_path(self.path), "ab")
+        self.records = 0
+
+    def close(self):
+        self.game.listeners.remove(self._on_game_event)
+        self.game.inventory.listeners.remove(self._on_inventory_event)
+        self._file.close()
+
+
+def enable_autosave(game: Game, path: str, compact_every: int = 10000) -> Journal:
+    """Oyunun anlık görüntüsünü yazar ve sonraki değişiklikleri günlüğe kaydetmeye başlar"""
+    save(game, path)
+    return Journal(game, path, compact_every)
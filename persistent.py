@@ -0,0 +1,439 @@
+"""Kalıcı (persistent) AVL ağacı ve oyun durumu geçmişi.
+
+PersistentAVLTree değiştirilemez bir sıralı eşlemedir: insert/delete ağacı
+değiştirmez, yeni bir sürüm döndürür. Yeni sürüm yalnızca kökten değişen
+düğüme kadar olan yolu kopyalar (path copying); diğer alt ağaçlar eski
+sürümle paylaşılır. Böylece her sürüm O(log n) ek bellek tutar.
+
+GameHistory oyunun değişikliklerini (persistence.Journal gibi) dinleyicilerle
+izler ve durumu üç kalıcı ağaçta tutar:
+    bag        eklenme no -> öğe (çantanın eklenme sırası)
+    names      (küçük harfli ad, eklenme no) -> None (isimdeki en eski öğe)
+    liberated  köy no -> True
+
+Ana menüye her dönüşte (commit) değişen durum yeni bir sürüm olur; geri alma
+(undo) bir önceki sürüme, yineleme (redo) sonrakine döner. snapshot(ad) o anki
+sürüme isim verir, restore(ad) o sürüme döner. Geri yüklemede çanta, eklenme
+sırasındaki ilk farklı öğeden itibaren yeniden kurulur; köy bayrakları yalnızca
+iki sürüm arasında değişen köyler için güncellenir. Köylerin kendi öğe ağaçları
+oyun sırasında değişmediği için geçmişe dahil edilmez.
+
+Kullanım:
+    from persistent import GameHistory
+    game.history = GameHistory(game)   # Öğe Kullan/Çıkar menüsünde 3/4 seçenekleri açılır
+"""
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from main import Game
+
+
+class _Node:
+    __slots__ = ("key", "value", "left", "right", "height", "size")
+
+    def __init__(self, key, value, left, right):
+        self.key = key
+        self.value = value
+        self.left = left
+        self.right = right
+        self.height = 1 + max(left.height if left else 0, right.height if right else 0)
+        self.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+
+
+def _height(node: Optional[_Node]) -> int:
+    return node.height if node else 0
+
+
+def _balance(key, value, left: Optional[_Node], right: Optional[_Node]) -> _Node:
+    """Yeni düğümü oluşturur; gerekirse döndürmeleri de yeni düğümlerle yapar"""
+    left_height, right_height = _height(left), _height(right)
+    if left_height > right_height + 1:
+        if _height(left.left) >= _height(left.right):
+            return _Node(left.key, left.value, left.left, _Node(key, value, left.right, right))
+        pivot = left.right
+        return _Node(pivot.key, pivot.value,
+                     _Node(left.key, left.value, left.left, pivot.left),
+                     _Node(key, value, pivot.right, right))
+    if right_height > left_height + 1:
+        if _height(right.right) >= _height(right.left):
+            return _Node(right.key, right.value, _Node(key, value, left, right.left), right.right)
+        pivot = right.left
+        return _Node(pivot.key, pivot.value,
+                     _Node(key, value, left, pivot.left),
+                     _Node(right.key, right.value, pivot.right, right.right))
+    return _Node(key, value, left, right)
+
+
+def _insert(node: Optional[_Node], key, value) -> _Node:
+    if node is None:
+        return _Node(key, value, None, None)
+    if key < node.key:
+        return _balance(node.key, node.value, _insert(node.left, key, value), node.right)
+    if node.key < key:
+        return _balance(node.key, node.value, node.left, _insert(node.right, key, value))
+    return _Node(key, value, node.left, node.right)
+
+
+def _pop_min(node: _Node) -> Tuple[_Node, Optional[_Node]]:
+    """(en küçük düğüm, o düğüm çıkarılmış alt ağaç)"""
+    if node.left is None:
+        return node, node.right
+    smallest, left = _pop_min(node.left)
+    return smallest, _balance(node.key, node.value, left, node.right)
+
+
+def _delete(node: Optional[_Node], key) -> Optional[_Node]:
+    if node is None:
+        raise KeyError(key)
+    if key < node.key:
+        return _balance(node.key, node.value, _delete(node.left, key), node.right)
+    if node.key < key:
+        return _balance(node.key, node.value, node.left, _delete(node.right, key))
+    if node.left is None:
+        return node.right
+    if node.right is None:
+        return node.left
+    successor, right = _pop_min(node.right)
+    return _balance(successor.key, successor.value, node.left, right)
+
+
+def _build(pairs: list, low: int, high: int) -> Optional[_Node]:
+    if low >= high:
+        return None
+    middle = (low + high) // 2
+    key, value = pairs[middle]
+    return _Node(key, value, _build(pairs, low, middle), _build(pairs, middle + 1, high))
+
+
+class PersistentAVLTree:
+    """Değiştirilemez AVL eşlemesi; her değişiklik yeni bir ağaç döndürür"""
+
+    __slots__ = ("root",)
+
+    def __init__(self, root: Optional[_Node] = None):
+        self.root = root
+
+    @classmethod
+    def from_sorted(cls, pairs) -> "PersistentAVLTree":
+        """Anahtara göre sıralı (anahtar, değer) çiftlerinden O(n) ağaç kurar"""
+        pairs = list(pairs)
+        return cls(_build(pairs, 0, len(pairs)))
+
+    def __len__(self) -> int:
+        return self.root.size if self.root else 0
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) is not None
+
+    def _find(self, key) -> Optional[_Node]:
+        node = self.root
+        while node:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return node
+        return None
+
+    def get(self, key, default=None):
+        node = self._find(key)
+        return node.value if node else default
+
+    def insert(self, key, value=None) -> "PersistentAVLTree":
+        """Anahtarı ekler (varsa değerini değiştirir)"""
+        return PersistentAVLTree(_insert(self.root, key, value))
+
+    def delete(self, key) -> "PersistentAVLTree":
+        """Anahtarı siler; anahtar yoksa aynı ağacı döndürür"""
+        if self._find(key) is None:
+            return self
+        return PersistentAVLTree(_delete(self.root, key))
+
+    def ceiling(self, key) -> Optional[Tuple[object, object]]:
+        """key'den küçük olmayan en küçük (anahtar, değer) çifti"""
+        node = self.root
+        found = None
+        while node:
+            if node.key < key:
+                node = node.right
+            else:
+                found = node
+                node = node.left
+        return (found.key, found.value) if found else None
+
+    def min(self) -> Optional[Tuple[object, object]]:
+        node = self.root
+        while node and node.left:
+            node = node.left
+        return (node.key, node.value) if node else None
+
+    def max(self) -> Optional[Tuple[object, object]]:
+        node = self.root
+        while node and node.right:
+            node = node.right
+        return (node.key, node.value) if node else None
+
+    def rank(self, key) -> int:
+        """key'den küçük anahtar sayısı"""
+        node = self.root
+        count = 0
+        while node:
+            if node.key < key:
+                count += (node.left.size if node.left else 0) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def select(self, index: int) -> Tuple[object, object]:
+        """Sıralı görünümde index'inci (0'dan başlayarak) çift"""
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        node = self.root
+        while True:
+            left_size = node.left.size if node.left else 0
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.key, node.value
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def items(self, low=None) -> Iterator[Tuple[object, object]]:
+        """Sıralı (anahtar, değer) çiftleri; low verilirse low'dan küçük olmayanlar"""
+        stack = []
+        node = self.root
+        if low is not None:
+            # low'a inilirken yalnızca low'dan küçük olmayan düğümler yığına girer
+            while node:
+                if node.key < low:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key, node.value
+            node = node.right
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def values(self, low=None):
+        for _, value in self.items(low):
+            yield value
+
+    def diff(self, other: "PersistentAVLTree") -> Iterator[object]:
+        """İki sürümde farklı olan (birinde olmayan veya değeri değişen) anahtarlar.
+
+        İki ağaç sıralı olarak birlikte gezilir; aynı düğüm nesnesine (paylaşılan
+        alt ağaç) gelindiğinde o alt ağaç atlanır. Yol kopyalamayla türetilmiş
+        sürümlerde iş, değişiklik sayısı x log n ile sınırlıdır.
+        """
+        # Yığınlar sıradaki parçayı en üstte tutar: (düğüm, açıldı mı)
+        mine = [(self.root, False)] if self.root else []
+        theirs = [(other.root, False)] if other.root else []
+
+        def expand(stack):
+            node, _ = stack.pop()
+            if node.right:
+                stack.append((node.right, False))
+            stack.append((node, True))
+            if node.left:
+                stack.append((node.left, False))
+
+        while mine and theirs:
+            a, a_single = mine[-1]
+            b, b_single = theirs[-1]
+            if a is b and not a_single and not b_single:
+                mine.pop()
+                theirs.pop()
+            elif not a_single and (b_single or a.size >= b.size):
+                expand(mine)
+            elif not b_single:
+                expand(theirs)
+            elif a.key < b.key:
+                mine.pop()
+                yield a.key
+            elif b.key < a.key:
+                theirs.pop()
+                yield b.key
+            else:
+                mine.pop()
+                theirs.pop()
+                if a.value is not b.value and a.value != b.value:
+                    yield a.key
+        for stack in (mine, theirs):
+            while stack:
+                node, single = stack.pop()
+                if single:
+                    yield node.key
+                else:
+                    yield from PersistentAVLTree(node)
+
+
+class _State:
+    """Oyunun bir sürümü; ağaçlar önceki sürümlerle alt ağaç paylaşır"""
+
+    __slots__ = ("bag", "names", "liberated", "next_sequence")
+
+    def __init__(self, bag: PersistentAVLTree, names: PersistentAVLTree,
+                 liberated: PersistentAVLTree, next_sequence: int):
+        self.bag = bag
+        self.names = names
+        self.liberated = liberated
+        self.next_sequence = next_sequence
+
+
+class GameHistory:
+    """Oyun durumunun sürümleri: geri alma, yineleme ve isimli anlık görüntüler.
+
+    max_versions aşılırsa en eski sürümler bırakılır (isimli görüntüler kalır).
+    """
+
+    def __init__(self, game: "Game", max_versions: int = 10000):
+        self.game = game
+        self.max_versions = max_versions
+        self.snapshots: Dict[str, _State] = {}
+        self._restoring = False
+
+        self._villages = []
+        node = game.villages
+        while node:
+            self._villages.append(node.village)
+            node = node.next
+        self._village_ids = {village: i for i, village in enumerate(self._villages)}
+        # Geri alınan kurtarmada köy sıradaki eski anahtarıyla geri konur
+        queue = game.liberation_queue
+        self._orders = {village: queue.order_of(village) for village in queue}
+
+        items = list(game.inventory)
+        self._bag = PersistentAVLTree.from_sorted(enumerate(items))
+        self._names = PersistentAVLTree.from_sorted(
+            sorted(((item.name.lower(), sequence), None) for sequence, item in enumerate(items)))
+        self._liberated = PersistentAVLTree.from_sorted(
+            (i, True) for i, village in enumerate(self._villages) if village.is_liberated)
+        self._next_sequence = len(items)
+
+        self._versions: List[_State] = [self._state()]
+        self._position = 0
+        game.listeners.append(self._on_game_event)
+        game.inventory.listeners.append(self._on_inventory_event)
+
+    def _state(self) -> _State:
+        return _State(self._bag, self._names, self._liberated, self._next_sequence)
+
+    # Değişiklikleri izleme
+
+    def _on_inventory_event(self, event: str, data=None):
+        if self._restoring:
+            return
+        if event == "push":
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self._bag = self._bag.insert(sequence, data)
+            self._names = self._names.insert((data.name.lower(), sequence))
+        elif event == "remove":
+            # Çanta isimdeki en eski öğeyi çıkarır
+            key = data.lower()
+            (name, sequence), _ = self._names.ceiling((key, -1))
+            self._remove(name, sequence)
+        elif event == "pop":
+            sequence, item = self._bag.max()
+            self._remove(item.name.lower(), sequence)
+
+    def _remove(self, name: str, sequence: int):
+        self._bag = self._bag.delete(sequence)
+        self._names = self._names.delete((name, sequence))
+
+    def _on_game_event(self, event: str, data=None):
+        if event == "liberate" and not self._restoring:
+            self._liberated = self._liberated.insert(self._village_ids[data], True)
+
+    # Sürümler
+
+    def _changed(self) -> bool:
+        current = self._versions[self._position]
+        return (current.bag is not self._bag or current.liberated is not self._liberated)
+
+    def commit(self) -> bool:
+        """Son sürümden beri değişiklik varsa yeni sürüm oluşturur (yineleme dalı silinir)"""
+        if not self._changed():
+            return False
+        del self._versions[self._position + 1:]
+        self._versions.append(self._state())
+        if len(self._versions) > self.max_versions:
+            del self._versions[:len(self._versions) - self.max_versions]
+        self._position = len(self._versions) - 1
+        return True
+
+    def can_undo(self) -> bool:
+        return self._position > 0 or self._changed()
+
+    def can_redo(self) -> bool:
+        return self._position < len(self._versions) - 1 and not self._changed()
+
+    def undo(self) -> bool:
+        """Bir önceki sürüme döner"""
+        self.commit()
+        if self._position == 0:
+            return False
+        self._position -= 1
+        self._apply(self._versions[self._position])
+        return True
+
+    def redo(self) -> bool:
+        """Geri alınan sürümü yeniden uygular"""
+        if not self.can_redo():
+            return False
+        self._position += 1
+        self._apply(self._versions[self._position])
+        return True
+
+    def snapshot(self, name: str):
+        """Güncel durumu isimle saklar"""
+        self.commit()
+        self.snapshots[name] = self._versions[self._position]
+
+    def restore(self, name: str):
+        """İsimli duruma döner; dönüş yeni bir sürüm olur, yani geri alınabilir"""
+        state = self.snapshots[name]
+        self.commit()
+        self._apply(state)
+        self.commit()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def _apply(self, state: _State):
+        game = self.game
+        inventory = game.inventory
+        self._restoring = True
+        try:
+            # Çanta eklenme sırasındaki ilk farktan itibaren yeniden kurulur;
+            # geri alınan işlem genellikle sondaki birkaç öğeyi etkiler
+            first = next(state.bag.diff(self._bag), None)
+            if first is not None:
+                for _ in range(len(self._bag) - self._bag.rank(first)):
+                    inventory.pop()
+                inventory.push_many(state.bag.values(first))
+            queue = game.liberation_queue
+            for village_id in state.liberated.diff(self._liberated):
+                village = self._villages[village_id]
+                liberated = village_id in state.liberated
+                village.is_liberated = liberated
+                if liberated:
+                    queue.remove(village)
+                elif village not in queue:
+                    queue.place(village, self._orders.get(village))
+        finally:
+            self._restoring = False
+        self._bag, self._names = state.bag, state.names
+        self._liberated, self._next_sequence = state.liberated, state.next_sequence
+        game._notify("restore", state)
@@ -0,0 +1,13 @@
+"""Varsayılan dünyada baştan sona oynanan örnek oyunun girdileri.
+
+Ölçümler (benchmark.py) ve sunucunun yük üreticisi (server.py) aynı oyunu
+oynatır; senaryo ikisine de bağlı olmasın diye burada tutulur.
+"""
+
+# Yedi köyün hepsi kurtarılır, ilerleme ve çanta gösterilir, oyundan çıkılır
+PLAYTHROUGH_SCRIPT = [
+    "3", "", "3", "", "3", "", "3", "Harita", "Anahtar", "",
+    "3", "Kılıç", "Yiyecek", "Meşale", "",
+    "3", "kaya", "Bakır", "Büyü", "Gümüş", "",
+    "3", "1 2 3", "", "6", "", "2", "", "1", "", "7",
+]
@@ -0,0 +1,423 @@
+"""Çanta dolduğunda hangi öğenin çıkarılacağını seçen politikaların karşılaştırması.
+
+Köy kurtarılırken çanta doluysa oyuncu bir öğe çıkarmak zorundadır. Bu seçim
+Kristalköy'de verilecek gücü ve Elmasşehir'deki 7 öğe sınırından sonra kalan
+gücü etkiler. Araç her politikayla çok sayıda oyunu gerçek Game üzerinde
+oynatır ve sonuçları toplar.
+
+Politikalar (POLICIES):
+    lowest     en düşük güçlü öğeyi çıkarır
+    lru        çantaya en önce eklenmiş öğeyi çıkarır
+    random     rastgele bir öğe çıkarır
+    lookahead  her aday için oyunun geri kalanını "lowest" ile hızlıca oynatır,
+               sonunda en çok güç bırakan adayı çıkarır
+
+Çıkarma dışındaki kararlar bütün politikalarda aynıdır: Kristalköy'de gereken
+güç en az kayıpla (solve_sacrifice) verilir, Elmasşehir'de en düşük güçlü
+fazlalıklar bırakılır. Köylerin öğeleri varsayılan olarak her oyun için
+rastgele seçilir; aynı oyun numarası bütün politikalarda aynı dünyayı kullanır.
+
+Oyunlar parçalar (chunk) hâlinde ProcessPoolExecutor'a dağıtılır. Her parça
+sonuçlarını süreç içinde toplar ve yalnızca PolicyStats döndürür; böylece
+süreçler arası veri oyun sayısından bağımsız kalır.
+
+Kullanım:
+    python policy_eval.py [--games 20000] [--policies lowest,lru,random,lookahead]
+                          [--workers N] [--chunk-size 500] [--seed 0]
+                          [--world random|default|DOSYA] [--scaling]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from main import (PROMPT_CONTINUE, PROMPT_ITEM_NUMBERS, PROMPT_MENU, PROMPT_PUZZLE,
+                  PROMPT_REMOVE_ITEM, PROMPT_USE_ITEM, RULE_BAG_LIMIT, RULE_SACRIFICE, Game,
+                  Item, ScriptedIO, Village)
+from puzzle import default_engine
+from sacrifice_solver import solve_sacrifice
+
+# Game.liberate_village ile aynı kurallar
+REQUIRED_POWER = 7
+BAG_LIMIT = 7
+
+# Rastgele dünyalarda bir köydeki öğe sayısı aralığı
+RANDOM_VILLAGE_ITEMS = (2, 5)
+
+# Oyunun geri kalanında güç yetmezse lookahead'in verdiği ceza puanı
+STUCK_PENALTY = 1000
+
+
+def _power_key(item: Item):
+    return item.power, item.name
+
+
+class LowestPowerPolicy:
+    name = "lowest"
+
+    def __init__(self, rng: random.Random):
+        pass
+
+    def choose(self, game: Game, pending: List[Item], future) -> Item:
+        return min(game.inventory, key=_power_key)
+
+
+class LRUPolicy:
+    name = "lru"
+
+    def __init__(self, rng: random.Random):
+        pass
+
+    def choose(self, game: Game, pending: List[Item], future) -> Item:
+        # Çantadan isimle çıkarma, o isimdeki en eski öğeyi çıkarır
+        return game.inventory.head.item
+
+
+class RandomPolicy:
+    name = "random"
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def choose(self, game: Game, pending: List[Item], future) -> Item:
+        return self.rng.choice(list(game.inventory))
+
+
+class LookaheadPolicy:
+    name = "lookahead"
+
+    def __init__(self, rng: random.Random):
+        pass
+
+    def choose(self, game: Game, pending: List[Item], future) -> Item:
+        bag = list(game.inventory)
+        best = None
+        best_score = None
+        seen = set()
+        for item in sorted(bag, key=_power_key):
+            key = (item.name, item.power)
+            if key in seen:
+                continue
+            seen.add(key)
+            rest = list(bag)
+            rest.remove(item)
+            score = _rollout(rest, pending, future, game.inventory.max_capacity)
+            if best_score is None or score > best_score:
+                best, best_score = item, score
+        return best
+
+
+def _rollout(bag: List[Item], pending: List[Item], future: List[Tuple[str, List[Item]]],
+             capacity: int) -> int:
+    """Oyunun geri kalanını "lowest" politikasıyla oynatıp son gücü döndürür"""
+    def push(item):
+        if len(bag) >= capacity:
+            bag.remove(min(bag, key=_power_key))
+        bag.append(item)
+
+    for item in pending:
+        push(item)
+    for rule, items in future:
+        if rule == RULE_SACRIFICE:
+            plan = solve_sacrifice(bag, REQUIRED_POWER)
+            if plan is None:
+                return sum(item.power for item in bag) - STUCK_PENALTY
+            for item in plan:
+                bag.remove(item)
+        elif rule == RULE_BAG_LIMIT and len(bag) > BAG_LIMIT:
+            bag.sort(key=_power_key)
+            del bag[:len(bag) - BAG_LIMIT]
+        for item in items:
+            push(item)
+    return sum(item.power for item in bag)
+
+
+POLICIES: Dict[str, Callable[[random.Random], object]] = {
+    "lowest": LowestPowerPolicy,
+    "lru": LRUPolicy,
+    "random": RandomPolicy,
+    "lookahead": LookaheadPolicy,
+}
+
+
+class _Stuck(Exception):
+    """Kristalköy'de çantanın gücü yetmedi; oyun ilerleyemez"""
+
+
+class PolicyPlayerIO:
+    """Game'i verilen çıkarma politikasıyla oynatan giriş/çıkış sağlayıcısı"""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.game: Optional[Game] = None
+        self.discards = 0
+        self.discarded_power = 0
+        self.sacrificed_power = 0
+        self.dropped_power = 0  # Elmasşehir sınırı için bırakılan güç
+        self._plan: List[Item] = []
+        self._pushed = 0  # Kurtarılan köyden çantaya aktarılan öğe sayısı
+
+    def attach(self, game: Game):
+        self.game = game
+        game.listeners.append(self._on_game_event)
+        game.inventory.listeners.append(self._on_inventory_event)
+
+    def _on_game_event(self, event: str, data=None):
+        if event == "liberate":
+            self._pushed = 0
+
+    def _on_inventory_event(self, event: str, data=None):
+        if event == "push":
+            self._pushed += 1
+
+    def _future_villages(self) -> List[Tuple[str, List[Item]]]:
+        """Sıradaki köyden sonraki köylerin (kural, öğeler) listesi"""
+        villages = list(self.game.liberation_queue)[1:]
+        return [(village.rule, [item for item, count in village.item_counts() for _ in range(count)])
+                for village in villages]
+
+    def _discard(self) -> str:
+        village = self.game.get_current_village()
+        # Köyün öğeleri alfabetik sırayla aktarılır; sıradaki öğe çantaya sığmadı
+        pending = list(village.inventory)[self._pushed:]
+        item = self.policy.choose(self.game, pending, self._future_villages())
+        self.discards += 1
+        self.discarded_power += item.power
+        return item.name
+
+    def _sacrifice(self) -> str:
+        if not self._plan:
+            plan = solve_sacrifice(self.game.inventory, REQUIRED_POWER)
+            if plan is None:
+                raise _Stuck()
+            self._plan = plan
+        item = self._plan.pop()
+        self.sacrificed_power += item.power
+        return item.name
+
+    def _bag_limit(self) -> str:
+        items = list(self.game.inventory.bst)
+        order = sorted(range(len(items)), key=lambda i: (items[i].power, i))
+        dropped = order[:len(items) - BAG_LIMIT]
+        self.dropped_power += sum(items[i].power for i in dropped)
+        return " ".join(str(i + 1) for i in sorted(dropped))
+
+    def _puzzle_answer(self) -> str:
+        village = self.game.get_current_village()
+        previous = self.game._previous_village(village)
+        villages = [previous, village] if previous else [village]
+        return default_engine().make_puzzle(*villages).answers[0]
+
+    def read(self, prompt: str = "") -> str:
+        if prompt == PROMPT_MENU:
+            return "3" if self.game.get_current_village() else "7"
+        if prompt == PROMPT_CONTINUE:
+            return ""
+        if prompt == PROMPT_REMOVE_ITEM:
+            return self._discard()
+        if prompt == PROMPT_USE_ITEM:
+            return self._sacrifice()
+        if prompt == PROMPT_ITEM_NUMBERS:
+            return self._bag_limit()
+        if prompt == PROMPT_PUZZLE:
+            return self._puzzle_answer()
+        raise EOFError(f"Otomatik oyuncu bu istemi tanımıyor: {prompt!r}")
+
+    def write(self, text: str = ""):
+        pass
+
+    def write_lines(self, lines):
+        pass
+
+    def clear(self):
+        pass
+
+    def flush(self):
+        pass
+
+
+class PolicyStats:
+    """Bir politikanın oyun sonuçlarının toplamı (tamsayı toplamlar, birleştirilebilir)"""
+
+    FIELDS = ("final_power", "final_items", "discards", "discarded_power",
+              "sacrificed_power", "dropped_power")
+
+    def __init__(self, policy: str):
+        self.policy = policy
+        self.games = 0
+        self.stuck = 0
+        self.sums = dict.fromkeys(self.FIELDS, 0)
+        self.power_squares = 0
+        self.min_power: Optional[int] = None
+        self.max_power: Optional[int] = None
+
+    def add(self, io: PolicyPlayerIO, game: Game, stuck: bool):
+        power = game.inventory.get_total_power()
+        self.games += 1
+        self.stuck += stuck
+        values = (power, game.inventory.size, io.discards, io.discarded_power,
+                  io.sacrificed_power, io.dropped_power)
+        for field, value in zip(self.FIELDS, values):
+            self.sums[field] += value
+        self.power_squares += power * power
+        self.min_power = power if self.min_power is None else min(self.min_power, power)
+        self.max_power = power if self.max_power is None else max(self.max_power, power)
+
+    def merge(self, other: "PolicyStats"):
+        self.games += other.games
+        self.stuck += other.stuck
+        for field in self.FIELDS:
+            self.sums[field] += other.sums[field]
+        self.power_squares += other.power_squares
+        for value in (other.min_power, other.max_power):
+            if value is not None:
+                self.min_power = value if self.min_power is None else min(self.min_power, value)
+                self.max_power = value if self.max_power is None else max(self.max_power, value)
+
+    def summary(self) -> dict:
+        games = self.games or 1
+        mean_power = self.sums["final_power"] / games
+        variance = max(0.0, self.power_squares / games - mean_power * mean_power)
+        result = {"policy": self.policy, "games": self.games,
+                  "stuck_rate": self.stuck / games,
+                  "mean_final_power": mean_power,
+                  "std_final_power": variance ** 0.5,
+                  "min_final_power": self.min_power,
+                  "max_final_power": self.max_power}
+        for field in self.FIELDS[1:]:
+            result[f"mean_{field}"] = self.sums[field] / games
+        return result
+
+
+# Dünyalar
+
+_templates: Dict[str, Tuple[List[str], List[List[Item]], List[str]]] = {}
+
+
+def _world_template(world: str) -> Tuple[List[str], List[List[Item]], List[str]]:
+    """Köy adları, öğe listeleri ve kuralları (süreç başına bir kez hazırlanır)"""
+    template = _templates.get(world)
+    if template is None:
+        if world in ("random", "default"):
+            villages = []
+            node = Game(io=ScriptedIO([])).villages
+            while node:
+                villages.append(node.village)
+                node = node.next
+        else:
+            from world import load_world
+            villages = load_world(world)
+            Game(io=ScriptedIO([]), villages=villages)  # Kuralsız köylere varsayılan kuralları atar
+        template = _templates[world] = (
+            [village.name for village in villages],
+            [[item for item, count in village.item_counts() for _ in range(count)] for village in villages],
+            [village.rule for village in villages])
+    return template
+
+
+def make_villages(world: str, seed: int, game_number: int) -> List[Village]:
+    """Oyun numarasına göre köyleri oluşturur; "random" dünyada öğeler rastgele seçilir"""
+    names, village_items, rules = _world_template(world)
+    if world != "random":
+        return [Village(name, items, rule) for name, items, rule in zip(names, village_items, rules)]
+    pool = sorted({id(item): item for items in village_items for item in items}.values(), key=_power_key)
+    rng = random.Random(f"world:{seed}:{game_number}")
+    low, high = RANDOM_VILLAGE_ITEMS
+    return [Village(name, [rng.choice(pool) for _ in range(rng.randint(low, high))], rule)
+            for name, rule in zip(names, rules)]
+
+
+def play(policy_name: str, world: str, seed: int, game_number: int) -> Tuple[PolicyPlayerIO, Game, bool]:
+    """Tek bir oyunu politikayla sonuna kadar oynatır"""
+    policy = POLICIES[policy_name](random.Random(f"policy:{seed}:{game_number}"))
+    io = PolicyPlayerIO(policy)
+    game = Game(io=io, villages=make_villages(world, seed, game_number))
+    io.attach(game)
+    try:
+        game.show_menu()
+    except _Stuck:
+        return io, game, True
+    return io, game, False
+
+
+def _run_chunk(policy_name: str, world: str, seed: int, start: int, count: int) -> PolicyStats:
+    stats = PolicyStats(policy_name)
+    for game_number in range(start, start + count):
+        io, game, stuck = play(policy_name, world, seed, game_number)
+        stats.add(io, game, stuck)
+    return stats
+
+
+def evaluate(policies=tuple(POLICIES), games: int = 20000, seed: int = 0,
+             workers: Optional[int] = None, chunk_size: int = 500,
+             world: str = "random") -> Dict[str, PolicyStats]:
+    """Her politikayla games oyun oynatır; workers=1 ise süreç havuzu kullanılmaz"""
+    workers = workers or os.cpu_count() or 1
+    tasks = [(name, world, seed, start, min(chunk_size, games - start))
+             for name in policies for start in range(0, games, chunk_size)]
+    results = {name: PolicyStats(name) for name in policies}
+    if workers == 1:
+        for task in tasks:
+            results[task[0]].merge(_run_chunk(*task))
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, *task) for task in tasks]
+        for future in futures:
+            stats = future.result()
+            results[stats.policy].merge(stats)
+    return results
+
+
+def _print_table(results: Dict[str, PolicyStats]):
+    print(f"{'politika':<10} {'oyun':>7} {'takılma':>8} {'son güç':>8} {'sapma':>6} "
+          f"{'min':>4} {'max':>4} {'çıkarma':>8} {'verilen':>8} {'bırakılan':>9}")
+    for stats in results.values():
+        s = stats.summary()
+        print(f"{s['policy']:<10} {s['games']:>7} {s['stuck_rate']:>7.1%} {s['mean_final_power']:>8.2f} "
+              f"{s['std_final_power']:>6.2f} {s['min_final_power']:>4} {s['max_final_power']:>4} "
+              f"{s['mean_discards']:>8.2f} {s['mean_sacrificed_power']:>8.2f} {s['mean_dropped_power']:>9.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Çanta çıkarma politikalarını karşılaştırır")
+    parser.add_argument("--games", type=int, default=20000, help="politika başına oyun sayısı")
+    parser.add_argument("--policies", default=",".join(POLICIES))
+    parser.add_argument("--workers", type=int, default=None, help="varsayılan: çekirdek sayısı")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--world", default="random", help="random, default veya dünya dosyası")
+    parser.add_argument("--scaling", action="store_true",
+                        help="1'den --workers'a kadar süreç sayılarıyla hızlanmayı ölç")
+    args = parser.parse_args(argv)
+
+    policies = [name.strip() for name in args.policies.split(",") if name.strip()]
+    unknown = [name for name in policies if name not in POLICIES]
+    if unknown:
+        parser.error(f"bilinmeyen politika: {', '.join(unknown)}")
+    workers = args.workers or os.cpu_count() or 1
+
+    if args.scaling:
+        counts = sorted({1, *(2 ** i for i in range(workers.bit_length()) if 2 ** i <= workers), workers})
+        base = None
+        for count in counts:
+            start = time.perf_counter()
+            evaluate(policies, args.games, args.seed, count, args.chunk_size, args.world)
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{count:>3} süreç: {elapsed:7.2f} sn  hızlanma {base / elapsed:5.2f}x")
+        return 0
+
+    start = time.perf_counter()
+    results = evaluate(policies, args.games, args.seed, workers, args.chunk_size, args.world)
+    elapsed = time.perf_counter() - start
+    total = args.games * len(policies)
+    print(f"{total} oyun, {workers} süreç, {elapsed:.2f} sn ({total / elapsed:,.0f} oyun/sn)")
+    _print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""Baş harf bulmacaları için kelime indeksi ve bulmaca motoru.
+
+Kelime listesi, harfleri sıralanmış imzaya (ör. KAYA -> AAKY) göre sıralı,
+sabit genişlikli kayıtlardan oluşan bir indeks dosyasına dönüştürülür ve
+mmap ile açılır. Böylece büyük kelime listeleri belleğe okunmadan ikili
+arama ile sorgulanır.
+
+İndeks dosyası biçimi:
+    başlık: b"KLME", sürüm (H), kayıt alanı genişliği (H), kayıt sayısı (I)
+    kayıtlar: [imza | kelime], her alan UTF-8 ve genişliğe kadar b"\\0" ile dolgulu
+
+İndeks dosyası kaynak dizinine değil kullanıcının önbellek dizinine
+($XDG_CACHE_HOME, yoksa ~/.cache) yazılır; oraya yazılamıyorsa indeks bellekte
+kurulur.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from collections import Counter
+from typing import Dict, List, Optional
+
+_HEADER = struct.Struct("<4sHHI")
+_MAGIC = b"KLME"
+_VERSION = 1
+
+DEFAULT_WORD_LIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kelimeler.txt")
+_CACHE_NAME = "koy-kurtarma"
+
+
+def default_cache_dir() -> str:
+    """Kelime indekslerinin yazıldığı kullanıcı önbellek dizini"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, _CACHE_NAME)
+
+
+def tr_upper(text: str) -> str:
+    """Türkçe kurallarıyla büyük harfe çevirir (i -> İ, ı -> I)"""
+    return text.replace("i", "İ").replace("ı", "I").upper()
+
+
+def signature(word: str) -> str:
+    """Kelimenin harflerini sıralayarak anagram imzasını oluşturur"""
+    return "".join(sorted(word))
+
+
+class WordIndex:
+    """Sıralı imza kayıtları üzerinde ikili arama yapan kelime indeksi"""
+
+    def __init__(self, data, file=None):
+        self._data = data
+        self._file = file
+        magic, version, self.width, self.count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Geçersiz kelime indeksi dosyası")
+        self._record_size = 2 * self.width
+
+    @staticmethod
+    def _encode(words) -> bytes:
+        """Kelimelerden indeks dosyasının baytlarını oluşturur"""
+        records = set()
+        for word in words:
+            word = tr_upper(word.strip())
+            if word and word.isalpha():
+                records.add((signature(word).encode("utf-8"), word.encode("utf-8")))
+        width = max((len(word) for _, word in records), default=1)
+        body = b"".join(sig.ljust(width, b"\0") + word.ljust(width, b"\0")
+                        for sig, word in sorted(records))
+        return _HEADER.pack(_MAGIC, _VERSION, width, len(records)) + body
+
+    @classmethod
+    def build(cls, words_path: str, index_path: str):
+        """Düz kelime listesinden (satır başına bir kelime) indeks dosyası yazar"""
+        with open(words_path, encoding="utf-8") as f:
+            data = cls._encode(f)
+        # Aynı indeksi açan başka süreçler yarım dosya görmesin diye yer değiştirilir
+        temporary_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_path, "wb") as f:
+                f.write(data)
+            os.replace(temporary_path, index_path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    @classmethod
+    def open(cls, index_path: str) -> "WordIndex":
+        """İndeks dosyasını mmap ile açar"""
+        f = open(index_path, "rb")
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            f.close()
+            raise
+        return cls(data, f)
+
+    @classmethod
+    def from_words(cls, words) -> "WordIndex":
+        """Kelimelerden bellekte bir indeks oluşturur"""
+        return cls(cls._encode(words))
+
+    @staticmethod
+    def index_path(words_path: str, cache_dir: Optional[str] = None) -> str:
+        """Kelime listesinin önbellekteki indeks dosyası; aynı adlı listeler yollarıyla ayrılır"""
+        words_path = os.path.abspath(words_path)
+        digest = hashlib.sha1(words_path.encode("utf-8")).hexdigest()[:12]
+        name = os.path.splitext(os.path.basename(words_path))[0]
+        return os.path.join(cache_dir or default_cache_dir(), f"{name}-{digest}.idx")
+
+    @classmethod
+    def load(cls, words_path: str = DEFAULT_WORD_LIST, cache_dir: Optional[str] = None) -> "WordIndex":
+        """Kelime listesinin indeksini açar; yoksa veya eskiyse yeniden oluşturur"""
+        index_path = cls.index_path(words_path, cache_dir)
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            if (not os.path.exists(index_path)
+                    or os.path.getmtime(index_path) < os.path.getmtime(words_path)):
+                cls.build(words_path, index_path)
+            return cls.open(index_path)
+        except OSError:
+            # İndeks yazılamıyorsa (salt okunur önbellek vb.) bellekte oluştur
+            with open(words_path, encoding="utf-8") as f:
+                return cls.from_words(f)
+
+    def close(self):
+        if self._file is not None:
+            self._data.close()
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _signature_at(self, i: int) -> bytes:
+        start = _HEADER.size + i * self._record_size
+        return self._data[start:start + self.width]
+
+    def _word_at(self, i: int) -> str:
+        start = _HEADER.size + i * self._record_size + self.width
+        return self._data[start:start + self.width].rstrip(b"\0").decode("utf-8")
+
+    def words_for(self, letters: str) -> List[str]:
+        """Verilen imzaya (sıralı harfler) sahip tüm kelimeleri döndürür"""
+        target = letters.encode("utf-8")
+        if len(target) > self.width:
+            return []
+        target = target.ljust(self.width, b"\0")
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._signature_at(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        words = []
+        while low < self.count and self._signature_at(low) == target:
+            words.append(self._word_at(low))
+            low += 1
+        return words
+
+    def signatures(self, length: int):
+        """Verilen uzunluktaki tüm imzaları sırayla döndürür"""
+        previous = None
+        for i in range(self.count):
+            sig = self._signature_at(i).rstrip(b"\0").decode("utf-8")
+            if len(sig) == length and sig != previous:
+                previous = sig
+                yield sig
+
+    def __contains__(self, word: str) -> bool:
+        word = tr_upper(word)
+        return word in self.words_for(signature(word))
+
+
+def village_initials(*villages) -> Counter:
+    """Köy envanterlerindeki öğelerin baş harflerinin çoklu kümesini döndürür"""
+    letters = Counter()
+    for village in villages:
+        for item in village.inventory:
+            letters[tr_upper(item.name[0])] += 1
+    return letters
+
+
+def _sub_signatures(letters: Counter, length: int):
+    """Harf çoklu kümesinin verilen uzunluktaki tüm alt çoklu kümelerini imza olarak üretir"""
+    distinct = sorted(letters)
+    chosen = []
+
+    def walk(i: int, remaining: int):
+        if remaining == 0:
+            yield "".join(chosen)
+            return
+        if i == len(distinct):
+            return
+        letter = distinct[i]
+        for take in range(min(letters[letter], remaining), -1, -1):
+            chosen.extend(letter * take)
+            yield from walk(i + 1, remaining - take)
+            del chosen[len(chosen) - take:]
+
+    # Harf sayısı bulmaca uzunluğuyla sınırlı olduğundan özyineleme derinliği küçüktür
+    yield from walk(0, length)
+
+
+def _sub_signature_count(letters: Counter, length: int) -> int:
+    """Alt çoklu küme sayısını (üreteci çalıştırmadan) hesaplar"""
+    ways = [1] + [0] * length
+    for count in letters.values():
+        new_ways = [0] * (length + 1)
+        for total, value in enumerate(ways):
+            if value:
+                for take in range(min(count, length - total) + 1):
+                    new_ways[total + take] += value
+        ways = new_ways
+    return ways[length]
+
+
+class Puzzle:
+    def __init__(self, villages, letters: Counter, length: int, answers: List[str]):
+        self.villages = villages
+        self.letters = letters
+        self.length = length
+        self.answers = answers
+
+    def check(self, answer: str) -> bool:
+        return tr_upper(answer.strip()) in self.answers
+
+
+class PuzzleEngine:
+    """Köy çiftlerinin baş harflerinden kelime bulmacaları üretir ve denetler"""
+
+    def __init__(self, word_index: WordIndex, length: int = 4):
+        self.word_index = word_index
+        self.length = length
+        self._cache: Dict[str, List[str]] = {}  # Sıralı baş harfler -> olası cevaplar
+
+    def answers_for(self, letters: Counter) -> List[str]:
+        """Harf çoklu kümesinden oluşturulabilen tüm geçerli kelimeleri döndürür"""
+        key = "".join(sorted(letters.elements()))
+        answers = self._cache.get(key)
+        if answers is not None:
+            return answers
+
+        answers = []
+        if _sub_signature_count(letters, self.length) <= len(self.word_index):
+            for sig in _sub_signatures(letters, self.length):
+                answers.extend(self.word_index.words_for(sig))
+        else:
+            # Çok sayıda harf varsa kelime listesindeki imzaları taramak daha ucuzdur
+            for sig in self.word_index.signatures(self.length):
+                if not Counter(sig) - letters:
+                    answers.extend(self.word_index.words_for(sig))
+        answers.sort()
+        self._cache[key] = answers
+        return answers
+
+    def make_puzzle(self, *villages) -> Puzzle:
+        letters = village_initials(*villages)
+        return Puzzle(villages, letters, self.length, self.answers_for(letters))
+
+    def generate(self, villages) -> List[Puzzle]:
+        """Ardışık her köy çifti için bulmaca üretir; çözümü olmayan çiftleri atlar"""
+        puzzles = []
+        previous = None
+        for village in villages:
+            if previous is not None:
+                puzzle = self.make_puzzle(previous, village)
+                if puzzle.answers:
+                    puzzles.append(puzzle)
+            previous = village
+        return puzzles
+
+
+_default_engine: Optional[PuzzleEngine] = None
+
+
+def default_engine() -> PuzzleEngine:
+    """Varsayılan kelime listesini kullanan paylaşılan bulmaca motorunu döndürür"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = PuzzleEngine(WordIndex.load())
+    return _default_engine
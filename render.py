@@ -0,0 +1,134 @@
+"""Terminal için tamponlu ekran çizimi.
+
+Oyun çıktısı satır satır terminale yazılmak yerine bir kare (frame) tamponunda
+toplanır ve yalnızca girdi beklenirken (veya flush çağrılınca) tek bir yazma
+işlemiyle gönderilir. Ekran temizleme alt süreç (cls/clear) başlatmadan ANSI
+kaçış dizileriyle yapılır; yeni kare bir öncekiyle satır satır karşılaştırılır
+ve yalnızca değişen satırlar yeniden yazılır.
+
+Kare terminale sığmıyorsa (kaydırma olmuşsa) satır konumları bilinemeyeceği
+için bir sonraki kare tamamen yeniden çizilir. Çıktı bir terminale gitmiyorsa
+(dosya, boru) kaçış dizisi kullanılmaz ve satırlar olduğu gibi yazılır.
+"""
+import os
+import shutil
+import sys
+from typing import Iterable, List, Optional
+
+HOME = "\x1b[H"
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_LINE_END = "\x1b[K"
+CLEAR_SCREEN_END = "\x1b[J"
+
+
+def move_to(row: int) -> str:
+    """İmleci verilen satırın (1'den başlar) başına taşıyan kaçış dizisi"""
+    return f"\x1b[{row};1H"
+
+
+def paginate(lines: List[str], page_size: int):
+    """Satırları page_size uzunluğunda sayfalara böler"""
+    page_size = max(1, page_size)
+    for start in range(0, len(lines), page_size):
+        yield lines[start:start + page_size]
+
+
+class Screen:
+    """Satırları kare tamponunda toplayıp değişen bölgeleri yeniden çizen ekran"""
+
+    def __init__(self, stream=None, input_stream=None, ansi: Optional[bool] = None):
+        self.stream = stream if stream is not None else sys.stdout
+        input_stream = input_stream if input_stream is not None else sys.stdin
+        if ansi is None:
+            ansi = self.stream.isatty() and input_stream.isatty()
+            if ansi and os.name == "nt":
+                os.system("")  # Windows konsolunda ANSI desteğini bir kez aç
+        self.ansi = ansi
+        self._frame: List[str] = []  # Şu anki karenin satırları
+        self._written = 0  # Karenin terminale gönderilmiş satır sayısı
+        self._shown: Optional[List[str]] = None  # Ekrandaki satırlar (bilinmiyorsa None)
+        self._new_frame = False
+
+    def size(self):
+        """Terminal boyutunu (sütun, satır) döndürür"""
+        return shutil.get_terminal_size()
+
+    def write(self, text: str = ""):
+        self._frame.extend(text.split("\n"))
+
+    def clear(self):
+        """Yeni bir kare başlatır; eski kare bir sonraki flush'ta değiştirilir"""
+        self._frame = []
+        self._written = 0
+        self._new_frame = True
+
+    def _fits(self, lines: List[str]) -> bool:
+        columns, rows = self.size()
+        # İmleç karenin altındaki satırda durduğu için bir satır boş kalmalı
+        return len(lines) < rows and all(len(line) < columns for line in lines)
+
+    def _draw_frame(self, out: List[str]):
+        frame = self._frame
+        shown = self._shown
+        if shown is None or not self._fits(frame):
+            out.append(HOME + CLEAR_SCREEN)
+            out.extend(line + "\n" for line in frame)
+        else:
+            for row, line in enumerate(frame):
+                if row >= len(shown) or shown[row] != line:
+                    out.append(move_to(row + 1) + line + CLEAR_LINE_END)
+            out.append(move_to(len(frame) + 1) + CLEAR_SCREEN_END)
+        self._shown = list(frame) if self._fits(frame) else None
+
+    def _record(self, lines: List[str]):
+        """Terminale yazılmış satırları ekran kaydına ekler"""
+        if self._shown is not None:
+            self._shown.extend(lines)
+            if not self._fits(self._shown):
+                self._shown = None
+
+    def flush(self):
+        """Tampondaki satırları tek seferde terminale yazar"""
+        out = []
+        if self._new_frame and self.ansi:
+            self._draw_frame(out)
+        else:
+            lines = self._frame[self._written:]
+            out.extend(line + "\n" for line in lines)
+            self._record(lines)
+        self._new_frame = False
+        self._written = len(self._frame)
+        if out:
+            self.stream.write("".join(out))
+        self.stream.flush()
+
+    def read(self, prompt: str = "") -> str:
+        """Tamponu boşaltıp kullanıcıdan bir satır okur"""
+        self.flush()
+        answer = input(prompt)
+        # İstem ve kullanıcının yazdığı cevap artık ekranda
+        lines = (prompt + answer).split("\n")
+        self._frame.extend(lines)
+        self._written = len(self._frame)
+        self._record(lines)
+        return answer
+
+    def write_lines(self, lines: Iterable[str]):
+        """Uzun listeleri terminal yüksekliğine göre sayfa sayfa gösterir"""
+        lines = list(lines)
+        _, rows = self.size()
+        page_size = rows - 2  # Sayfa istemi ve imleç için yer bırak
+        if not self.ansi or len(lines) <= page_size:
+            for line in lines:
+                self.write(line)
+            return
+        shown = 0
+        for page in paginate(lines, page_size):
+            for line in page:
+                self.write(line)
+            shown += len(page)
+            if shown < len(lines):
+                answer = self.read(f"-- {shown}/{len(lines)} satır gösterildi; "
+                                   f"devam için Enter, bitirmek için q --")
+                if answer.strip().lower() == "q":
+                    break
@@ -0,0 +1,390 @@
+"""Oyun oturumlarının olay kaydı ve hızlı ileri (fast-forward) tekrar oynatma.
+
+Recorder bir oyuna dinleyici olarak bağlanır ve durumu değiştiren her olayı
+(çantaya ekleme, çıkarma, köy kurtarma) ve her bulmaca cevabını ikili bir
+dosyaya ekler. Kayıt biçimi persistence.py'deki günlükle aynıdır; oturum
+kaydında ayrıca bulmaca cevapları ve kontrol noktaları bulunur:
+
+    b"KKOR" + sürüm
+    kayıtlar      PUSH / REMOVE / POP / LIBERATE / PUZZLE (bkz. persistence.py)
+    CHECKPOINT    B B tür Q olay no I uzunluk + persistence.dumps anlık görüntüsü
+    dizin         Q x 2 x kontrol noktası sayısı (olay no, dosya ofseti)
+    son ek        Q dizin ofseti, I kontrol noktası sayısı, b"KKOI"
+
+İlk kontrol noktası kaydın başındaki durumdur. Sonrakiler en az
+checkpoint_every olaydan sonra ve son kontrol noktasından beri yazılan kayıtlar
+anlık görüntü kadar yer tuttuğunda yazılır; böylece büyük dünyalarda kontrol
+noktaları dosyayı şişirmez. Geçmişten dönüş (GameHistory.restore) günlükte
+karşılığı olmayan bir değişiklik olduğu için hemen bir "reset" kontrol noktası
+yazar. Dizin ve son ek close() ile yazılır; kayıt yarıda kalmışsa (ör. oyun
+çöktüyse) SessionLog dosyayı baştan tarayarak kontrol noktalarını bulur.
+
+SessionLog kaydı açar; game_at(n) n. olaydan sonraki durumu, n'den önceki son
+kontrol noktasını yükleyip kalan olayları doğrudan veri yapılarına uygulayarak
+kurar. Menü akışları, istemler ve ekran çıktısı hiç çalıştırılmaz.
+verify=True ile kayıt baştan oynatılır ve yol üzerindeki her kontrol noktası
+tekrar oynatılan durumla karşılaştırılır.
+
+Kullanım:
+    python main.py --record oturum.kayit         # oynarken kaydet
+    python replay.py play oturum.kayit [--to N] [--verify]
+    python replay.py bench [--events 1000000] [--villages 1000]   # süre ölçümü
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from main import Game, Inventory, Item, ScriptedIO, Village
+from persistence import (_JOURNAL_HEADER, _NAME_LENGTH, _OP, _OP_LIBERATE,
+                         _OP_POP, _OP_PUSH, _OP_PUZZLE, _OP_REMOVE, _POWER, _VERSION,
+                         _VILLAGE_ID, _apply_records, _encode_inventory_event,
+                         _game_villages, _loads, dumps)
+
+_LOG_MAGIC = b"KKOR"
+_OP_CHECKPOINT = 6
+_CHECKPOINT = struct.Struct("<BQI")  # tür, olay no, anlık görüntü uzunluğu
+_CHECKPOINT_PERIODIC = 0
+_CHECKPOINT_RESET = 1
+_TRAILER = struct.Struct("<QI4s")
+_TRAILER_MAGIC = b"KKOI"
+
+
+class Recorder:
+    """Oyundaki olayları oturum kaydına ekler"""
+
+    def __init__(self, game: Game, path: str, checkpoint_every: int = 10000):
+        self.game = game
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.events = 0
+        self._since_checkpoint = 0  # Son kontrol noktasından beri olay sayısı
+        self._checkpoint_size = 0
+        self._checkpoint_end = 0
+        self._index = array("Q")  # (olay no, ofset) çiftleri
+        self._village_ids = {village: i for i, village in enumerate(_game_villages(game))}
+        self._file = open(path, "wb")
+        self._file.write(_JOURNAL_HEADER.pack(_LOG_MAGIC, _VERSION))
+        self._checkpoint(_CHECKPOINT_PERIODIC)
+        game.listeners.append(self._on_game_event)
+        game.inventory.listeners.append(self._on_inventory_event)
+
+    def _append(self, record: bytes):
+        self._file.write(record)
+        self.events += 1
+        self._since_checkpoint += 1
+        # push_many sürerken kontrol noktası alınmaz; durum ancak "batch_end"
+        # olayında kayıttaki olaylarla örtüşür
+        if not self.game.inventory.in_batch:
+            self._periodic_checkpoint()
+
+    def _periodic_checkpoint(self):
+        if (self._since_checkpoint >= self.checkpoint_every
+                and self._file.tell() - self._checkpoint_end >= self._checkpoint_size):
+            self._checkpoint(_CHECKPOINT_PERIODIC)
+
+    def _checkpoint(self, kind: int):
+        snapshot = dumps(self.game)
+        self._index.extend((self.events, self._file.tell()))
+        self._file.write(_OP.pack(_OP_CHECKPOINT) + _CHECKPOINT.pack(kind, self.events, len(snapshot)))
+        self._file.write(snapshot)
+        self._file.flush()
+        self._checkpoint_size = len(snapshot)
+        self._checkpoint_end = self._file.tell()
+        self._since_checkpoint = 0
+
+    def _on_inventory_event(self, event: str, data):
+        if event == "batch_end":
+            self._periodic_checkpoint()
+            return
+        record = _encode_inventory_event(event, data)
+        if record:
+            self._append(record)
+
+    def _on_game_event(self, event: str, data):
+        if event == "liberate":
+            self._append(_OP.pack(_OP_LIBERATE) + _VILLAGE_ID.pack(self._village_ids[data]))
+        elif event == "puzzle":
+            answer = data.encode("utf-8")
+            self._append(_OP.pack(_OP_PUZZLE) + _NAME_LENGTH.pack(len(answer)) + answer)
+        elif event == "restore":
+            self._checkpoint(_CHECKPOINT_RESET)
+
+    def close(self):
+        """Dinleyicileri kaldırır, kontrol noktası dizinini yazar ve dosyayı kapatır"""
+        self.game.listeners.remove(self._on_game_event)
+        self.game.inventory.listeners.remove(self._on_inventory_event)
+        index_offset = self._file.tell()
+        self._file.write(self._index.tobytes())
+        self._file.write(_TRAILER.pack(index_offset, len(self._index) // 2, _TRAILER_MAGIC))
+        self._file.close()
+
+
+def _record_size(data, offset: int, end: int) -> int:
+    """offset'teki kaydın bayt uzunluğu; kayıt yarımsa 0"""
+    op = data[offset]
+    if op == _OP_POP:
+        size = _OP.size
+    elif op == _OP_LIBERATE:
+        size = _OP.size + _VILLAGE_ID.size
+    elif op == _OP_PUSH or op == _OP_REMOVE or op == _OP_PUZZLE:
+        if offset + _OP.size + _NAME_LENGTH.size > end:
+            return 0
+        (length,) = _NAME_LENGTH.unpack_from(data, offset + _OP.size)
+        size = _OP.size + _NAME_LENGTH.size + length + (_POWER.size if op == _OP_PUSH else 0)
+    elif op == _OP_CHECKPOINT:
+        if offset + _OP.size + _CHECKPOINT.size > end:
+            return 0
+        _, _, length = _CHECKPOINT.unpack_from(data, offset + _OP.size)
+        size = _OP.size + _CHECKPOINT.size + length
+    else:
+        raise ValueError(f"Bilinmeyen oturum kaydı: {op}")
+    return size if offset + size <= end else 0
+
+
+class SessionLog:
+    """Oturum kaydını okur ve istenen olaydaki oyun durumunu kurar"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if len(self.data) < _JOURNAL_HEADER.size:
+            raise ValueError("Geçersiz oturum kaydı")
+        magic, version = _JOURNAL_HEADER.unpack_from(self.data, 0)
+        if magic != _LOG_MAGIC or version != _VERSION:
+            raise ValueError("Geçersiz oturum kaydı")
+        self._points: List[int] = []  # Kontrol noktalarının olay numaraları
+        self._offsets: List[int] = []
+        if not self._read_index():
+            self._scan()
+
+    def _read_index(self) -> bool:
+        data = self.data
+        if len(data) < _JOURNAL_HEADER.size + _TRAILER.size:
+            return False
+        index_offset, count, magic = _TRAILER.unpack_from(data, len(data) - _TRAILER.size)
+        if (magic != _TRAILER_MAGIC or count == 0
+                or index_offset + count * 16 != len(data) - _TRAILER.size):
+            return False
+        index = array("Q")
+        index.frombytes(data[index_offset:index_offset + count * 16])
+        self._points = index[0::2].tolist()
+        self._offsets = index[1::2].tolist()
+        self.end = index_offset
+        last = self._offsets[-1]
+        self.events = self._count_events(last + _record_size(data, last, self.end), self.end,
+                                         self._points[-1])
+        return True
+
+    def _scan(self):
+        """Dizini olmayan (yarıda kalmış) kayıtta kontrol noktalarını bulur"""
+        data = self.data
+        end = len(data)
+        offset = _JOURNAL_HEADER.size
+        events = 0
+        while offset < end:
+            try:
+                size = _record_size(data, offset, end)
+            except ValueError:
+                break  # Yarım yazılmış dizin
+            if size == 0:
+                break  # Yazılırken kesilmiş son kayıt
+            if data[offset] == _OP_CHECKPOINT:
+                self._points.append(events)
+                self._offsets.append(offset)
+            else:
+                events += 1
+            offset += size
+        if not self._points:
+            raise ValueError("Oturum kaydında başlangıç durumu yok")
+        self.end = offset
+        self.events = events
+
+    def _count_events(self, offset: int, end: int, events: int) -> int:
+        # Son kontrol noktasından sonraki kayıtlar sayılır (en fazla bir aralık)
+        while offset < end:
+            offset += _record_size(self.data, offset, end)
+            events += 1
+        return events
+
+    def __len__(self) -> int:
+        return self.events
+
+    @property
+    def checkpoints(self) -> int:
+        return len(self._points)
+
+    def _load_checkpoint(self, offset: int, io) -> Tuple[Game, int, int, bytes]:
+        """(oyun, olay no, sonraki kaydın ofseti, anlık görüntü)"""
+        kind, event, length = _CHECKPOINT.unpack_from(self.data, offset + _OP.size)
+        start = offset + _OP.size + _CHECKPOINT.size
+        snapshot = self.data[start:start + length]
+        game, _ = _loads(snapshot, io)
+        return game, event, start + length, snapshot
+
+    def game_at(self, event: Optional[int] = None, io=None, verify: bool = False) -> Game:
+        """event olay uygulandıktan sonraki oyunu döndürür (varsayılan: kaydın sonu).
+
+        verify=True ise baştan oynatılır; kontrol noktalarından biri tekrar
+        oynatılan durumla uyuşmazsa ValueError verilir.
+        """
+        if event is None:
+            event = self.events
+        if not 0 <= event <= self.events:
+            raise IndexError(f"Olay numarası 0-{self.events} aralığında olmalı")
+        if io is None:
+            io = ScriptedIO([])
+        data = self.data
+        end = self.end
+        # Aynı olay numarasında birden çok kontrol noktası varsa sonuncusu geçerlidir.
+        # Doğrulamada baştan oynatılır ve yoldaki bütün kontrol noktalarıyla karşılaştırılır.
+        point = 0 if verify else bisect_right(self._points, event) - 1
+        game, current, offset, _ = self._load_checkpoint(self._offsets[point], io)
+        villages = list(_game_villages(game))
+        shared_items = {}
+        # Ad indeksi yalnızca istemlerde kullanılır; sonda bir kez kurulur
+        game.inventory.pause_names()
+        while True:
+            if current < event:
+                offset, applied = _apply_records(game, villages, shared_items, data, offset, end,
+                                                 event - current)
+                current += applied
+            # Hedefteki olaydan hemen sonra gelen kontrol noktaları da işlenir
+            # (ör. o noktada yapılmış bir geri alma)
+            if offset >= end or data[offset] != _OP_CHECKPOINT:
+                if current < event:
+                    raise ValueError(f"Oturum kaydı {current}. olayda bozuk")
+                break
+            kind = data[offset + _OP.size]
+            if kind == _CHECKPOINT_RESET:
+                game, _, offset, _ = self._load_checkpoint(offset, io)
+                villages = list(_game_villages(game))
+                shared_items = {}
+                game.inventory.pause_names()
+            elif verify:
+                saved, _, next_offset, _ = self._load_checkpoint(offset, io)
+                if _fingerprint(game) != _fingerprint(saved):
+                    raise ValueError(f"Tekrar oynatılan durum {current}. olayda kayıttan farklı")
+                offset = next_offset
+            else:
+                offset += _record_size(data, offset, end)
+        game.inventory.resume_names()
+        return game
+
+
+def _fingerprint(game: Game):
+    """Karşılaştırma için oyun durumu; anlık görüntü baytları köy ağaçlarının
+    kurulup kurulmadığına göre değişebildiği için doğrudan karşılaştırılmaz"""
+    villages = tuple((village.name, village.is_liberated, village.rule,
+                      tuple(sorted((item.name, item.power, count) for item, count in village.item_counts())))
+                     for village in _game_villages(game))
+    queue = tuple(village.name for village in game.liberation_queue)
+    bag = tuple((item.name, item.power) for item in game.inventory)
+    return villages, queue, bag, game.inventory.max_capacity
+
+
+def _summary(game: Game) -> List[str]:
+    villages = list(_game_villages(game))
+    liberated = sum(village.is_liberated for village in villages)
+    bag = ", ".join(item.name for item in game.inventory)
+    return [f"Kurtarılan köy: {liberated}/{len(villages)}",
+            f"Sıradaki köy: {game.liberation_queue.peek().name if game.liberation_queue.peek() else '-'}",
+            f"Çanta ({game.inventory.size}, {game.inventory.total_power} güç): {bag}"]
+
+
+def record_synthetic(path: str, events: int, villages: int = 1000, seed: int = 0,
+                     checkpoint_every: int = 10000) -> int:
+    """Sentetik bir oturum kaydeder; kaydedilen olay sayısını döndürür.
+
+    Olaylar köylere eşit dağıtılır: her köyde çanta dolana kadar öğe alınır,
+    doluysa bir öğe kullanılır veya çıkarılır, arada bulmaca cevapları verilir
+    ve sonunda köy kurtarılır.
+    """
+    rng = random.Random(seed)
+    names = ["Kılıç", "Büyü", "Harita", "Balta", "Altın", "Yiyecek", "Bakır",
+             "Gümüş", "Kalkan", "Zırh", "Anahtar", "Meşale", "Ok-Yay"]
+    items = [Item(name, len(name)) for name in names]
+    village_items = [rng.sample(items, 3) for _ in range(villages)]
+    world = [Village(f"köy{i}", contents) for i, contents in enumerate(village_items)]
+    game = Game(io=ScriptedIO([]), villages=world, inventory=Inventory())
+    recorder = Recorder(game, path, checkpoint_every)
+    inventory = game.inventory
+    inventory.pause_names()  # İstem yok; ad indeksi gerekmiyor
+    for number, (village, contents) in enumerate(zip(world, village_items), 1):
+        # Bu köyün sonunda ulaşılacak olay sayısı (kurtarma olayı hariç)
+        target = events * number // villages - 1
+        while recorder.events < target:
+            item = rng.choice(contents)
+            if not inventory.push(item):
+                if rng.random() < 0.5:
+                    inventory.pop()
+                else:
+                    inventory.use_item(inventory.head.item.name)
+            elif rng.random() < 0.02:
+                game._notify("puzzle", rng.choice(names).upper())
+        game.liberation_queue.remove(village)
+        village.is_liberated = True
+        game._notify("liberate", village)
+    recorder.close()
+    return recorder.events
+
+
+def _bench(args) -> int:
+    path = os.path.join(tempfile.mkdtemp(), "bench.kayit")
+    started = time.perf_counter()
+    events = record_synthetic(path, args.events, args.villages)
+    print(f"kayıt: {events} olay, {os.path.getsize(path)} bayt, "
+          f"{time.perf_counter() - started:.2f} sn")
+    started = time.perf_counter()
+    log = SessionLog(path)
+    print(f"açma: {log.checkpoints} kontrol noktası, {time.perf_counter() - started:.3f} sn")
+    started = time.perf_counter()
+    game = log.game_at(verify=True)
+    print(f"baştan sona (doğrulamalı): {time.perf_counter() - started:.2f} sn")
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for _ in range(args.seeks):
+        log.game_at(rng.randrange(events + 1))
+    print(f"rastgele atlama: {(time.perf_counter() - started) / args.seeks:.3f} sn/atlama")
+    for line in _summary(game):
+        print(line)
+    os.remove(path)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Oturum kayıtlarını tekrar oynatır")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play = commands.add_parser("play", help="kaydı tekrar oynat ve son durumu göster")
+    play.add_argument("path")
+    play.add_argument("--to", type=int, default=None, help="bu olaya kadar oynat")
+    play.add_argument("--verify", action="store_true", help="kontrol noktalarıyla karşılaştır")
+
+    bench = commands.add_parser("bench", help="sentetik kayıtla süre ölçümü")
+    bench.add_argument("--events", type=int, default=1000000)
+    bench.add_argument("--villages", type=int, default=1000)
+    bench.add_argument("--seeks", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if args.command == "bench":
+        return _bench(args)
+    log = SessionLog(args.path)
+    started = time.perf_counter()
+    game = log.game_at(args.to, verify=args.verify)
+    print(f"{len(log)} olay, {log.checkpoints} kontrol noktası; "
+          f"{args.to if args.to is not None else len(log)}. olaya "
+          f"{time.perf_counter() - started:.3f} sn'de gelindi")
+    for line in _summary(game):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""Köyler arası yol haritası ve rota planlama.
+
+Harita mevcut Village nesnelerinin üzerine kurulur: her köy bir düğüm, her
+yol iki köy arasında pozitif uzunluklu yönsüz bir kenardır. Kenarlar
+değiştirilebilir sözlüklerde tutulur; sorgular için bunlardan sıkıştırılmış
+komşuluk dizileri (CSR: offsets/targets/weights) bir kez üretilir.
+
+Sorgular:
+    shortest_path  tek rota: A* (yer imi sınırlarıyla) veya düz Dijkstra
+    distances_from bir köyden bütün köylere uzaklık (distance_priority için)
+    plan_tour      kalan köyleri gezen kısa bir tur
+
+Tekrarlı sorgular için ALT yer imleri (A*, Landmarks, Triangle inequality)
+kullanılır: birkaç uzak köyden bütün haritaya uzaklıklar önceden hesaplanır ve
+|d(l, hedef) - d(l, v)| alt sınırı A*'a sezgisel olarak verilir. Bulunan
+rotalar önbellekte tutulur. Yol eklenir veya silinirse CSR dizileri, yer
+imleri ve önbellek geçersiz olur; ilk sorguda yeniden kurulur.
+
+Kullanım (100.000 köylük sentetik haritada zamanlama):
+    python routes.py [köy_sayısı]
+"""
+import heapq
+import math
+import random
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from main import Village, VillageScheduler
+
+INF = float("inf")
+
+# Bu kadar köyden büyük haritalarda yer imleri ilk sorguda kendiliğinden kurulur
+LANDMARK_MIN_VILLAGES = 1000
+DEFAULT_LANDMARKS = 8
+# Tur planında (hedef sayısı + 1) x köy sayısı bu değeri geçmiyorsa uzaklık
+# matrisi ve 2-opt kullanılır; geçiyorsa açgözlü en yakın komşu turu yapılır
+TOUR_MATRIX_BUDGET = 200000
+
+
+class Tour:
+    """Planlanan tur: ziyaret sırası, toplam uzunluk ve ulaşılamayan köyler"""
+
+    def __init__(self, order: List["Village"], length: float, unreachable: List["Village"]):
+        self.order = order
+        self.length = length
+        self.unreachable = unreachable
+
+
+class WorldMap:
+    def __init__(self, villages: Iterable["Village"] = (), cache_size: int = 4096,
+                 landmarks: int = DEFAULT_LANDMARKS):
+        self.villages: List["Village"] = []
+        self._ids: Dict["Village", int] = {}
+        self._roads: List[Dict[int, float]] = []  # Köy no -> {komşu no: uzunluk}
+        self.version = 0  # Her yol değişikliğinde artar
+        self.landmark_count = landmarks
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._graph = None  # (offsets, targets, weights)
+        self._landmarks: Optional[List[List[float]]] = None
+        self._cache: "OrderedDict[Tuple[int, int], Tuple[float, Tuple[int, ...]]]" = OrderedDict()
+        for village in villages:
+            self.add_village(village)
+
+    def __len__(self) -> int:
+        return len(self.villages)
+
+    def _invalidate(self):
+        self.version += 1
+        self._graph = None
+        self._landmarks = None
+        self._cache.clear()
+
+    def _id(self, village: "Village") -> int:
+        try:
+            return self._ids[village]
+        except KeyError:
+            raise ValueError(f"{village.name} haritada yok") from None
+
+    # Harita düzenleme
+
+    def add_village(self, village: "Village") -> int:
+        """Köyü haritaya ekler (zaten varsa numarasını döndürür)"""
+        village_id = self._ids.get(village)
+        if village_id is None:
+            village_id = self._ids[village] = len(self.villages)
+            self.villages.append(village)
+            self._roads.append({})
+            self._invalidate()
+        return village_id
+
+    def add_road(self, a: "Village", b: "Village", length: float = 1.0):
+        """İki köy arasına yol ekler; yol varsa uzunluğunu değiştirir"""
+        if not length > 0:
+            raise ValueError("Yol uzunluğu pozitif olmalı")
+        u = self.add_village(a)
+        v = self.add_village(b)
+        if u == v:
+            raise ValueError("Bir köyden kendisine yol eklenemez")
+        self._roads[u][v] = self._roads[v][u] = float(length)
+        self._invalidate()
+
+    def remove_road(self, a: "Village", b: "Village") -> bool:
+        u, v = self._ids.get(a), self._ids.get(b)
+        if u is None or v is None or v not in self._roads[u]:
+            return False
+        del self._roads[u][v]
+        del self._roads[v][u]
+        self._invalidate()
+        return True
+
+    def road_length(self, a: "Village", b: "Village") -> Optional[float]:
+        u, v = self._ids.get(a), self._ids.get(b)
+        if u is None or v is None:
+            return None
+        return self._roads[u].get(v)
+
+    def neighbours(self, village: "Village") -> List[Tuple["Village", float]]:
+        return [(self.villages[v], length) for v, length in self._roads[self._id(village)].items()]
+
+    # Sıkıştırılmış komşuluk dizileri ve yer imleri
+
+    def _arrays(self):
+        if self._graph is None:
+            offsets = array("l", [0])
+            targets = array("l")
+            weights = array("d")
+            for roads in self._roads:
+                targets.extend(roads.keys())
+                weights.extend(roads.values())
+                offsets.append(len(targets))
+            self._graph = (offsets, targets, weights)
+        return self._graph
+
+    def _all_distances(self, source: int, goals: Optional[set] = None) -> List[float]:
+        """source'tan köylere uzaklık (Dijkstra); goals verilirse hepsine ulaşınca durur"""
+        offsets, targets, weights = self._arrays()
+        distances = [INF] * len(self.villages)
+        distances[source] = 0.0
+        heap = [(0.0, source)]
+        pop, push = heapq.heappop, heapq.heappush
+        left = len(goals) if goals is not None else -1
+        while heap:
+            distance, u = pop(heap)
+            if distance > distances[u]:
+                continue
+            if goals is not None and u in goals:
+                left -= 1
+                if not left:
+                    break
+            start, end = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[start:end], weights[start:end]):
+                candidate = distance + weight
+                if candidate < distances[v]:
+                    distances[v] = candidate
+                    push(heap, (candidate, v))
+        return distances
+
+    def build_landmarks(self, count: Optional[int] = None):
+        """En uzak nokta yöntemiyle yer imi seçip her birinden uzaklıkları hesaplar"""
+        count = self.landmark_count if count is None else count
+        landmarks: List[List[float]] = []
+        if self.villages and count > 0:
+            # Her yeni yer imi, mevcutlara en uzak (ulaşılabilir) köydür
+            closest = [INF] * len(self.villages)
+            candidate = 0
+            for _ in range(min(count, len(self.villages))):
+                distances = self._all_distances(candidate)
+                landmarks.append(distances)
+                best = -1.0
+                for village_id, distance in enumerate(distances):
+                    if distance < closest[village_id]:
+                        closest[village_id] = distance
+                    nearest = closest[village_id]
+                    if nearest != INF and nearest > best:
+                        best, candidate = nearest, village_id
+                if best <= 0:
+                    break
+        self._landmarks = landmarks
+
+    def _use_landmarks(self) -> bool:
+        if self._landmarks is None and self.landmark_count > 0 \
+                and len(self.villages) >= LANDMARK_MIN_VILLAGES:
+            self.build_landmarks()
+        return bool(self._landmarks)
+
+    # Tek rota sorguları
+
+    def _search(self, source: int, target: int, use_landmarks: bool) -> Optional[Tuple[float, Tuple[int, ...]]]:
+        bounds = []
+        if use_landmarks:
+            for distances in self._landmarks:
+                to_source, to_target = distances[source], distances[target]
+                if (to_source == INF) != (to_target == INF):
+                    return None  # Farklı bağlantılı bileşenler
+                if to_target != INF:
+                    bounds.append((distances, to_target))
+
+        offsets, targets, weights = self._arrays()
+        best = [INF] * len(self.villages)
+        best[source] = 0.0
+        parent = {source: -1}
+        heap = [(0.0, 0.0, source)]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            _, distance, u = pop(heap)
+            if u == target:
+                path = []
+                while u != -1:
+                    path.append(u)
+                    u = parent[u]
+                path.reverse()
+                return distance, tuple(path)
+            if distance > best[u]:
+                continue
+            start, end = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[start:end], weights[start:end]):
+                candidate = distance + weight
+                if candidate < best[v]:
+                    best[v] = candidate
+                    parent[v] = u
+                    estimate = 0.0
+                    for distances, to_target in bounds:
+                        gap = abs(to_target - distances[v])
+                        if gap > estimate:
+                            estimate = gap
+                    push(heap, (candidate + estimate, candidate, v))
+        return None
+
+    def _route(self, source: int, target: int, method: str) -> Optional[Tuple[float, Tuple[int, ...]]]:
+        if method not in ("astar", "dijkstra"):
+            raise ValueError(f"Bilinmeyen yöntem: {method}")
+        if source == target:
+            return 0.0, (source,)
+        key = (source, target) if source < target else (target, source)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+        else:
+            self.cache_misses += 1
+            result = self._search(key[0], key[1], method == "astar" and self._use_landmarks())
+            cached = result if result is not None else (INF, ())
+            self._cache[key] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        distance, path = cached
+        if distance == INF:
+            return None
+        return distance, path if key[0] == source else path[::-1]
+
+    def shortest_path(self, a: "Village", b: "Village",
+                      method: str = "astar") -> Optional[Tuple[float, List["Village"]]]:
+        """(uzunluk, köyler) döndürür; yol yoksa None"""
+        result = self._route(self._id(a), self._id(b), method)
+        if result is None:
+            return None
+        distance, path = result
+        return distance, [self.villages[village_id] for village_id in path]
+
+    def distance(self, a: "Village", b: "Village") -> float:
+        result = self._route(self._id(a), self._id(b), "astar")
+        return INF if result is None else result[0]
+
+    def distances_from(self, village: "Village") -> Dict[str, float]:
+        """Köy adı -> uzaklık tablosu (main.distance_priority ile kullanılabilir)"""
+        distances = self._all_distances(self._id(village))
+        return {other.name: distances[i] for i, other in enumerate(self.villages)}
+
+    # Tur planlama
+
+    def _nearest_target(self, source: int, remaining: set) -> Tuple[int, float]:
+        """source'tan kalan hedeflerin en yakınını bulur (hedef bulununca durur)"""
+        offsets, targets, weights = self._arrays()
+        best = [INF] * len(self.villages)
+        best[source] = 0.0
+        heap = [(0.0, source)]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            distance, u = pop(heap)
+            if distance > best[u]:
+                continue
+            if u in remaining:
+                return u, distance
+            start, end = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[start:end], weights[start:end]):
+                candidate = distance + weight
+                if candidate < best[v]:
+                    best[v] = candidate
+                    push(heap, (candidate, v))
+        return -1, INF
+
+    def _matrix_tour(self, start: int, goals: List[int]) -> Tuple[List[int], float, List[int]]:
+        """Küçük problemler için: uzaklık matrisi, en yakın komşu ve 2-opt iyileştirmesi"""
+        nodes = [start] + goals
+        size = len(nodes)
+        node_set = set(nodes)
+        # Her satır, bütün hedeflere ulaşınca duran tek bir Dijkstra ile hesaplanır
+        matrix = []
+        for node in nodes:
+            distances = self._all_distances(node, node_set)
+            matrix.append([distances[other] for other in nodes])
+
+        unreachable = [j for j in range(1, size) if matrix[0][j] == INF]
+        left = set(range(1, size)) - set(unreachable)
+        order = [0]
+        while left:
+            last = order[-1]
+            following = min(left, key=lambda j: matrix[last][j])
+            order.append(following)
+            left.remove(following)
+
+        # 2-opt: başlangıç sabit, tur açık uçlu
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, len(order) - 1):
+                for j in range(i + 1, len(order)):
+                    before = matrix[order[i - 1]][order[i]]
+                    after = matrix[order[i - 1]][order[j]]
+                    if j + 1 < len(order):
+                        before += matrix[order[j]][order[j + 1]]
+                        after += matrix[order[i]][order[j + 1]]
+                    if after < before - 1e-9:
+                        order[i:j + 1] = reversed(order[i:j + 1])
+                        improved = True
+        length = sum(matrix[order[k]][order[k + 1]] for k in range(len(order) - 1))
+        return [nodes[k] for k in order[1:]], length, [nodes[j] for j in unreachable]
+
+    def _greedy_tour(self, start: int, goals: List[int]) -> Tuple[List[int], float, List[int]]:
+        """Çok hedef için: her adımda en yakın kalan hedefe giden Dijkstra"""
+        remaining = set(goals)
+        order = []
+        length = 0.0
+        current = start
+        while remaining:
+            found, distance = self._nearest_target(current, remaining)
+            if found < 0:
+                break
+            order.append(found)
+            remaining.remove(found)
+            length += distance
+            current = found
+        return order, length, sorted(remaining)
+
+    def plan_tour(self, start: "Village", villages: Iterable["Village"]) -> Tour:
+        """start'tan çıkıp verilen köylerin hepsini gezen kısa bir tur planlar.
+
+        Problem küçükse ((hedef + 1) x köy sayısı <= TOUR_MATRIX_BUDGET) en yakın
+        komşu turu 2-opt ile iyileştirilir; büyük haritalarda her adımda en yakın
+        kalan hedefe giden açgözlü tur kullanılır.
+        """
+        source = self._id(start)
+        goals = list(dict.fromkeys(self._id(village) for village in villages if village is not start))
+        if (len(goals) + 1) * len(self.villages) <= TOUR_MATRIX_BUDGET:
+            order, length, unreachable = self._matrix_tour(source, goals)
+        else:
+            order, length, unreachable = self._greedy_tour(source, goals)
+        villages = self.villages
+        return Tour([villages[i] for i in order], length, [villages[i] for i in unreachable])
+
+    def schedule_tour(self, scheduler: "VillageScheduler", start: "Village") -> Tour:
+        """Kurtarma sırasını start'tan başlayan tur sırasına göre yeniden önceliklendirir"""
+        tour = self.plan_tour(start, list(scheduler))
+        if start in scheduler:
+            scheduler.update(start, 0)  # Başlangıç köyü henüz kurtarılmadıysa ilk sırada
+        for position, village in enumerate(tour.order, 1):
+            scheduler.update(village, position)
+        for village in tour.unreachable:
+            scheduler.update(village, INF)
+        return tour
+
+
+def grid_map(count: int, seed: int = 0, shortcuts: float = 0.05):
+    """Sentetik harita: yaklaşık kare ızgara, rastgele yol uzunlukları ve kısayollar"""
+    from main import Village
+
+    rng = random.Random(seed)
+    width = max(1, math.isqrt(count))
+    villages = [Village(f"Köy{i}") for i in range(count)]
+    world_map = WorldMap(villages)
+    roads = world_map._roads
+    # Toplu ekleme: her add_road çağrısındaki geçersiz kılmayı atlamak için doğrudan yazılır
+    for i in range(count):
+        if (i + 1) % width and i + 1 < count:
+            roads[i][i + 1] = roads[i + 1][i] = float(rng.randint(1, 10))
+        if i + width < count:
+            roads[i][i + width] = roads[i + width][i] = float(rng.randint(1, 10))
+    for _ in range(int(count * shortcuts)):
+        u, v = rng.randrange(count), rng.randrange(count)
+        if u != v:
+            roads[u][v] = roads[v][u] = float(rng.randint(5, 30))
+    world_map._invalidate()
+    return world_map
+
+
+def _main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 100000
+    rng = random.Random(1)
+    start = time.perf_counter()
+    world_map = grid_map(count)
+    print(f"{count} köy, harita {time.perf_counter() - start:.2f} sn")
+
+    start = time.perf_counter()
+    world_map.build_landmarks()
+    print(f"{len(world_map._landmarks)} yer imi: {time.perf_counter() - start:.2f} sn")
+
+    villages = world_map.villages
+    pairs = [(rng.choice(villages), rng.choice(villages)) for _ in range(50)]
+    for method in ("dijkstra", "astar"):
+        world_map._cache.clear()
+        start = time.perf_counter()
+        lengths = [world_map.shortest_path(a, b, method)[0] for a, b in pairs]
+        elapsed = time.perf_counter() - start
+        print(f"{method:>8}: sorgu başına {elapsed / len(pairs) * 1000:.1f} ms")
+    start = time.perf_counter()
+    cached = [world_map.shortest_path(a, b)[0] for a, b in pairs]
+    print(f"  önbellek: sorgu başına {(time.perf_counter() - start) / len(pairs) * 1e6:.1f} µs")
+    if cached != lengths:
+        print("UYARI: A* ve Dijkstra farklı uzunluk buldu")
+        return 1
+
+    for goals in (5, 20, 2000):
+        targets = rng.sample(villages, goals)
+        start = time.perf_counter()
+        tour = world_map.plan_tour(villages[0], targets)
+        print(f"{goals} köylük tur: {time.perf_counter() - start:.2f} sn, uzunluk {tour.length:.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv))
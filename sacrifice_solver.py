@@ -0,0 +1,121 @@
+"""Kristalköy güç gereksinimi için en az kayıplı öğe seçimi.
+
+Çantadaki öğelerden toplam gücü en az required_power olan bir alt küme
+seçilir. İki hedef desteklenir:
+
+- "count": en az sayıda öğe vermek (büyükten küçüğe açgözlü seçim en iyisidir)
+- "power": verilen toplam gücü en aza indirmek (bit kümesi ile alt küme toplamı)
+
+Kullanım (zamanlama ölçümü):
+    python sacrifice_solver.py
+"""
+import random
+import time
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from main import Inventory, Item
+
+
+def _fewest_items(items: List["Item"], required_power: int) -> Optional[List["Item"]]:
+    """En güçlü öğeleri sırayla seçer; gereken güce en az öğeyle ulaşır"""
+    chosen = []
+    total = 0
+    for item in sorted(items, key=lambda item: item.power, reverse=True):
+        if total >= required_power:
+            break
+        chosen.append(item)
+        total += item.power
+    return chosen if total >= required_power else None
+
+
+def _least_power(items: List["Item"], required_power: int) -> Optional[List["Item"]]:
+    """Toplamı required_power'dan küçük olmayan en küçük alt küme toplamını bulur.
+
+    Aynı güçteki öğeler birbirinin yerine geçebildiği için öğeler güce göre
+    gruplanır ve her grubun adedi ikili parçalara bölünür (1, 2, 4, ...).
+    Ulaşılabilir toplamlar Python tamsayısı üzerinde bit kümesi olarak tutulur.
+    """
+    by_power = {}
+    for item in items:
+        if item.power > 0:
+            by_power.setdefault(item.power, []).append(item)
+    if not by_power:
+        return None
+
+    # En iyi çözümün toplamı required_power + en büyük güç - 1'i geçemez
+    limit = required_power + max(by_power) - 1
+    mask = (1 << (limit + 1)) - 1
+
+    chunks = []  # (güç, adet)
+    for power, group in by_power.items():
+        remaining = len(group)
+        size = 1
+        while remaining > 0:
+            take = min(size, remaining)
+            chunks.append((power, take))
+            remaining -= take
+            size *= 2
+
+    reachable = 1
+    history = []  # Her parçadan önceki ulaşılabilir toplamlar
+    for power, take in chunks:
+        history.append(reachable)
+        reachable |= (reachable << (power * take)) & mask
+
+    candidates = reachable >> required_power
+    if not candidates:
+        return None
+    total = required_power + (candidates & -candidates).bit_length() - 1
+
+    # Geriye doğru hangi parçaların kullanıldığını bul
+    used = {}
+    for (power, take), before in zip(reversed(chunks), reversed(history)):
+        if not (before >> total) & 1:
+            total -= power * take
+            used[power] = used.get(power, 0) + take
+
+    chosen = []
+    for power, amount in used.items():
+        chosen.extend(by_power[power][:amount])
+    return chosen
+
+
+def solve_sacrifice(inventory: "Inventory", required_power: int,
+                    objective: str = "power") -> Optional[List["Item"]]:
+    """Gereken gücü karşılayan en az kayıplı öğe listesini döndürür.
+
+    objective "count" ise en az sayıda öğe, "power" ise en az toplam güç
+    verilir. Çantadaki güç yetmiyorsa None döndürülür.
+    """
+    if required_power <= 0:
+        return []
+    items = list(inventory)
+    if objective == "count":
+        return _fewest_items(items, required_power)
+    if objective == "power":
+        return _least_power(items, required_power)
+    raise ValueError(f"Bilinmeyen hedef: {objective}")
+
+
+def _benchmark():
+    from main import Inventory, Item
+
+    random.seed(7)
+    print(f"{'öğe':>6} {'hedef':>7} {'hedef türü':>10} {'süre (ms)':>10} {'seçilen':>8} {'toplam':>8}")
+    for size in (1000, 5000, 10000):
+        inventory = Inventory(max_capacity=size)
+        for i in range(size):
+            inventory.push(Item(f"öğe{i}", random.randint(1, 100)))
+        for required_power in (10000, 50000):
+            for objective in ("count", "power"):
+                start = time.perf_counter()
+                chosen = solve_sacrifice(inventory, required_power, objective)
+                elapsed = (time.perf_counter() - start) * 1000
+                total = sum(item.power for item in chosen) if chosen else 0
+                print(f"{size:>6} {required_power:>7} {objective:>10} {elapsed:>10.1f} "
+                      f"{len(chosen) if chosen else 0:>8} {total:>8}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,281 @@
+"""Çok sayıda oyunu tek bir asyncio olay döngüsünde barındıran TCP sunucusu.
+
+Her bağlantı ayrı bir Game oturumudur. Oyunun etkileşimli akışları
+(Game.menu_flow) girdi gerektiğinde istemi yield eder; sunucu o ana kadar
+biriken çıktıyı istemle birlikte gönderir ve istemciden bir satır bekler.
+Böylece bekleyen oyuncular iş parçacığı veya süreç tutmaz.
+
+Satır protokolü (UTF-8):
+    sunucu -> istemci: oyun çıktısı satır satır; her istem "? " ile başlayan
+                       ayrı bir satırdır
+    istemci -> sunucu: her cevap bir satır
+
+Koruma önlemleri:
+    - geri basınç: istemci okumadıkça yazma tamponu dolar ve oturum bekler
+    - boşta kalan (idle_timeout boyunca cevap vermeyen veya çıktıyı okumayan)
+      oturumlar kapatılır
+    - max_line'dan uzun satırlar ve max_sessions'ı aşan bağlantılar reddedilir
+
+Kullanım:
+    python server.py serve [--port 8765] [--max-sessions 10000] [--idle-timeout 300]
+    python server.py load [--port 8765] [--sessions 10000] [--spawn]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from main import Game
+from playthrough import PLAYTHROUGH_SCRIPT
+
+PROMPT_MARKER = "? "
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Yük üreticisinin oynadığı senaryo (varsayılan dünyada baştan sona bir oyun)
+LOAD_SCRIPT = PLAYTHROUGH_SCRIPT
+
+
+def _raise_file_limit():
+    """Çok sayıda soket için açık dosya sınırını izin verilen en yüksek değere çıkarır"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+class SessionIO:
+    """Oturum çıktısını bir sonraki isteme kadar tamponda toplar.
+
+    Girdi akış üzerinden (yield edilen istemlerle) alındığı için read kullanılmaz.
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+
+    def read(self, prompt: str = "") -> str:
+        raise RuntimeError("Sunucu oturumunda girdi akış üzerinden okunur")
+
+    def write(self, text: str = ""):
+        self.buffer.append(text)
+
+    def write_lines(self, lines):
+        self.buffer.extend(lines)
+
+    def clear(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def take(self, prompt: Optional[str] = None) -> bytes:
+        """Biriken çıktıyı (ve varsa istemi) gönderilecek baytlara çevirir"""
+        lines = self.buffer
+        self.buffer = []
+        if prompt is not None:
+            stripped = prompt.lstrip("\n")
+            lines.extend([""] * (len(prompt) - len(stripped)))
+            lines.append(PROMPT_MARKER + stripped.rstrip())
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+
+class GameServer:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_sessions: int = 10000, idle_timeout: float = 300.0,
+                 max_line: int = 1024, write_buffer: int = 64 * 1024,
+                 game_factory: Callable = None):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_line = max_line
+        self.write_buffer = write_buffer
+        self.game_factory = game_factory if game_factory is not None else (lambda io: Game(io=io))
+        self.sessions = 0
+        self.stats: Dict[str, int] = {"started": 0, "finished": 0, "evicted": 0,
+                                      "rejected": 0, "disconnected": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=self.max_line, backlog=4096)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _send(self, writer: asyncio.StreamWriter, data: bytes):
+        """Veriyi yazar; istemci okumuyorsa tampon boşalana kadar (en çok idle_timeout) bekler"""
+        writer.write(data)
+        await asyncio.wait_for(writer.drain(), self.idle_timeout)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.sessions >= self.max_sessions:
+            self.stats["rejected"] += 1
+            writer.write("Sunucu dolu, lütfen daha sonra tekrar deneyin.\n".encode("utf-8"))
+            writer.close()
+            return
+
+        self.sessions += 1
+        self.stats["started"] += 1
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        io = SessionIO()
+        flow = self.game_factory(io).menu_flow()
+        try:
+            prompt = next(flow)
+            while True:
+                await self._send(writer, io.take(prompt))
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except ValueError:
+                    self.stats["rejected"] += 1
+                    await self._send(writer, "Satır çok uzun, oturum kapatılıyor.\n".encode("utf-8"))
+                    return
+                if not line:
+                    self.stats["disconnected"] += 1
+                    return
+                prompt = flow.send(line.decode("utf-8", "replace").rstrip("\r\n"))
+        except StopIteration:
+            self.stats["finished"] += 1
+            await self._send(writer, io.take())
+        except asyncio.TimeoutError:
+            self.stats["evicted"] += 1
+            writer.write("Oturum uzun süre boşta kaldığı için kapatıldı.\n".encode("utf-8"))
+        except ConnectionError:
+            self.stats["disconnected"] += 1
+        finally:
+            flow.close()
+            self.sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def _read_prompt(reader: asyncio.StreamReader) -> bool:
+    """İstem satırına kadar okur; bağlantı kapandıysa False döndürür"""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return False
+        if line.startswith(PROMPT_MARKER.encode("utf-8")):
+            return True
+
+
+async def _load_client(host: str, port: int, script: List[str], latencies: List[float],
+                       gate: asyncio.Semaphore) -> bool:
+    async with gate:  # Bağlantılar dalga dalga açılır; aynı anda en çok gate kadar bağlanma
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        if not await _read_prompt(reader):
+            return False
+        for answer in script:
+            start = time.perf_counter()
+            writer.write((answer + "\n").encode("utf-8"))
+            await writer.drain()
+            if not await _read_prompt(reader):
+                break  # Son cevaptan ("7") sonra sunucu oturumu kapatır
+            latencies.append(time.perf_counter() - start)
+        while await reader.read(65536):
+            pass
+        return True
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, sessions: int, connect_concurrency: int = 500,
+                   script: List[str] = LOAD_SCRIPT) -> dict:
+    """sessions kadar istemciyi aynı anda çalıştırır; gecikme ve hız istatistiklerini döndürür"""
+    latencies: List[float] = []
+    gate = asyncio.Semaphore(connect_concurrency)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_load_client(host, port, script, latencies, gate)
+                                     for _ in range(sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    completed = sum(1 for result in results if result is True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "sessions": sessions,
+        "completed": completed,
+        "errors": len(errors),
+        "first_error": repr(errors[0]) if errors else None,
+        "seconds": elapsed,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms_p50": percentile(0.50),
+        "latency_ms_p99": percentile(0.99),
+        "latency_ms_max": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+async def _load_main(args) -> int:
+    server = None
+    port = args.port
+    if args.spawn:
+        server = GameServer(args.host, 0, max_sessions=args.sessions)
+        await server.start()
+        port = server.port
+    try:
+        report = await run_load(args.host, port, args.sessions, args.connect_concurrency)
+    finally:
+        if server is not None:
+            await server.close()
+    for key, value in report.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+    if server is not None:
+        print(f"sunucu: {server.stats}")
+    return 0 if report["completed"] == args.sessions else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Köy Kurtarma Oyunu sunucusu")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="sunucuyu başlat")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--max-sessions", type=int, default=10000)
+    serve.add_argument("--idle-timeout", type=float, default=300.0, help="saniye")
+
+    load = commands.add_parser("load", help="yerel istemcilerle yük üret")
+    load.add_argument("--host", default=DEFAULT_HOST)
+    load.add_argument("--port", type=int, default=DEFAULT_PORT)
+    load.add_argument("--sessions", type=int, default=10000)
+    load.add_argument("--connect-concurrency", type=int, default=500)
+    load.add_argument("--spawn", action="store_true", help="sunucuyu aynı süreçte başlat")
+
+    args = parser.parse_args(argv)
+    _raise_file_limit()
+    if args.command == "serve":
+        server = GameServer(args.host, args.port, args.max_sessions, args.idle_timeout)
+        print(f"Sunucu {args.host}:{args.port} adresinde dinliyor...")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+    return asyncio.run(_load_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""Bütün köyleri kurtaran en iyi oyunu bulan arama.
+
+Oyunun kararları şunlardır: çanta doluyken köyden gelen her öğe için hangi
+öğenin çıkarılacağı, güç bedeli olan köyde (Kristalköy) hangi öğelerin
+verileceği ve çanta sınırı olan köyde (Elmasşehir) hangi öğelerin
+bırakılacağı. Bulmaca durumu değiştirmez. Köyler kurtarma sırasıyla gelir.
+
+Arama bu kararlar üzerinde dal-sınır (branch and bound) ile yapılan derinlik
+öncelikli bir aramadır:
+    - Durum, sıradaki adım (köy kuralı veya köyden gelen bir öğe) ve çantadaki
+      öğe türlerinin adetleridir. Öğeler kataloğun (catalog.py) numaralarıyla
+      tutulur; çantanın sırası kararları etkilemez, çünkü oyun öğeleri adlarıyla
+      çıkarır.
+    - Durumun anahtarı Zobrist karmasıdır: her (öğe türü, adet) ve her adım için
+      rastgele 64 bitlik bir sayı vardır; öğe eklenip çıkarıldıkça karma iki XOR
+      ile güncellenir. Yer değiştirme tablosu (transposition table) bu anahtarla
+      her durumun değerini saklar; farklı sırayla verilen kararlarla aynı duruma
+      gelindiğinde durum yeniden aranmaz.
+    - Üst sınır: son çantanın gücü, çantadaki ve gelecek köylerdeki öğelerin en
+      güçlü "kapasite" kadarının toplamını geçemez; çıkarılacak öğe sayısı da en
+      az (çanta + gelecek öğeler - kapasite) kadardır. Sınırı bilinen en iyi
+      sonucu geçemeyen dallar aranmaz.
+
+Hedefler (OBJECTIVES):
+    power     son çantanın gücünü en büyük yapar (eşitlikte daha az çıkarma)
+    discards  çantadan çıkan öğe sayısını (çıkarma, verilen ve bırakılan öğeler)
+              en küçük yapar (eşitlikte daha çok güç)
+
+Bulunan plan gerçek Game üzerinde policy_eval.PolicyPlayerIO ile oynatılarak
+doğrulanabilir (verify_plan).
+
+Kullanım:
+    python solver.py [--world default|random|DOSYA] [--objective power|discards]
+                     [--games 1] [--seed 0]
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from catalog import ItemCatalog
+from main import RULE_BAG_LIMIT, RULE_SACRIFICE, Game, Item, ScriptedIO
+from policy_eval import BAG_LIMIT, REQUIRED_POWER, PolicyPlayerIO, make_villages
+
+OBJECTIVES = ("power", "discards")
+
+# Kurtarılamayan (Kristalköy'de gücü yetmeyen) dalların değeri
+DEAD = -(1 << 62)
+
+_STEP_PUSH = 0
+_STEP_SACRIFICE = 1
+_STEP_BAG_LIMIT = 2
+
+
+class Decision:
+    """Planın bir adımı: köy, karar türü ve çantadan çıkan öğeler"""
+
+    __slots__ = ("village", "kind", "items")
+
+    def __init__(self, village: str, kind: str, items: List[Item]):
+        self.village = village
+        self.kind = kind  # "discard", "sacrifice" veya "drop"
+        self.items = items
+
+    def __repr__(self):
+        names = ", ".join(item.name for item in self.items)
+        return f"{self.village}: {self.kind} [{names}]"
+
+
+class Solution:
+    """Arama sonucu; bütün köyleri kurtaran bir oyun yoksa final_power None olur"""
+
+    def __init__(self, objective: str, final_power: int, removed: int,
+                 decisions: List[Decision], stats: Dict[str, float]):
+        self.objective = objective
+        self.final_power = final_power
+        self.removed = removed  # Çantadan çıkan toplam öğe sayısı
+        self.decisions = decisions
+        self.stats = stats
+
+    @property
+    def feasible(self) -> bool:
+        return self.final_power is not None
+
+
+class Solver:
+    """Bir oyunun kalan köyleri için en iyi kararları arar"""
+
+    def __init__(self, game: Game, objective: str = "power", seed: int = 0):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Bilinmeyen hedef: {objective}")
+        self.objective = objective
+        self.capacity = game.inventory.max_capacity
+
+        catalog = ItemCatalog()
+        for item in game.inventory:
+            catalog.intern(item)
+        # Adımlar: (tür, köy adı, öğe numarası); köy öğeleri oyundaki gibi alfabetik gelir
+        self.steps: List[Tuple[int, str, int]] = []
+        for village in game.liberation_queue:
+            if village.rule == RULE_SACRIFICE:
+                self.steps.append((_STEP_SACRIFICE, village.name, -1))
+            elif village.rule == RULE_BAG_LIMIT:
+                self.steps.append((_STEP_BAG_LIMIT, village.name, -1))
+            for item in village.inventory:
+                self.steps.append((_STEP_PUSH, village.name, catalog.intern(item)))
+        self.catalog = catalog
+        self.powers = list(catalog.powers)
+        kinds = len(self.powers)
+
+        # Değer tek bir tamsayıdır: asıl hedef SCALE ile çarpılır, eşitlik bozan ikinci hedef eklenir
+        all_power = sum(max(power, 0) for power in self.powers) * (self.capacity + 1)
+        self.scale = all_power + len(self.steps) + self.capacity + 1
+
+        rng = random.Random(f"zobrist:{seed}")
+        limit = self.capacity + 1
+        # _zobrist[tür][adet]; adet 0'ın sayısı 0'dır, böylece boş çantanın karması 0 olur
+        self._zobrist = [[0] + [rng.getrandbits(64) for _ in range(limit)] for _ in range(kinds)]
+        self._step_keys = [rng.getrandbits(64) for _ in range(len(self.steps) + 1)]
+
+        # Her adımdan sonra gelecek öğelerin güçleri (büyükten küçüğe) ve güç bedelli köy sayısı
+        self._future_powers: List[List[int]] = []
+        self._future_sacrifices: List[int] = []
+        powers: List[int] = []
+        sacrifices = 0
+        for kind, _, item_id in reversed(self.steps + [(_STEP_PUSH, "", -1)]):
+            if item_id >= 0:
+                powers = sorted(powers + [self.powers[item_id]], reverse=True)[:self.capacity]
+            if kind == _STEP_SACRIFICE:
+                sacrifices += 1
+            self._future_powers.append(powers)
+            self._future_sacrifices.append(sacrifices)
+        self._future_powers.reverse()
+        self._future_sacrifices.reverse()
+        self._future_items = [sum(1 for kind, _, item_id in self.steps[step:] if item_id >= 0)
+                              for step in range(len(self.steps) + 1)]
+
+        # Çanta durumu (arama sırasında yerinde güncellenir)
+        self.counts = [0] * kinds
+        self.size = 0
+        self.power = 0
+        self.key = 0
+        for item in game.inventory:
+            self._add(catalog.intern(item))
+
+        self.table: Dict[int, Tuple[int, bool]] = {}
+        self.nodes = 0
+        self.table_hits = 0
+        self.cutoffs = 0
+
+    # Çanta güncellemeleri (karma artımlı)
+
+    def _add(self, item_id: int):
+        count = self.counts[item_id]
+        row = self._zobrist[item_id]
+        self.key ^= row[count] ^ row[count + 1]
+        self.counts[item_id] = count + 1
+        self.size += 1
+        self.power += self.powers[item_id]
+
+    def _remove(self, item_id: int):
+        count = self.counts[item_id]
+        row = self._zobrist[item_id]
+        self.key ^= row[count] ^ row[count - 1]
+        self.counts[item_id] = count - 1
+        self.size -= 1
+        self.power -= self.powers[item_id]
+
+    # Değerler
+
+    def _terminal(self) -> int:
+        if self.objective == "power":
+            return self.power * self.scale
+        return self.power
+
+    def _removal_gain(self, removed: int) -> int:
+        return -removed if self.objective == "power" else -removed * self.scale
+
+    def _bound(self, step: int) -> int:
+        """Bu durumdan ulaşılabilecek değerin üst sınırı"""
+        bag = [self.powers[item_id] for item_id, count in enumerate(self.counts) for _ in range(count)]
+        candidates = sorted(bag + self._future_powers[step], reverse=True)[:self.capacity]
+        best_power = sum(power for power in candidates if power > 0)
+        removed = max(self.size + self._future_items[step] - self.capacity,
+                      self._future_sacrifices[step], 0)
+        if self.objective == "power":
+            return best_power * self.scale - removed
+        return best_power - removed * self.scale
+
+    # Kararlar
+
+    def _present(self) -> List[int]:
+        """Çantadaki öğe türleri, güçsüzden güçlüye"""
+        return sorted((item_id for item_id, count in enumerate(self.counts) if count),
+                      key=lambda item_id: (self.powers[item_id], item_id))
+
+    def _sacrifices(self) -> List[List[int]]:
+        """Güç bedeli için verilebilecek öğe çoklu kümeleri.
+
+        Oyun toplam güç gereksinimi karşılanınca durur; bu yüzden bir küme
+        ancak toplamı yeterliyse ve en güçlü öğesi çıkarıldığında yetersiz
+        kalıyorsa (en güçlü öğe en son verilerek) verilebilir.
+        """
+        kinds = sorted((item_id for item_id, count in enumerate(self.counts) if count),
+                       key=lambda item_id: (-self.powers[item_id], item_id))
+        results = []
+        for first, strongest in enumerate(kinds):
+            top = self.powers[strongest]
+            low = REQUIRED_POWER - top  # Geri kalanın toplamı [low, REQUIRED_POWER) aralığında olmalı
+            available = [(item_id, self.counts[item_id] - (item_id == strongest))
+                         for item_id in kinds[first:]]
+            chosen: List[int] = []
+
+            def extend(index: int, total: int):
+                if index == len(available):
+                    if total >= low:
+                        results.append([strongest] + chosen)
+                    return
+                item_id, count = available[index]
+                extend(index + 1, total)
+                added = 0
+                for _ in range(count):
+                    total += self.powers[item_id]
+                    if total >= REQUIRED_POWER:
+                        break
+                    chosen.append(item_id)
+                    added += 1
+                    extend(index + 1, total)
+                del chosen[len(chosen) - added:]
+
+            extend(0, 0)
+        results.sort(key=lambda items: (sum(self.powers[item_id] for item_id in items), len(items)))
+        return results
+
+    def _drops(self, count: int) -> List[List[int]]:
+        """Çantadan bırakılabilecek count öğelik çoklu kümeler, güçsüzden güçlüye"""
+        kinds = self._present()
+        results = []
+        chosen: List[int] = []
+
+        def extend(index: int, left: int):
+            if left == 0:
+                results.append(list(chosen))
+                return
+            if index == len(kinds):
+                return
+            item_id = kinds[index]
+            extend(index + 1, left)
+            for taken in range(1, min(self.counts[item_id], left) + 1):
+                chosen.append(item_id)
+                extend(index + 1, left - taken)
+            del chosen[len(chosen) - min(self.counts[item_id], left):]
+
+        extend(0, count)
+        results.sort(key=lambda items: sum(self.powers[item_id] for item_id in items))
+        return results
+
+    def _moves(self, step: int) -> List[Tuple[List[int], int]]:
+        """Adımdaki kararlar: (çıkarılacak öğeler, eklenecek öğe veya -1)"""
+        kind, _, item_id = self.steps[step]
+        if kind == _STEP_PUSH:
+            if self.size < self.capacity:
+                return [([], item_id)]
+            return [([removed], item_id) for removed in self._present()]
+        if kind == _STEP_SACRIFICE:
+            return [(items, -1) for items in self._sacrifices()]
+        if self.size > BAG_LIMIT:
+            return [(items, -1) for items in self._drops(self.size - BAG_LIMIT)]
+        return [([], -1)]
+
+    def _apply(self, removed: List[int], added: int):
+        for item_id in removed:
+            self._remove(item_id)
+        if added >= 0:
+            self._add(added)
+
+    def _undo(self, removed: List[int], added: int):
+        if added >= 0:
+            self._remove(added)
+        for item_id in removed:
+            self._add(item_id)
+
+    # Arama
+
+    def _search(self, step: int, alpha: int) -> int:
+        """Durumun değeri. Sonuç alpha'dan büyükse kesindir, değilse bir üst sınırdır."""
+        self.nodes += 1
+        key = self.key ^ self._step_keys[step]
+        entry = self.table.get(key)
+        if entry is not None:
+            value, exact = entry
+            if exact or value <= alpha:
+                self.table_hits += 1
+                return value
+        if step == len(self.steps):
+            value = self._terminal()
+            self.table[key] = (value, True)
+            return value
+        bound = self._bound(step)
+        if bound <= alpha:
+            self.cutoffs += 1
+            self.table[key] = (bound, False)
+            return bound
+
+        best = DEAD
+        for removed, added in self._moves(step):
+            gain = self._removal_gain(len(removed))
+            self._apply(removed, added)
+            value = self._search(step + 1, max(alpha, best) - gain)
+            self._undo(removed, added)
+            if value != DEAD and value + gain > best:
+                best = value + gain
+                if best >= bound:
+                    break  # Üst sınıra ulaşıldı; daha iyisi olamaz
+        self.table[key] = (best, best > alpha or best == DEAD)
+        return best
+
+    def solve(self) -> Solution:
+        started = time.perf_counter()
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 2 * len(self.steps) + 200))
+        try:
+            value = self._search(0, DEAD)
+            if value != DEAD:
+                decisions, power, removed = self._plan(value)
+        finally:
+            sys.setrecursionlimit(limit)
+        elapsed = time.perf_counter() - started
+        stats = {"nodes": self.nodes, "table_size": len(self.table), "table_hits": self.table_hits,
+                 "cutoffs": self.cutoffs, "seconds": elapsed}
+        if value == DEAD:
+            return Solution(self.objective, None, None, [], stats)
+        return Solution(self.objective, power, removed, decisions, stats)
+
+    def _plan(self, value: int) -> Tuple[List[Decision], int, int]:
+        """Değere ulaşan kararları kökten yeniden izleyerek çıkarır.
+
+        (kararlar, son çanta gücü, çantadan çıkan öğe sayısı) döndürür.
+        """
+        decisions = []
+        target = value
+        removed_moves = []
+        for step in range(len(self.steps)):
+            kind, village, _ = self.steps[step]
+            for removed, added in self._moves(step):
+                gain = self._removal_gain(len(removed))
+                self._apply(removed, added)
+                # alpha = hedef - 1: değer hedefe ulaşıyorsa kesin olarak döner
+                if self._search(step + 1, target - gain - 1) + gain == target:
+                    break
+                self._undo(removed, added)
+            else:
+                raise RuntimeError("Plan yeniden kurulamadı")
+            removed_moves.append((removed, added))
+            target -= gain
+            if removed:
+                label = {_STEP_PUSH: "discard", _STEP_SACRIFICE: "sacrifice", _STEP_BAG_LIMIT: "drop"}[kind]
+                decisions.append(Decision(village, label, [self.catalog.item(item_id) for item_id in removed]))
+        power = self.power
+        removed_count = sum(len(removed) for removed, _ in removed_moves)
+        for removed, added in reversed(removed_moves):
+            self._undo(removed, added)
+        return decisions, power, removed_count
+
+
+def solve(game: Game, objective: str = "power") -> Solution:
+    """Oyunun kalan köyleri için en iyi planı bulur (oyun değişmez)"""
+    return Solver(game, objective).solve()
+
+
+class PlanPlayerIO(PolicyPlayerIO):
+    """Game'i bir çözümün kararlarıyla oynatan giriş/çıkış sağlayıcısı"""
+
+    def __init__(self, solution: Solution):
+        super().__init__(None)
+        self._decisions = {kind: [decision for decision in solution.decisions if decision.kind == kind]
+                           for kind in ("discard", "sacrifice", "drop")}
+
+    def _discard(self) -> str:
+        item = self._decisions["discard"].pop(0).items[0]
+        self.discards += 1
+        self.discarded_power += item.power
+        return item.name
+
+    def _sacrifice(self) -> str:
+        if not self._plan:
+            # En güçlü öğe en son verilir; oyun gereksinim karşılanınca durur
+            self._plan = sorted(self._decisions["sacrifice"].pop(0).items,
+                                key=lambda item: item.power, reverse=True)
+        item = self._plan.pop()
+        self.sacrificed_power += item.power
+        return item.name
+
+    def _bag_limit(self) -> str:
+        wanted = [(item.name, item.power) for item in self._decisions["drop"].pop(0).items]
+        numbers = []
+        for number, item in enumerate(self.game.inventory.bst, 1):
+            if (item.name, item.power) in wanted:
+                wanted.remove((item.name, item.power))
+                numbers.append(number)
+                self.dropped_power += item.power
+        return " ".join(map(str, numbers))
+
+
+def verify_plan(villages, solution: Solution) -> Game:
+    """Planı gerçek oyunda oynatır ve oyunu döndürür"""
+    io = PlanPlayerIO(solution)
+    game = Game(io=io, villages=villages)
+    io.attach(game)
+    game.show_menu()
+    return game
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="En iyi oyunu arar")
+    parser.add_argument("--world", default="default", help="default, random veya dünya dosyası")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="power")
+    parser.add_argument("--games", type=int, default=1, help="çözülecek dünya sayısı (random)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for game_number in range(args.games):
+        game = Game(io=ScriptedIO([]), villages=make_villages(args.world, args.seed, game_number))
+        solution = solve(game, args.objective)
+        stats = solution.stats
+        print(f"dünya {game_number}: {stats['nodes']} düğüm, tabloda {stats['table_size']} durum, "
+              f"{stats['table_hits']} tablo isabeti, {stats['cutoffs']} budama, {stats['seconds']:.3f} sn")
+        if not solution.feasible:
+            print("  Bütün köyleri kurtaran bir oyun yok (Kristalköy'de güç yetmiyor)")
+            continue
+        print(f"  son güç: {solution.final_power}, çantadan çıkan öğe: {solution.removed}")
+        for decision in solution.decisions:
+            print(f"  {decision}")
+        played = verify_plan(make_villages(args.world, args.seed, game_number), solution)
+        if played.inventory.get_total_power() != solution.final_power:
+            print(f"  HATA: oyunda plan {played.inventory.get_total_power()} güç verdi")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modüller depo kökünde durduğundan testler kökten içe aktarır
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+import random
+from collections import Counter
+
+import pytest
+
+from main import AVLTree, Item
+
+# Ağaç aynı isimli öğeleri tek düğümde sayar; modelde her adın gücü sabittir
+NAMES = [f"öğe{i:02d}" for i in range(40)]
+POWERS = {name: (i * 7) % 23 for i, name in enumerate(NAMES)}
+
+
+def item(name: str) -> Item:
+    return Item(name, POWERS[name])
+
+
+def check_invariants(tree: AVLTree):
+    """Denge, yükseklik, boyut, güç özetleri ve kesin sıralama kurallarını doğrular"""
+    def visit(node):
+        if node is None:
+            return 0, 0, 0, None, None, []
+        left = visit(node.left)
+        right = visit(node.right)
+        assert abs(left[0] - right[0]) <= 1
+        assert node.height == max(left[0], right[0]) + 1
+        assert node.count > 0
+        assert node.size == node.count + left[1] + right[1]
+        power = node.item.power
+        assert node.power_sum == power * node.count + left[2] + right[2]
+        assert node.min_power == min(p for p in (power, left[3], right[3]) if p is not None)
+        assert node.max_power == max(p for p in (power, left[4], right[4]) if p is not None)
+        keys = left[5] + [node.key] + right[5]
+        return node.height, node.size, node.power_sum, node.min_power, node.max_power, keys
+
+    keys = visit(tree.root)[5]
+    assert keys == sorted(set(keys))
+
+
+def check_against(tree: AVLTree, model: Counter):
+    check_invariants(tree)
+    expected = sorted(model.elements())
+    assert [it.name for it in tree] == expected
+    assert len(tree) == len(expected)
+    assert tree.total_power() == sum(POWERS[name] for name in expected)
+    for index in range(len(expected) + 1):
+        selected = tree.select(index)
+        assert (selected.name if selected else None) == (expected[index] if index < len(expected) else None)
+    for name in NAMES[::5]:
+        assert tree.count(name) == model[name]
+        assert tree.rank(name) == sum(1 for other in expected if other < name)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_insert_delete_rank_select(seed):
+    rng = random.Random(seed)
+    tree = AVLTree()
+    model = Counter()
+    for step in range(400):
+        name = rng.choice(NAMES)
+        if rng.random() < 0.6:
+            tree.insert(item(name))
+            model[name] += 1
+        else:
+            assert tree.delete(name.upper()) == (model[name] > 0)
+            if model[name]:
+                model[name] -= 1
+                if not model[name]:
+                    del model[name]
+        if step % 20 == 0:
+            check_against(tree, model)
+    check_against(tree, model)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_range_queries_and_top_k(seed):
+    rng = random.Random(seed)
+    names = [rng.choice(NAMES) for _ in range(rng.randint(0, 120))]
+    tree = AVLTree.from_sorted(sorted((item(name) for name in names), key=lambda it: it.name))
+    check_invariants(tree)
+    for _ in range(30):
+        low, high = sorted(rng.sample(NAMES, 2))
+        powers = [POWERS[name] for name in names if low <= name <= high]
+        assert tree.range_power(low, high) == sum(powers)
+        assert tree.range_max_power(low, high) == (max(powers) if powers else None)
+    for k in (0, 1, 5, len(names) + 3):
+        assert sorted(it.power for it in tree.top_k(k)) == sorted(POWERS[n] for n in names)[::-1][:k][::-1]
+        assert [it.power for it in tree.top_k(k, largest=False)] == sorted(POWERS[n] for n in names)[:k]
+
+
+@pytest.mark.parametrize("seed", range(15))
+def test_union_and_difference(seed):
+    rng = random.Random(seed)
+    first = Counter(rng.choice(NAMES) for _ in range(rng.randint(0, 80)))
+    second = Counter(rng.choice(NAMES[rng.randint(0, 30):]) for _ in range(rng.randint(0, 80)))
+
+    def build(model):
+        return AVLTree.from_sorted(item(name) for name in sorted(model.elements()))
+
+    tree = build(first)
+    other = build(second)
+    tree.union(other)
+    check_against(tree, first + second)
+    check_against(other, second)  # Diğer ağaç değişmez
+
+    tree = build(first)
+    tree.difference(other)
+    check_against(tree, first - second)
+    check_against(other, second)
+
+
+def test_union_keeps_existing_node():
+    tree = AVLTree.from_sorted([Item("Kılıç", 10)])
+    original = tree.root
+    tree.union(AVLTree.from_sorted([Item("kılıç", 10), Item("Zırh", 12)]))
+    assert tree.count("Kılıç") == 2
+    assert tree.search("kılıç") is original.item
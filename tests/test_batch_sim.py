@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from batch_sim import BatchSimulator, play, validate
+from main import RULE_SACRIFICE, Game, Item, Village
+
+
+def test_matches_game_on_default_world():
+    assert validate(samples=50, seed=3) == []
+
+
+def weak_world(io):
+    """Kristalköy'e yalnızca 2 güçle gelinen dünya: her oyun orada takılır"""
+    villages = [
+        Village("Başköy", [Item("Harita", 2)]),
+        Village("Kristalköy", [Item("Altın", 15)], rule=RULE_SACRIFICE),
+        Village("Sonköy", [Item("Kılıç", 10), Item("Balta", 8)]),
+    ]
+    return Game(io=io, villages=villages)
+
+
+def test_stuck_game_ends_at_sacrifice():
+    game = play(weak_world)
+    assert game.io.stuck
+    assert game.inventory.size == 0
+
+    result = BatchSimulator(weak_world(None)).run(20)
+    assert result.stuck.all()
+    assert (result.counts == 0).all()
+    assert validate(weak_world, samples=20) == []
@@ -0,0 +1,43 @@
+import pytest
+
+import catalog
+from catalog import ItemCatalog
+from main import Item, Village
+
+
+def make_world():
+    kilic, kalkan, buyu, zirh = Item("Kılıç", 10), Item("Kalkan", 7), Item("Büyü", 5), Item("Zırh", 12)
+    villages = [Village("Yeşilvadi", [kilic, kalkan, kilic]), Village("Gümüşköy", [buyu, zirh]),
+                Village("Boşköy")]
+    item_catalog = ItemCatalog([kilic, kalkan])
+    return item_catalog, villages
+
+
+def results(item_catalog: ItemCatalog, villages):
+    matrix = item_catalog.village_matrix(villages)
+    rows = [[int(count) for count in matrix[i]] for i in range(len(villages))]
+    first = item_catalog.village_counts(villages[0])
+    second = item_catalog.village_counts(villages[1])
+    ids = item_catalog.id_vector(villages[0].inventory)
+    return (rows, item_catalog.total_power(ids), item_catalog.counts_power(first),
+            [item.name for item in item_catalog.common(first, first)],
+            [item.name for item in item_catalog.difference(second, first)])
+
+
+def test_pure_python_fallback_matches_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    expected = results(*make_world())
+    monkeypatch.setattr(catalog, "np", None)
+    assert results(*make_world()) == expected
+
+
+def test_fallback_without_numpy(monkeypatch):
+    monkeypatch.setattr(catalog, "np", None)
+    item_catalog, villages = make_world()
+    rows, total, counts_total, common, difference = results(item_catalog, villages)
+    assert rows == [[2, 1, 0, 0], [0, 0, 1, 1], [0, 0, 0, 0]]
+    assert total == counts_total == 27
+    assert common == ["Kılıç", "Kalkan"]
+    assert difference == ["Büyü", "Zırh"]
+    with pytest.raises(RuntimeError):
+        item_catalog.numpy_powers()
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+import persistence
+from main import PROMPT_MENU, Game, ScriptedIO
+from persistent import GameHistory, PersistentAVLTree
+
+SCRIPT = [
+    "3", "", "3", "", "3", "", "3", "Harita", "Anahtar", "",
+    "3", "Kılıç", "Yiyecek", "Meşale", "",
+    "3", "kaya", "Bakır", "Büyü", "Gümüş", "",
+    "4", "1", "zırh", "", "4", "2", "Kal", "",
+]
+
+
+def check_balanced(node) -> int:
+    if node is None:
+        return 0
+    left, right = check_balanced(node.left), check_balanced(node.right)
+    assert abs(left - right) <= 1 and node.height == max(left, right) + 1
+    return node.height
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_persistent_tree_versions_are_independent(seed):
+    rng = random.Random(seed)
+    versions = [(PersistentAVLTree(), {})]
+    for step in range(600):
+        tree, model = rng.choice(versions[-20:])
+        key = rng.randrange(80)
+        if rng.random() < 0.6:
+            new_tree, new_model = tree.insert(key, step), {**model, key: step}
+        else:
+            new_tree, new_model = tree.delete(key), {k: v for k, v in model.items() if k != key}
+        versions.append((new_tree, new_model))
+        check_balanced(new_tree.root)
+        assert list(new_tree.items()) == sorted(new_model.items())
+        assert list(tree.items()) == sorted(model.items())  # Eski sürüm değişmez
+        other, other_model = rng.choice(versions)
+        changed = {k for k in new_model.keys() | other_model.keys()
+                   if new_model.get(k, "yok") != other_model.get(k, "yok")}
+        assert sorted(new_tree.diff(other)) == sorted(changed)
+        if new_model:
+            low = rng.randrange(80)
+            above = [pair for pair in sorted(new_model.items()) if pair[0] >= low]
+            assert list(new_tree.items(low)) == above
+            assert new_tree.rank(low) == len(new_model) - len(above)
+            assert new_tree.ceiling(low) == (above[0] if above else None)
+
+
+def state(game: Game):
+    villages = []
+    node = game.villages
+    while node:
+        villages.append(node.village.is_liberated)
+        node = node.next
+    return ([village.name for village in game.liberation_queue],
+            [(item.name, item.power) for item in game.inventory],
+            villages, game.inventory.total_power)
+
+
+def play_recording_states(game: Game):
+    states = [state(game)]
+    flow = game.menu_flow()
+    prompt = next(flow)
+    for answer in SCRIPT:
+        prompt = flow.send(answer)
+        if prompt == PROMPT_MENU and state(game) != states[-1]:
+            states.append(state(game))
+    return states
+
+
+def test_undo_redo_walks_every_version(tmp_path):
+    path = str(tmp_path / "kayit.sav")
+    game = Game(ScriptedIO([]))
+    game.history = GameHistory(game)
+    persistence.enable_autosave(game, path)
+    states = play_recording_states(game)
+    assert len(game.history) == len(states)
+
+    for expected in reversed(states[1:]):
+        assert state(game) == expected
+        assert game.history.undo()
+    assert state(game) == states[0]
+    assert not game.history.undo()
+    assert state(persistence.load(path)) == states[0]  # Geri alma günlüğe de yansır
+
+    for expected in states[1:]:
+        assert game.history.redo()
+        assert state(game) == expected
+        assert state(persistence.load(path)) == expected
+    assert not game.history.redo()
+
+
+def test_new_change_drops_redo_branch_and_snapshots_restore():
+    game = Game(ScriptedIO([]))
+    game.history = GameHistory(game)
+    states = play_recording_states(game)
+    game.history.snapshot("son")
+    for _ in range(3):
+        game.history.undo()
+    middle = state(game)
+    assert game.history.can_redo()
+
+    game.history.restore("son")
+    assert state(game) == states[-1]
+    assert game.history.undo()
+    assert state(game) == middle  # Dönüş de geri alınabilir
+
+    assert game.inventory.pop() is not None
+    assert game.history.commit()
+    assert not game.history.can_redo()
+    assert game.history.undo()
+    assert state(game) == middle
@@ -0,0 +1,35 @@
+from itertools import zip_longest
+
+import main
+from main import Game, ScriptedIO
+from playthrough import PLAYTHROUGH_SCRIPT
+
+SEARCH_SCRIPT = ["5", "1", "Kılıç", "", "5", "2", "Kılıç", "", "1", "", "7"]
+
+
+def run_counted(schedule):
+    """Oturumları verilen sırayla adım adım ilerletir; sayaçları döndürür"""
+    counters = main.enable_counters()
+    try:
+        sessions = []
+        for script in (PLAYTHROUGH_SCRIPT, SEARCH_SCRIPT):
+            flow = Game(ScriptedIO([])).menu_flow()
+            next(flow)
+            sessions.append((flow, iter(script)))
+        for index in schedule:
+            flow, answers = sessions[index]
+            try:
+                flow.send(next(answers))
+            except StopIteration:
+                pass
+    finally:
+        main.disable_counters()
+    return counters.as_dict()
+
+
+def test_interleaved_sessions_keep_their_own_counts():
+    sequential = [0] * len(PLAYTHROUGH_SCRIPT) + [1] * len(SEARCH_SCRIPT)
+    # İkinci oturum, ilki bir eylemin ortasında istem beklerken ilerler
+    pairs = zip_longest([0] * len(PLAYTHROUGH_SCRIPT), [1] * len(SEARCH_SCRIPT))
+    interleaved = [index for pair in pairs for index in pair if index is not None]
+    assert run_counted(interleaved) == run_counted(sequential)
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from main import Inventory, InventoryTreeNode, Item
+
+NAMES = ["Kılıç", "kalkan", "Büyü", "Zırh", "İksir", "ok"]
+
+
+def check_against(inventory: Inventory, model: list):
+    """Çantanın tüm görünümlerini eklenme sırasındaki liste modeliyle karşılaştırır"""
+    assert list(inventory) == model
+    assert inventory.get_size() == len(model)
+    assert inventory.get_total_power() == sum(item.power for item in model)
+    # Ağaç aynı isimli öğeleri tek düğümde saydığından adlar karşılaştırılır
+    assert [item.name.lower() for item in inventory.bst] == sorted(item.name.lower() for item in model)
+    # Sıralı görünümün düğümleri çantanın kendi düğümleridir (ad başına ayrı Node yok)
+    stack = [inventory.bst.root]
+    while stack:
+        node = stack.pop()
+        if node:
+            assert isinstance(node, InventoryTreeNode)
+            stack.extend((node.left, node.right))
+    for name in NAMES:
+        oldest = next((item for item in model if item.name.lower() == name.lower()), None)
+        assert inventory.search_item(name) is oldest
+        assert inventory.bst.count(name) == sum(item.name.lower() == name.lower() for item in model)
+
+
+def model_remove(model: list, name: str) -> bool:
+    for i, item in enumerate(model):
+        if item.name.lower() == name.lower():
+            del model[i]
+            return True
+    return False
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_operations_match_list_model(seed):
+    rng = random.Random(seed)
+    inventory = Inventory(max_capacity=12)
+    model = []
+    for _ in range(300):
+        op = rng.random()
+        if op < 0.35:
+            item = Item(rng.choice(NAMES), rng.randint(0, 50))
+            assert inventory.push(item) == (len(model) < inventory.max_capacity)
+            if len(model) < inventory.max_capacity:
+                model.append(item)
+        elif op < 0.55:
+            items = [Item(rng.choice(NAMES), rng.randint(0, 50)) for _ in range(rng.randint(0, 4))]
+            fits = len(model) + len(items) <= inventory.max_capacity
+            assert inventory.push_many(items) == fits
+            if fits:
+                model.extend(items)
+        elif op < 0.8:
+            name = rng.choice(NAMES)
+            assert inventory.use_item(name.lower()) == model_remove(model, name)
+        else:
+            expected = model.pop() if model else None
+            assert inventory.pop() is expected
+        check_against(inventory, model)
+
+
+def test_push_many_notifies_each_item_as_it_is_linked():
+    inventory = Inventory(max_capacity=10)
+    inventory.push(Item("Kılıç", 10))
+    items = [Item("Büyü", 5), Item("Zırh", 7), Item("Büyü", 3)]
+    seen = []
+
+    def listener(event, data):
+        # Her bildirimde bağlı liste tam olarak bildirilen öğelere kadar güncel olmalı
+        seen.append((event, data, [item.name for item in inventory], inventory.in_batch))
+
+    inventory.listeners.append(listener)
+    assert inventory.push_many(items)
+    assert seen == [
+        ("push", items[0], ["Kılıç", "Büyü"], True),
+        ("push", items[1], ["Kılıç", "Büyü", "Zırh"], True),
+        ("push", items[2], ["Kılıç", "Büyü", "Zırh", "Büyü"], True),
+        ("batch_end", None, ["Kılıç", "Büyü", "Zırh", "Büyü"], False),
+    ]
+    assert inventory.bst.count("büyü") == 2
+
+
+def test_push_many_over_capacity_changes_nothing():
+    inventory = Inventory(max_capacity=2)
+    events = []
+    inventory.listeners.append(lambda event, data: events.append(event))
+    assert not inventory.push_many([Item("Kılıç"), Item("Zırh"), Item("Büyü")])
+    assert inventory.get_size() == 0 and inventory.head is None
+    assert events == []
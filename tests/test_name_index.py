@@ -0,0 +1,46 @@
+import random
+
+from name_index import NameIndex, edit_distance
+
+WORDS = ["kılıç", "kalkan", "kalem", "balta", "bakır", "büyü", "zırh", "meşale", "harita", "anahtar"]
+
+
+def expected_suggestions(names, query, max_distance=1):
+    return sorted((edit_distance(query, name, max_distance), name) for name in names
+                  if edit_distance(query, name, max_distance) <= max_distance)
+
+
+def test_suggestions_follow_adds_and_removes():
+    rng = random.Random(3)
+    index = NameIndex()
+    counts = {}
+    for step in range(400):
+        word = rng.choice(WORDS)
+        if rng.random() < 0.6:
+            index.add(word)
+            counts[word] = counts.get(word, 0) + 1
+        elif counts.get(word):
+            index.remove(word)
+            counts[word] -= 1
+            if not counts[word]:
+                del counts[word]
+        if step % 7 == 0:
+            # Silme indeksi ilk öneride kurulur, sonra artımlı güncellenir
+            query = rng.choice(WORDS)[:-1] + rng.choice("aeık")
+            expected = [name for _, name in expected_suggestions(counts, query)][:5]
+            assert index.suggest(query) == expected
+        assert len(index) == len(counts)
+        assert index.complete("ka", limit=10) == sorted(name for name in counts if name.startswith("ka"))
+
+
+def test_hash_collisions_only_add_candidates(monkeypatch):
+    import name_index
+    monkeypatch.setattr(name_index, "_BUCKET_MASK", 0)  # Bütün biçimler tek kovada
+    monkeypatch.setattr(name_index, "_HASH_MASK", 0x3)  # Özetler sık sık çakışır
+    index = NameIndex()
+    for word in WORDS:
+        index.add(word)
+    index.remove("balta")
+    names = [word for word in WORDS if word != "balta"]
+    for query in ("kalen", "zirh", "balta", "anahtr"):
+        assert index.suggest(query) == [name for _, name in expected_suggestions(names, query)][:5]
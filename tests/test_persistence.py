@@ -0,0 +1,145 @@
+import pytest
+
+import persistence
+from main import Game, Item, ScriptedIO
+
+SCRIPT = [
+    "3", "", "3", "", "3", "", "3", "Harita", "Anahtar", "",
+    "3", "Kılıç", "Yiyecek", "Meşale", "",
+    "3", "kaya", "Bakır", "Büyü", "Gümüş", "",
+    "4", "1", "zırh", "", "4", "2", "Kal", "",
+]
+
+
+def state(game: Game):
+    villages = []
+    node = game.villages
+    while node:
+        village = node.village
+        villages.append((village.name, village.is_liberated, village.rule,
+                         [(item.name, item.power, count) for item, count in village.inventory.counts()]))
+        node = node.next
+    inventory = game.inventory
+    return (villages, [village.name for village in game.liberation_queue],
+            [(item.name, item.power) for item in inventory],
+            [(item.name.lower(), count) for item, count in inventory.bst.counts()],
+            inventory.max_capacity, inventory.total_power)
+
+
+def play(game: Game):
+    try:
+        game.show_menu()
+    except EOFError:
+        pass  # Girdiler bitti; oyun yarıda kesildi
+
+
+@pytest.mark.parametrize("compact_every", [1, 2, 5, 10000])
+@pytest.mark.parametrize("cut", range(0, len(SCRIPT) + 1, 3))
+def test_autosave_round_trip(tmp_path, cut, compact_every):
+    path = str(tmp_path / "kayit.bin")
+    game = Game(ScriptedIO(SCRIPT[:cut]))
+    journal = persistence.enable_autosave(game, path, compact_every=compact_every)
+    play(game)
+    journal.close()
+    assert state(persistence.load(path)) == state(game)
+
+
+def test_compaction_inside_push_many_is_deferred(tmp_path):
+    path = str(tmp_path / "kayit.bin")
+    game = Game(ScriptedIO([]))
+    journal = persistence.enable_autosave(game, path, compact_every=1)
+    snapshots = []
+    original_compact = journal.compact
+
+    def compact():
+        snapshots.append(game.inventory.in_batch)
+        original_compact()
+
+    journal.compact = compact
+    assert game.inventory.push_many([Item("Büyü", 5), Item("Zırh", 12), Item("Büyü", 5)])
+    assert snapshots == [False]  # Üç kayıt için tek sıkıştırma, toplu ekleme bittikten sonra
+    # Sıkıştırmadan sonra gelen olaylar yeni günlüğe yazılmaya devam eder
+    game.inventory.push(Item("Kalkan", 7))
+    journal.close()
+    assert state(persistence.load(path)) == state(game)
+
+
+def test_empty_journal_is_end_of_log(tmp_path):
+    path = str(tmp_path / "kayit.bin")
+    game = Game(ScriptedIO(SCRIPT[:6]))
+    play(game)
+    persistence.save(game, path)
+    open(persistence.journal_path(path), "wb").close()
+    assert state(persistence.load(path)) == state(game)
+
+    # Boş günlüğe yeniden kayıt başlatılabilmeli
+    loaded = persistence.load(path)
+    journal = persistence.Journal(loaded, path)
+    loaded.inventory.push(Item("Kalkan", 7))
+    journal.close()
+    assert state(persistence.load(path)) == state(loaded)
+
+
+def test_truncated_trailing_record_is_ignored(tmp_path):
+    path = str(tmp_path / "kayit.bin")
+    game = Game(ScriptedIO([]))
+    journal = persistence.enable_autosave(game, path)
+    game.inventory.push(Item("Kılıç", 10))
+    expected = state(game)
+    game.inventory.push(Item("Zırh", 12))
+    journal.close()
+    journal_file = persistence.journal_path(path)
+    with open(journal_file, "rb") as f:
+        data = f.read()
+    with open(journal_file, "wb") as f:
+        f.write(data[:-2])
+    assert state(persistence.load(path)) == expected
+
+
+def test_journal_after_truncated_record_starts_at_last_complete_record(tmp_path):
+    path = str(tmp_path / "kayit.bin")
+    game = Game(ScriptedIO([]))
+    journal = persistence.enable_autosave(game, path)
+    game.inventory.push(Item("Kılıç", 10))
+    game.inventory.push(Item("Zırh", 12))
+    journal.close()
+    journal_file = persistence.journal_path(path)
+    with open(journal_file, "rb") as f:
+        data = f.read()
+    with open(journal_file, "wb") as f:
+        f.write(data[:-2])
+
+    loaded = persistence.load(path)
+    journal = persistence.Journal(loaded, path)
+    loaded.inventory.push(Item("Kalkan", 7))
+    journal.close()
+    assert state(persistence.load(path)) == state(loaded)
+
+
+def test_village_items_are_decoded_on_first_access(tmp_path):
+    path = str(tmp_path / "kayit.bin")
+    game = Game(ScriptedIO(SCRIPT[:6]))
+    play(game)
+    persistence.save(game, path)
+
+    loaded = persistence.load(path)
+    node = loaded.villages
+    while node:
+        assert not node.village.is_materialized()
+        assert node.village._pending_items is None  # Öğeler henüz okunmadı
+        node = node.next
+    # Okunmamış köyler de yeniden kaydedilebilir
+    copy = str(tmp_path / "kopya.bin")
+    persistence.save(loaded, copy)
+    assert state(persistence.load(copy)) == state(game)
+    assert state(loaded) == state(game)
+
+    # Aynı (ad, güç) çifti köylerde ve çantada tek nesnedir
+    shared = {}
+    node = loaded.villages
+    while node:
+        for item in node.village.inventory:
+            assert shared.setdefault((item.name, item.power), item) is item
+        node = node.next
+    for item in loaded.inventory:
+        assert shared.setdefault((item.name, item.power), item) is item
@@ -0,0 +1,33 @@
+import os
+
+from puzzle import WordIndex, signature
+
+
+def write_words(path):
+    path.write_text("kaya\nAYAK\nkitap\nışık\n", encoding="utf-8")
+    return str(path)
+
+
+def test_index_is_written_to_cache_not_next_to_words(tmp_path):
+    words_dir = tmp_path / "kelimeler"
+    words_dir.mkdir()
+    words_path = write_words(words_dir / "liste.txt")
+    cache_dir = tmp_path / "önbellek"
+    index = WordIndex.load(words_path, cache_dir=str(cache_dir))
+    try:
+        assert index._file is not None  # mmap ile açıldı
+        assert sorted(index.words_for(signature("KAYA"))) == ["AYAK", "KAYA"]
+    finally:
+        index.close()
+    assert os.listdir(words_dir) == ["liste.txt"]
+    assert os.listdir(cache_dir) == [os.path.basename(WordIndex.index_path(words_path, str(cache_dir)))]
+
+
+def test_unwritable_cache_builds_index_in_memory(tmp_path):
+    words_path = write_words(tmp_path / "liste.txt")
+    blocker = tmp_path / "dosya"
+    blocker.write_text("")  # Önbellek dizini yerine bir dosya var; dizin oluşturulamaz
+    index = WordIndex.load(words_path, cache_dir=str(blocker / "alt"))
+    assert index._file is None
+    assert index.words_for(signature("IŞIK")) == ["IŞIK"]
+    assert len(index) == 4
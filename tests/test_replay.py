@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from main import PROMPT_MENU, PROMPT_PUZZLE, Game, Item, ScriptedIO
+from persistent import GameHistory
+from replay import Recorder, SessionLog, _fingerprint
+
+SCRIPT = [
+    "3", "", "3", "", "3", "", "3", "Harita", "Anahtar", "",
+    "3", "Kılıç", "Yiyecek", "Meşale", "",
+    "3", "kaya", "Bakır", "Büyü", "Gümüş", "",
+    "4", "1", "zırh", "", "4", "2", "Kal", "",
+]
+
+
+def record_session(path: str, seed: int, checkpoint_every: int):
+    """Oyunu rastgele geri alma/yinelemelerle oynatır; (olay no, durum) işaretlerini döndürür"""
+    rng = random.Random(seed)
+    game = Game(ScriptedIO([]))
+    if seed % 2:
+        game.history = GameHistory(game)
+    recorder = Recorder(game, path, checkpoint_every=checkpoint_every)
+    marks = [(0, _fingerprint(game))]
+    flow = game.menu_flow()
+    prompt = next(flow)
+    for answer in SCRIPT:
+        if prompt == PROMPT_PUZZLE and rng.random() < 0.5:
+            prompt = flow.send("YANLIŞ")
+        prompt = flow.send(answer)
+        if prompt == PROMPT_MENU:
+            if game.history and rng.random() < 0.4:
+                (game.history.undo if rng.random() < 0.7 else game.history.redo)()
+            marks.append((recorder.events, _fingerprint(game)))
+    recorder.close()
+    return game, recorder.events, marks
+
+
+@pytest.mark.parametrize("checkpoint_every", [1, 2, 3, 10000])
+@pytest.mark.parametrize("seed", range(6))
+def test_seek_and_verify(tmp_path, seed, checkpoint_every):
+    path = str(tmp_path / "oturum.kayit")
+    game, events, marks = record_session(path, seed, checkpoint_every)
+    log = SessionLog(path)
+    assert len(log) == events
+    assert _fingerprint(log.game_at(verify=True)) == _fingerprint(game)
+    for event, fingerprint in marks:
+        assert _fingerprint(log.game_at(event)) == fingerprint
+    for event in range(len(log) + 1):
+        log.game_at(event, verify=True)  # Her kontrol noktası tekrar oynatılan durumla uyuşmalı
+
+
+def test_checkpoints_are_taken_between_batches(tmp_path):
+    path = str(tmp_path / "oturum.kayit")
+    game = Game(ScriptedIO([]), villages=[])
+    game.inventory.max_capacity = 1000
+    recorder = Recorder(game, path, checkpoint_every=1)
+    sizes = [0]
+    for i in range(40):
+        items = [Item(f"Öğe{i % 7}", i), Item("Büyü", 5), Item("Zırh", 12)]
+        assert game.inventory.push_many(items)
+        sizes.append(sizes[-1] + len(items))
+    recorder.close()
+    log = SessionLog(path)
+    assert log.checkpoints > 1
+    assert all(point in sizes for point in log._points)
+    for event in range(len(log) + 1):
+        replayed = log.game_at(event, verify=True)
+        assert replayed.inventory.get_size() == event
+
+
+def test_truncated_log_keeps_earlier_events(tmp_path):
+    path = str(tmp_path / "oturum.kayit")
+    game, events, marks = record_session(path, 1, 2)
+    with open(path, "rb") as f:
+        data = f.read()
+    rng = random.Random(0)
+    for cut in [0, 3] + rng.sample(range(8, len(data)), 20):
+        cut_path = str(tmp_path / "kesik.kayit")
+        with open(cut_path, "wb") as f:
+            f.write(data[:cut])
+        try:
+            log = SessionLog(cut_path)
+        except ValueError:
+            continue  # Başlangıç durumu bile yazılamamış
+        log.game_at(verify=True)
+        for event, fingerprint in marks:
+            if event < len(log):
+                assert _fingerprint(log.game_at(event)) == fingerprint
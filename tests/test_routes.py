@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+import routes
+from main import Village
+from routes import INF, WorldMap
+
+
+def random_map(rng: random.Random, count: int, landmarks: int):
+    villages = [Village(f"köy{i}") for i in range(count)]
+    world_map = WorldMap(villages, landmarks=landmarks)
+    lengths = {}  # (küçük no, büyük no) -> uzunluk
+    for _ in range(rng.randint(0, count * 2)):
+        a, b = rng.sample(range(count), 2)
+        length = rng.randint(1, 9)
+        world_map.add_road(villages[a], villages[b], length)
+        lengths[min(a, b), max(a, b)] = float(length)
+    return world_map, villages, lengths
+
+
+def floyd_warshall(count: int, lengths: dict):
+    distances = [[0.0 if i == j else lengths.get((min(i, j), max(i, j)), INF)
+                  for j in range(count)] for i in range(count)]
+    for k in range(count):
+        for i in range(count):
+            for j in range(count):
+                if distances[i][k] + distances[k][j] < distances[i][j]:
+                    distances[i][j] = distances[i][k] + distances[k][j]
+    return distances
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("method", ["astar", "dijkstra"])
+def test_shortest_path_matches_floyd_warshall(seed, method, monkeypatch):
+    monkeypatch.setattr(routes, "LANDMARK_MIN_VILLAGES", 1)  # Küçük haritalarda da yer imleri
+    rng = random.Random(seed)
+    count = rng.randint(2, 20)
+    world_map, villages, lengths = random_map(rng, count, landmarks=seed % 4)
+    expected = floyd_warshall(count, lengths)
+    for a in range(count):
+        for b in range(count):
+            result = world_map.shortest_path(villages[a], villages[b], method)
+            if expected[a][b] == INF:
+                assert result is None
+                continue
+            distance, path = result
+            assert distance == pytest.approx(expected[a][b])
+            assert path[0] is villages[a] and path[-1] is villages[b]
+            walked = sum(world_map.road_length(u, v) for u, v in zip(path, path[1:]))
+            assert walked == pytest.approx(distance)
+
+
+def test_cache_is_invalidated_when_roads_change():
+    a, b, c = (Village(name) for name in ("A", "B", "C"))
+    world_map = WorldMap([a, b, c])
+    world_map.add_road(a, b, 5)
+    world_map.add_road(b, c, 5)
+    assert world_map.distance(a, c) == 10
+    assert world_map.distance(c, a) == 10
+    assert world_map.cache_hits == 1
+
+    world_map.add_road(a, c, 3)
+    assert world_map.shortest_path(a, c) == (3, [a, c])
+
+    world_map.remove_road(a, c)
+    assert world_map.shortest_path(a, c) == (10, [a, b, c])
+
+    world_map.remove_road(b, c)
+    assert world_map.shortest_path(a, c) is None
+    assert world_map.distance(a, c) == INF
+    assert not world_map.remove_road(b, c)
+
+
+@pytest.mark.parametrize("budget", [routes.TOUR_MATRIX_BUDGET, 0])  # 0: açgözlü tur
+def test_plan_tour_reports_unreachable_villages(budget, monkeypatch):
+    monkeypatch.setattr(routes, "TOUR_MATRIX_BUDGET", budget)
+    start, near, far, island, lonely = (Village(name) for name in ("S", "N", "F", "I", "L"))
+    world_map = WorldMap([start, near, far, island, lonely])
+    world_map.add_road(start, near, 2)
+    world_map.add_road(near, far, 3)
+    world_map.add_road(island, lonely, 1)  # Başlangıçtan ayrı bileşen
+
+    tour = world_map.plan_tour(start, [far, island, near, start, lonely])
+    assert tour.order == [near, far]
+    assert tour.length == 5
+    assert set(tour.unreachable) == {island, lonely}
+
+
+def test_plan_tour_length_matches_distances():
+    rng = random.Random(7)
+    world_map, villages, lengths = random_map(rng, 15, landmarks=0)
+    expected = floyd_warshall(15, lengths)
+    tour = world_map.plan_tour(villages[0], villages[1:])
+    stops = [0] + [world_map._ids[village] for village in tour.order]
+    assert tour.length == pytest.approx(sum(expected[u][v] for u, v in zip(stops, stops[1:])))
+    assert {world_map._ids[village] for village in tour.unreachable} == \
+        {v for v in range(1, 15) if expected[0][v] == INF}
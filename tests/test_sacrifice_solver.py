@@ -0,0 +1,70 @@
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from main import Inventory, Item
+from sacrifice_solver import solve_sacrifice
+
+
+def random_bag(rng: random.Random):
+    inventory = Inventory(max_capacity=20)
+    for _ in range(rng.randint(0, 10)):
+        # Aynı ad ve güç tekrar edebilir
+        inventory.push(Item(rng.choice(["Kılıç", "Balta", "Altın", "Harita"]), rng.randint(0, 12)))
+    return inventory
+
+
+def brute_force(items, required_power: int, objective: str):
+    """Bütün alt kümeler içinde en iyisinin değeri (öğe sayısı veya toplam güç)"""
+    best = None
+    for size in range(len(items) + 1):
+        for subset in itertools.combinations(items, size):
+            total = sum(item.power for item in subset)
+            if total < required_power:
+                continue
+            value = size if objective == "count" else total
+            if best is None or value < best:
+                best = value
+    return best
+
+
+@pytest.mark.parametrize("seed", range(60))
+@pytest.mark.parametrize("objective", ["count", "power"])
+def test_matches_brute_force(seed, objective):
+    rng = random.Random(seed)
+    inventory = random_bag(rng)
+    items = list(inventory)
+    required_power = rng.randint(1, sum(item.power for item in items) + 5)
+
+    chosen = solve_sacrifice(inventory, required_power, objective)
+    expected = brute_force(items, required_power, objective)
+    if expected is None:
+        assert chosen is None
+        return
+    # Seçilen öğeler çantadaki ayrı öğelerdir
+    bag = Counter(map(id, items))
+    assert all(count <= bag[key] for key, count in Counter(map(id, chosen)).items())
+    total = sum(item.power for item in chosen)
+    assert total >= required_power
+    assert (len(chosen) if objective == "count" else total) == expected
+
+
+@pytest.mark.parametrize("objective", ["count", "power"])
+def test_infeasible_returns_none(objective):
+    inventory = Inventory()
+    inventory.push(Item("Kılıç", 10))
+    inventory.push(Item("Harita", 2))
+    assert solve_sacrifice(inventory, 13, objective) is None
+    assert solve_sacrifice(Inventory(), 1, objective) is None
+
+
+@pytest.mark.parametrize("objective", ["count", "power"])
+def test_nothing_required(objective):
+    assert solve_sacrifice(Inventory(), 0, objective) == []
+
+
+def test_unknown_objective():
+    with pytest.raises(ValueError):
+        solve_sacrifice(Inventory(), 5, "weight")
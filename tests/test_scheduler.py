@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from main import Item, Village, VillageScheduler, reward_priority
+
+
+def check_heap(scheduler: VillageScheduler, model: dict):
+    assert len(scheduler) == len(model)
+    for index, entry in enumerate(scheduler._heap):
+        assert entry.index == index
+        assert scheduler._entries[entry.village] is entry
+        if index:
+            assert not entry.order < scheduler._heap[(index - 1) // 2].order
+    assert list(scheduler) == sorted(model, key=model.get)
+    assert scheduler.peek() is (min(model, key=model.get) if model else None)
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_operations_match_sorted_model(seed):
+    rng = random.Random(seed)
+    villages = [Village(f"köy{i}") for i in range(rng.randint(0, 40))]
+    half = len(villages) // 2
+    scheduler = VillageScheduler(villages=villages[:half])
+    model = {village: (0, i) for i, village in enumerate(villages[:half])}  # köy -> (öncelik, sıra)
+    sequence = half
+    waiting = villages[half:]
+    for _ in range(150):
+        op = rng.random()
+        if op < 0.25 and waiting:
+            village = waiting.pop()
+            priority = rng.randint(-5, 5)
+            scheduler.enqueue(village, priority)
+            model[village] = (priority, sequence)
+            sequence += 1
+        elif op < 0.45:
+            expected = min(model, key=model.get) if model else None
+            assert scheduler.dequeue() is expected
+            if expected is not None:
+                del model[expected]
+                waiting.append(expected)
+        elif op < 0.7 and model:
+            village = rng.choice(list(model))
+            priority = rng.randint(-5, 5)
+            assert scheduler.update(village, priority)
+            model[village] = (priority, model[village][1])  # Eklenme sırası korunur
+        elif op < 0.85 and model:
+            village = rng.choice(list(model))
+            assert scheduler.remove(village)
+            del model[village]
+            waiting.append(village)
+        elif model:
+            # Çıkarılıp eski anahtarıyla geri konan köy aynı yere döner
+            village = rng.choice(list(model))
+            order = scheduler.order_of(village)
+            assert order == model[village]
+            scheduler.remove(village)
+            scheduler.place(village, order)
+        check_heap(scheduler, model)
+    assert not scheduler.update(Village("yok"))
+    assert not scheduler.remove(Village("yok"))
+
+
+def test_update_recomputes_priority_function():
+    villages = [Village("A", [Item("Kılıç", 10)]), Village("B", [Item("Altın", 15)]),
+                Village("C", [Item("Harita", 2)])]
+    scheduler = VillageScheduler(reward_priority, villages)
+    assert [village.name for village in scheduler] == ["B", "A", "C"]
+    villages[2].add_item(Item("Altın", 15))
+    assert scheduler.update(villages[2])
+    assert [village.name for village in scheduler] == ["C", "B", "A"]
+    with pytest.raises(ValueError):
+        scheduler.place(villages[0], scheduler.order_of(villages[0]))
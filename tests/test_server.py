@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from playthrough import PLAYTHROUGH_SCRIPT
+from server import PROMPT_MARKER, GameServer
+
+
+def serve(client, **options):
+    """Sunucuyu rastgele bir portta başlatır, client(server) bitince kapatır"""
+
+    async def main():
+        server = GameServer(port=0, idle_timeout=0.2, **options)
+        await server.start()
+        try:
+            await asyncio.wait_for(client(server), 10)
+        finally:
+            await server.close()
+        return server
+
+    return asyncio.run(main())
+
+
+async def read_until_prompt(reader) -> str:
+    """İstem satırına ya da bağlantının sonuna kadar gelen çıktı"""
+    lines = []
+    while True:
+        line = (await reader.readline()).decode("utf-8")
+        lines.append(line)
+        if not line or line.startswith(PROMPT_MARKER):
+            return "".join(lines)
+
+
+async def play(server, script):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    output = [await read_until_prompt(reader)]
+    for answer in script:
+        writer.write((answer + "\n").encode("utf-8"))
+        output.append(await read_until_prompt(reader))
+    output.append((await reader.read()).decode("utf-8"))
+    writer.close()
+    return "".join(output)
+
+
+def test_playthrough():
+    async def client(server):
+        output = await play(server, PLAYTHROUGH_SCRIPT)
+        assert "Elmasşehir köyü başarıyla kurtarıldı!" in output
+        assert output.count(PROMPT_MARKER) == len(PLAYTHROUGH_SCRIPT)  # "7"den sonra istem yok
+
+    server = serve(client)
+    assert server.stats == {"started": 1, "finished": 1, "evicted": 0, "rejected": 0, "disconnected": 0}
+    assert server.sessions == 0
+
+
+def test_idle_session_is_evicted():
+    async def client(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        await read_until_prompt(reader)
+        rest = (await reader.read()).decode("utf-8")  # Cevap verilmez; sunucu kapatır
+        assert "boşta kaldığı için kapatıldı" in rest
+        writer.close()
+
+    server = serve(client)
+    assert server.stats["evicted"] == 1
+    assert server.sessions == 0
+
+
+def test_long_line_is_rejected():
+    async def client(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        await read_until_prompt(reader)
+        writer.write(b"3" * 200 + b"\n")
+        rest = (await reader.read()).decode("utf-8")
+        assert "Satır çok uzun" in rest
+        writer.close()
+
+    server = serve(client, max_line=64)
+    assert server.stats["rejected"] == 1
+    assert server.stats["finished"] == server.stats["evicted"] == 0
+    assert server.sessions == 0
+
+
+def test_connections_over_max_sessions_are_rejected():
+    async def client(server):
+        first_reader, first_writer = await asyncio.open_connection(server.host, server.port)
+        await read_until_prompt(first_reader)  # İlk oturum istemde bekliyor
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        assert "Sunucu dolu" in (await reader.read()).decode("utf-8")
+        writer.close()
+        first_writer.write(b"7\n")
+        await first_reader.read()
+        first_writer.close()
+
+        # Oturum bittikten sonra yeniden yer açılır
+        await play(server, ["7"])
+
+    server = serve(client, max_sessions=1)
+    assert server.stats == {"started": 2, "finished": 2, "evicted": 0, "rejected": 1, "disconnected": 0}
+    assert server.sessions == 0
+
+
+def test_close_stops_accepting():
+    async def client(server):
+        pass
+
+    server = serve(client)
+    with pytest.raises(OSError):
+        asyncio.run(asyncio.open_connection(server.host, server.port))
@@ -0,0 +1,56 @@
+import pytest
+
+from main import Game, ScriptedIO
+from policy_eval import make_villages
+from solver import DEAD, Solver, verify_plan
+
+# Güç bedeli ve çanta sınırı kuralları dahil dört köylük küçük dünyalar
+VILLAGES = (0, 1, 4, 6)
+
+
+def small_world(game_number: int):
+    villages = make_villages("random", 0, game_number)
+    return [villages[i] for i in VILLAGES]
+
+
+def exhaustive(solver: Solver, step: int = 0, memo=None) -> int:
+    """Aynı kararları sınır ve kesme kullanmadan hepsini deneyerek değerlendirir"""
+    if memo is None:
+        memo = {}
+    key = (step, tuple(solver.counts))
+    if key in memo:
+        return memo[key]
+    if step == len(solver.steps):
+        return solver._terminal()
+    best = DEAD
+    for removed, added in solver._moves(step):
+        gain = solver._removal_gain(len(removed))
+        solver._apply(removed, added)
+        value = exhaustive(solver, step + 1, memo)
+        solver._undo(removed, added)
+        if value != DEAD:
+            best = max(best, value + gain)
+    memo[key] = best
+    return best
+
+
+@pytest.mark.parametrize("objective", ["power", "discards"])
+@pytest.mark.parametrize("game_number", range(20))
+def test_solution_is_optimal_and_playable(game_number, objective):
+    game = Game(ScriptedIO([]), villages=small_world(game_number))
+    solver = Solver(game, objective)
+    solution = solver.solve()
+    best = exhaustive(Solver(game, objective))
+    assert solution.feasible == (best != DEAD)
+    if not solution.feasible:
+        return
+    # Planın değeri, aramanın amaç fonksiyonuyla aynı ölçekte hesaplanır
+    if objective == "power":
+        value = solution.final_power * solver.scale - solution.removed
+    else:
+        value = solution.final_power - solution.removed * solver.scale
+    assert value == best
+
+    played = verify_plan(small_world(game_number), solution)
+    assert played.inventory.get_total_power() == solution.final_power
+    assert played.liberation_queue.is_empty()
@@ -0,0 +1,105 @@
+import csv
+import json
+
+import pytest
+
+from main import RULE_PUZZLE, RULE_SACRIFICE, Game
+from world import load_world
+
+ITEMS = {"Kılıç": 10, "Işık": 3, "Altın": 15, "Büyü": 5}
+VILLAGES = [
+    ("Yeşilvadi", ["Kılıç", "Işık", "Işık"], None),
+    ("Kristalköy", ["Altın"], RULE_SACRIFICE),
+    ("Zümrütvadi", ["Büyü", "Kılıç"], RULE_PUZZLE),
+]
+
+
+def village_records(key: str, with_rules: bool):
+    for name, items, rule in VILLAGES:
+        record = {key: name, "items": items}
+        if rule and with_rules:
+            record["rule"] = rule
+        yield record
+
+
+def write_world(path, extension: str, with_rules: bool = True):
+    """VILLAGES dünyasını verilen biçimde yazar"""
+    with open(path, "w", encoding="utf-8", newline="" if extension == ".csv" else None) as f:
+        if extension == ".jsonl":
+            for name, power in ITEMS.items():
+                f.write(json.dumps({"item": name, "power": power}, ensure_ascii=False) + "\n")
+            f.write("\n")  # Boş satırlar atlanır
+            for record in village_records("village", with_rules):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif extension == ".json":
+            json.dump({"items": ITEMS, "villages": list(village_records("name", with_rules))},
+                      f, ensure_ascii=False)
+        else:
+            writer = csv.writer(f)
+            writer.writerow(["village", "item", "power"])
+            for name, items, _ in VILLAGES:
+                for item in items:
+                    writer.writerow([name, item, ITEMS[item]])
+
+
+def describe(villages):
+    return [(village.name, village.rule, sorted((item.name, item.power) for item, _ in village.item_counts()))
+            for village in villages]
+
+
+@pytest.mark.parametrize("extension", [".jsonl", ".json", ".csv"])
+def test_round_trip(tmp_path, extension):
+    path = str(tmp_path / f"dunya{extension}")
+    with_rules = extension != ".csv"  # CSV köy kuralı taşımaz
+    write_world(path, extension, with_rules)
+    villages = load_world(path)
+    expected = [(name, rule if with_rules else None, sorted((item, ITEMS[item]) for item in items))
+                for name, items, rule in VILLAGES]
+    assert describe(villages) == expected
+
+    # Aynı öğe bütün köylerde tek nesnedir
+    shared = {}
+    for village in villages:
+        for item, _ in village.item_counts():
+            assert shared.setdefault(item.name, item) is item
+
+
+@pytest.mark.parametrize("extension", [".jsonl", ".json", ".csv"])
+def test_village_trees_are_built_on_first_access(tmp_path, extension):
+    path = str(tmp_path / f"dunya{extension}")
+    write_world(path, extension)
+    villages = load_world(path)
+    game = Game(villages=villages)
+    game.item_index  # Ters indeks de ağaçları kurmadan oluşturulur
+    assert not any(village.is_materialized() for village in villages)
+
+    first = villages[0]
+    assert first.has_item("Işık")
+    assert first.is_materialized()
+    assert [(item.name, count) for item, count in first.inventory.counts()] == [("Işık", 2), ("Kılıç", 1)]
+    assert not any(village.is_materialized() for village in villages[1:])
+
+
+@pytest.mark.parametrize("extension, content, message", [
+    (".jsonl", '{"village": "A", "items": ["Kılıç"]}\n', "1. satır: tanımsız öğe 'Kılıç'"),
+    (".jsonl", '{"item": "Kılıç", "power": 10}\n{"köy": "A"}\n', "2. satır: 'item' veya 'village' alanı yok"),
+    (".jsonl", '{"item": "Kılıç", "power": 10}\n{"village": "A", "rule": "uçmak"}\n',
+     "2. satır: Bilinmeyen köy kuralı"),
+    (".jsonl", '{"item": "Kılıç", "power": "on"}\n', "1. satır: geçersiz güç değeri 'on'"),
+    (".jsonl", '{"item": "Kılıç"\n', "1. satır: geçersiz JSON"),
+    (".jsonl", '["Kılıç", 10]\n', "1. satır: JSON nesnesi bekleniyordu"),
+    (".csv", "village,item,power\nA,Kılıç,10\nB,Balta\n", "3. satır: 'köy,öğe,güç' bekleniyordu"),
+    (".csv", "A,Kılıç,on\n", "1. satır: geçersiz güç değeri 'on'"),
+    (".json", '{"items": {"Kılıç": 10}, "villages": [{"name": "A", "items": ["Balta"]}]}',
+     "A: tanımsız öğe 'Balta'"),
+    (".json", '{"items": {"Kılıç": null}}', "Kılıç: geçersiz güç değeri None"),
+    (".json", '{"villages": [{"name": "A"}, {"items": []}]}', "2. köyün 'name' alanı yok"),
+    (".txt", "", "Desteklenmeyen dünya dosyası biçimi: .txt"),
+])
+def test_bad_rows_raise_clear_errors(tmp_path, extension, content, message):
+    path = tmp_path / f"dunya{extension}"
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError) as error:
+        load_world(str(path))
+    assert message in str(error.value)
+
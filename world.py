@@ -0,0 +1,120 @@
+"""Dünya (köy ve öğe) tanımlarını dosyadan okur.
+
+Desteklenen biçimler:
+
+- JSON Lines (.jsonl): her satır ayrı bir nesnedir ve satır satır okunur.
+      {"item": "Kılıç", "power": 10}
+      {"village": "Yeşilvadi", "items": ["Kılıç", "Yiyecek", "Kalkan"]}
+      {"village": "Kristalköy", "items": ["Altın"], "rule": "sacrifice"}
+  Öğeler, köylerde kullanılmadan önce tanımlanmalıdır.
+- CSV (.csv): her satır "köy,öğe,güç" biçimindedir (isteğe bağlı başlık satırı
+  "village,item,power"). Köyler ilk göründükleri sırayla oluşturulur.
+- JSON (.json): {"items": {"Kılıç": 10, ...},
+                 "villages": [{"name": "Yeşilvadi", "items": ["Kılıç", ...]}, ...]}
+  Bu biçim dosyanın tamamını okur; büyük dünyalar için .jsonl tercih edilmelidir.
+
+JSON biçimlerinde köyün isteğe bağlı "rule" alanı özel kuralını belirtir
+(normal, sacrifice, puzzle, bag_limit). Kuralı verilmeyen köyler Game
+tarafından dünyadaki yerlerine göre varsayılan kuralı alır.
+
+Köyler öğeleriyle birlikte oluşturulur ancak AVL ağaçları ilk kullanımda kurulur.
+"""
+import csv
+import json
+import os
+from typing import Dict, List, Tuple
+
+from main import Item, Village
+
+
+def _power(value, where: str) -> int:
+    """Güç değerini tamsayıya çevirir; where hata mesajında kaydın yeridir"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: geçersiz güç değeri {value!r}") from None
+
+
+def _read_jsonl(f) -> List[Village]:
+    items: Dict[str, Item] = {}
+    villages = []
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{line_number}. satır: geçersiz JSON ({e})") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"{line_number}. satır: JSON nesnesi bekleniyordu")
+        if "item" in record:
+            power = _power(record.get("power", 0), f"{line_number}. satır")
+            items[record["item"]] = Item(record["item"], power)
+        elif "village" in record:
+            try:
+                village_items = [items[name] for name in record.get("items", ())]
+            except KeyError as e:
+                raise ValueError(f"{line_number}. satır: tanımsız öğe {e.args[0]!r}") from None
+            try:
+                villages.append(Village(record["village"], village_items, record.get("rule")))
+            except ValueError as e:
+                raise ValueError(f"{line_number}. satır: {e}") from None
+        else:
+            raise ValueError(f"{line_number}. satır: 'item' veya 'village' alanı yok")
+    return villages
+
+
+def _read_csv(f) -> List[Village]:
+    items: Dict[Tuple[str, int], Item] = {}  # Aynı öğeler tek nesneyi paylaşır
+    villages: Dict[str, Village] = {}
+    for line_number, row in enumerate(csv.reader(f), 1):
+        if not row or (line_number == 1 and row[:3] == ["village", "item", "power"]):
+            continue
+        if len(row) < 3:
+            raise ValueError(f"{line_number}. satır: 'köy,öğe,güç' bekleniyordu")
+        village_name, item_name = row[0].strip(), row[1].strip()
+        power = _power(row[2], f"{line_number}. satır")
+        item = items.get((item_name, power))
+        if item is None:
+            item = items[(item_name, power)] = Item(item_name, power)
+        village = villages.get(village_name)
+        if village is None:
+            village = villages[village_name] = Village(village_name)
+        village.add_item(item)
+    return list(villages.values())
+
+
+def _read_json(f) -> List[Village]:
+    data = json.load(f)
+    items = {name: Item(name, _power(power, name)) for name, power in data.get("items", {}).items()}
+    villages = []
+    for record in data.get("villages", ()):
+        if "name" not in record:
+            raise ValueError(f"{len(villages) + 1}. köyün 'name' alanı yok")
+        try:
+            village_items = [items[name] for name in record.get("items", ())]
+        except KeyError as e:
+            raise ValueError(f"{record.get('name')}: tanımsız öğe {e.args[0]!r}") from None
+        try:
+            villages.append(Village(record["name"], village_items, record.get("rule")))
+        except ValueError as e:
+            raise ValueError(f"{record.get('name')}: {e}") from None
+    return villages
+
+
+_READERS = {
+    ".jsonl": _read_jsonl,
+    ".csv": _read_csv,
+    ".json": _read_json,
+}
+
+
+def load_world(path: str) -> List[Village]:
+    """Dünya dosyasını uzantısına göre okuyup köy listesini döndürür"""
+    extension = os.path.splitext(path)[1].lower()
+    reader = _READERS.get(extension)
+    if reader is None:
+        raise ValueError(f"Desteklenmeyen dünya dosyası biçimi: {extension}")
+    with open(path, encoding="utf-8", newline="" if extension == ".csv" else None) as f:
+        return reader(f)